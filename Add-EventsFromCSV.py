@@ -68,15 +68,9 @@ def main():
         timestamp_id, title, note_Content = myInputs.get_templateMerge_Values_From_ExistingData(eventDict,templateContent)
         
         titleLettersAndNumbers = myTools.letters_and_numbers_only(title,200)  # Limit to 200 characters and remove special characters
-        uniqueIdentifier = myTools.generate_unique_identifier (timestamp_id,noteType,titleLettersAndNumbers)
      
-        # Construct the output filename and path
-        output_filename = f"{uniqueIdentifier}.md"
-        output_path = os.path.join(newNote_directory, output_filename)
-
-        # Save the new note
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(note_Content)
+        # Save the new note under the next free unique identifier
+        uniqueIdentifier, output_path = myTools.create_unique_note_file(newNote_directory, timestamp_id, noteType, titleLettersAndNumbers, note_Content)
 
         print(f"{myTerminal.SUCCESS}Note created:{myTerminal.RESET} {output_path}")
         if noteType != "event" or myPreferences.automatically_open_event_notes():
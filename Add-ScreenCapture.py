@@ -3,6 +3,7 @@
 from _library import Tools as myTools, Preferences as myPreferences, Terminal as myTerminal
 import os
 
+myPreferences.check_pickUp_paths()
 downloads_folder = myPreferences.screenCapture_Path()
 files = [
     (f, os.path.getmtime(os.path.join(downloads_folder, f)))
@@ -0,0 +1,323 @@
+"""
+Index of the action items of the whole vault, open and completed.
+
+Every action item is kept under its note and row, (notePathAndFile, noteRow), with
+lookups by owner, project and completion state and a list of all action items in due
+date order, so "everything Sue still has to do" or "what is overdue" is a lookup and a
+bisect instead of parsing every note with open action items.  Action items without a
+date sort before every date.
+
+The index is built from the note index (see NoteIndex) and saved next to it.  sync()
+only re-reads the note files whose modified time or size changed, and files without a
+check box are skipped without being decoded.  ActionItem.Complete updates the note it
+changed right away with refresh_note().
+"""
+
+import datetime
+import os
+import pickle
+from bisect import bisect_left, bisect_right, insort
+
+from . import ActionItems as myActionItems
+from . import NoteIndex as myNoteIndex
+from . import Terminal as myTerminal
+
+# bump the version whenever the saved format changes
+actionItemIndexVersion = 1
+actionItemIndexFileName = "ActionItemIndex.pickle"
+
+# the bytes a note file must contain to have any action items
+_checkBoxes = (b"[ ]", b"[x]", b"[X]")
+
+# the index of the vault, loaded from disk on first use
+# notePathAndFile -> (st_mtime_ns, st_size, note id, note title, project, note date, rows)
+_notes = None
+_items = {}  # (notePathAndFile, noteRow) -> ActionItem
+# lookups of the keys of _items, built when the index is loaded
+_byOwner = {}  # lower cased owner -> set of keys
+_byProject = {}  # project -> set of keys
+_byCompleted = {False: set(), True: set()}
+_byDate = []  # (Date, key) in due date order
+_syncedChangeCount = None
+_dirty = False
+
+
+def action_item_index_path() -> str:
+    """Returns the full path of the saved action item index."""
+    return os.path.join(myNoteIndex.index_folder(), actionItemIndexFileName)
+
+
+def exists() -> bool:
+    """Returns True if the action item index was created for this vault."""
+    return _notes is not None or os.path.isfile(action_item_index_path())
+
+
+def _add_lookups(key: tuple, actionItem) -> None:
+    _byOwner.setdefault(actionItem.Owner.strip().lower(), set()).add(key)
+    _byProject.setdefault(actionItem.project, set()).add(key)
+    _byCompleted[actionItem.Completed].add(key)
+    insort(_byDate, (actionItem.Date, key))
+
+
+def _remove_lookups(key: tuple, actionItem) -> None:
+    for lookup, value in ((_byOwner, actionItem.Owner.strip().lower()), (_byProject, actionItem.project)):
+        keys = lookup.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del lookup[value]
+    # ActionItem.Complete sets Completed on the indexed action item before it is refreshed
+    _byCompleted[False].discard(key)
+    _byCompleted[True].discard(key)
+    position = bisect_left(_byDate, (actionItem.Date, key))
+    if position < len(_byDate) and _byDate[position] == (actionItem.Date, key):
+        del _byDate[position]
+
+
+def load() -> dict:
+    """Loads the action item index from disk, once per process."""
+    global _notes, _items, _byOwner, _byProject, _byCompleted, _byDate
+
+    if _notes is not None:
+        return _items
+
+    _notes = {}
+    _items = {}
+    try:
+        with open(action_item_index_path(), "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == actionItemIndexVersion:
+            _notes = data["notes"]
+            _items = data["items"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Action item index '{action_item_index_path()}' could not be read, rebuilding it: {e}{myTerminal.RESET}"
+        )
+
+    # the lookups are cheap to rebuild and not saved
+    _byOwner = {}
+    _byProject = {}
+    _byCompleted = {False: set(), True: set()}
+    _byDate = sorted((actionItem.Date, key) for key, actionItem in _items.items())
+    for key, actionItem in _items.items():
+        _byOwner.setdefault(actionItem.Owner.strip().lower(), set()).add(key)
+        _byProject.setdefault(actionItem.project, set()).add(key)
+        _byCompleted[actionItem.Completed].add(key)
+    return _items
+
+
+def save() -> bool:
+    """Saves the action item index if it changed, returns False if it could not be saved."""
+    global _dirty
+
+    if not _dirty:
+        return True
+
+    try:
+        myNoteIndex.save_pickle(
+            action_item_index_path(),
+            {"version": actionItemIndexVersion, "notes": _notes, "items": _items},
+        )
+        _dirty = False
+        return True
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Action item index '{action_item_index_path()}' could not be saved: {e}{myTerminal.RESET}"
+        )
+        return False
+
+
+def _remove_note(notePathAndFile: str) -> None:
+    """Drops a note and its action items from the index."""
+    note = _notes.pop(notePathAndFile, None)
+    if note is None:
+        return
+    for noteRow in note[6]:
+        key = (notePathAndFile, noteRow)
+        _remove_lookups(key, _items.pop(key))
+
+
+def _index_note(notePathAndFile: str, mtime: int, size: int, noteId: str, title: str, project: str, date: str) -> None:
+    """(Re-)reads the action items of one note file."""
+    from . import Notes as myNotes
+
+    _remove_note(notePathAndFile)
+    try:
+        with open(notePathAndFile, "rb") as f:
+            noteBytes = f.read()
+    except OSError:
+        return  # removed, the next sync of the note index drops it
+
+    actionItems = []
+    if any(noteBytes.find(checkBox) >= 0 for checkBox in _checkBoxes):
+        wholeNote = noteBytes.decode("utf-8", errors="replace").replace("\r\n", "\n")
+        actionItems, _ = myActionItems.get_ActionItems_from_noteBody(
+            myNotes.get_note_body(wholeNote),
+            noteId,
+            title,
+            notePathAndFile,
+            project,
+            myNotes.get_note_body_row(wholeNote),
+            includeCompleted=True,
+        )
+
+    rows = []
+    for actionItem in actionItems:
+        key = (notePathAndFile, actionItem.noteRow)
+        if key in _items:
+            continue  # one action item per row
+        _items[key] = actionItem
+        _add_lookups(key, actionItem)
+        rows.append(actionItem.noteRow)
+    _notes[notePathAndFile] = (mtime, size, noteId, title, project, date, tuple(rows))
+
+
+def sync() -> int:
+    """
+    Brings the action item index up to date with the note index, only the notes whose
+    modified time or size changed are re-read.  The note index should be current, e.g.
+    after Notes.get_Notes_as_list or Notes.update_NoteIndex.
+
+    Returns:
+        int: The number of notes added, changed or removed.
+    """
+    global _syncedChangeCount, _dirty
+
+    load()
+    entries = myNoteIndex.load_index(includeContent=False)
+    if _syncedChangeCount == myNoteIndex.change_count():
+        return 0
+
+    changes = 0
+    for notePathAndFile in list(_notes.keys() - entries.keys()):
+        _remove_note(notePathAndFile)
+        changes += 1
+
+    for notePathAndFile, (mtime, size, metaData) in entries.items():
+        note = _notes.get(notePathAndFile)
+        if note is not None and note[:2] == (mtime, size):
+            continue
+
+        _index_note(
+            notePathAndFile,
+            mtime,
+            size,
+            metaData.get("id", ""),
+            metaData.get("title", ""),
+            metaData.get("project", ""),
+            metaData.get("date", ""),
+        )
+        changes += 1
+
+    _syncedChangeCount = myNoteIndex.change_count()
+    if changes:
+        _dirty = True
+        save()
+    return changes
+
+
+def refresh_note(notePathAndFile: str, saveIndex: bool = True) -> bool:
+    """
+    Re-reads the action items of a note that was just changed, e.g. by
+    ActionItem.Complete, without waiting for the note index to notice.
+
+    Args:
+        notePathAndFile (str): The full path and filename of the note.
+        saveIndex (bool): Save the index, False when more notes are refreshed in a row.
+
+    Returns:
+        bool: False if the note is not in the index (sync() will pick it up).
+    """
+    global _dirty
+
+    load()
+    note = _notes.get(notePathAndFile)
+    if note is None:
+        return False
+
+    try:
+        noteStat = os.stat(notePathAndFile)
+    except OSError:
+        _remove_note(notePathAndFile)
+    else:
+        _index_note(notePathAndFile, noteStat.st_mtime_ns, noteStat.st_size, *note[2:6])
+
+    _dirty = True
+    if saveIndex:
+        save()
+    return True
+
+
+def find_ActionItems(
+    project: str = None,
+    owner: str = None,
+    completed: bool = False,
+    dueFrom: str = None,
+    dueTo: str = None,
+) -> list:
+    """
+    Returns the action items that match every given criteria, ordered by project, note
+    date and row.  The index should be synced first.
+
+    Args:
+        project (str): Part of the project name, any case.
+        owner (str): The owner, any case.
+        completed (bool): True or False for completed or open action items, None for both.
+        dueFrom (str): The earliest due date (YYYY-MM-DD), inclusive.
+        dueTo (str): The latest due date, inclusive.  Without dueFrom the action items
+            without a date are included, as they sort before every date.
+
+    Returns:
+        list: The matching ActionItem objects.
+    """
+    load()
+    candidates = None
+
+    def narrow(keys):
+        nonlocal candidates
+        candidates = set(keys) if candidates is None else candidates & keys
+
+    if completed is not None:
+        narrow(_byCompleted[completed])
+    if owner:
+        narrow(_byOwner.get(owner.strip().lower(), set()))
+    if project:
+        projectKeys = set()
+        for projectName, keys in _byProject.items():
+            if project.lower() in projectName.lower():
+                projectKeys |= keys
+        narrow(projectKeys)
+    if dueFrom or dueTo:
+        first = 0 if not dueFrom else bisect_left(_byDate, (dueFrom,))
+        # (dueTo, (chr(0x10FFFF),)) sorts after every key of that date
+        last = len(_byDate) if not dueTo else bisect_right(_byDate, (dueTo, (chr(0x10FFFF),)))
+        narrow({key for _, key in _byDate[first:last]})
+
+    keys = _items.keys() if candidates is None else candidates
+    return [
+        _items[key]
+        for key in sorted(
+            keys,
+            key=lambda key: (_items[key].project.lower(), _notes[key[0]][5], key),
+        )
+    ]
+
+
+def overdue_ActionItems(project: str = None, owner: str = None, today: datetime.date = None) -> list:
+    """Returns the open action items due before today, see find_ActionItems."""
+    today = today or datetime.date.today()
+    # "0" sorts after "" and before every date, so the action items without a date are left out
+    return find_ActionItems(
+        project=project, owner=owner, dueFrom="0", dueTo=(today - datetime.timedelta(days=1)).isoformat()
+    )
+
+
+def due_this_week_ActionItems(project: str = None, owner: str = None, today: datetime.date = None) -> list:
+    """Returns the open action items due from Monday to Sunday of this week, see find_ActionItems."""
+    today = today or datetime.date.today()
+    monday = today - datetime.timedelta(days=today.weekday())
+    return find_ActionItems(
+        project=project, owner=owner, dueFrom=monday.isoformat(), dueTo=(monday + datetime.timedelta(days=6)).isoformat()
+    )
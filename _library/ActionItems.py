@@ -70,17 +70,10 @@ class ActionItem:
         self.Comment = comment
 
     def Complete(self):
-        try:
-            from . import Notes as myNotes
-
-            self.Completed = True
-            selectedNoteBody = myNotes.read_Note_from_path(self.note_path)
-            selectedNoteBody = selectedNoteBody.replace(
-                self.taskString, self.taskString.replace("[ ]", "[x]"), 1
-            )
-            myNotes.write_Note_to_path(self.note_path, selectedNoteBody)
-        except Exception as e:
-            print(f"Error marking action item as complete: {e}")
+        """Marks the action item as completed in its note, see complete_ActionItems."""
+        notCompleted, _ = complete_ActionItems([self])
+        if notCompleted:
+            print(f"Error marking action item as complete: '{self.taskString}' not found in '{self.note_path}'")
 
     def __str__(self):
         response = ""
@@ -120,6 +113,189 @@ class ActionItem:
         }
 
 
+def _find_ActionItem_row(lines: list, actionItem: ActionItem) -> int:
+    """
+    Returns the row (1-based) of the open action item in the lines of its note.  The
+    noteRow of the action item is checked first, if the note changed since the action
+    item was read the action item is looked for in the other rows and only found if it
+    is on exactly one of them.  Returns 0 if the action item is not found.
+    """
+    actionItemString = actionItem.taskString[3:].strip()
+
+    def isActionItemRow(row: int) -> bool:
+        line = lines[row - 1]
+        position = line.find("[ ]")
+        return position != -1 and line[position + 3 :].strip() == actionItemString
+
+    if 1 <= actionItem.noteRow <= len(lines) and isActionItemRow(actionItem.noteRow):
+        return actionItem.noteRow
+
+    rows = [row for row in range(1, len(lines) + 1) if isActionItemRow(row)]
+    return rows[0] if len(rows) == 1 else 0
+
+
+def complete_ActionItems(actionItems: list) -> tuple[list, list]:
+    """
+    Marks action items as completed, "[ ]" becomes "[x]" on the row of each action item.
+
+    The action items are grouped by note, every note is read once, each action item is
+    ticked on its noteRow after checking the row still holds it (so a task that appears
+    twice in a note gets the right row ticked) and the note is written once, to a
+    temporary file that then replaces the note.  A note that was not changed is not
+    written, a note with an action item that can not be found is still written with the
+    others.  The action item index is updated if it is used.
+
+    Args:
+        actionItems (list): The ActionItem objects to complete.
+
+    Returns:
+        tuple[list, list]: The action items that could not be completed, e.g. because the
+            note changed too much since they were read, and the ones that were skipped
+            because they were already completed.
+    """
+    from . import ActionItemIndex as myActionItemIndex
+    from . import NoteWriter as myNoteWriter
+
+    actionItemsByNote = {}
+    alreadyCompleted = []
+    for actionItem in actionItems:
+        if actionItem.Completed:
+            alreadyCompleted.append(actionItem)
+            continue
+        noteActionItems = actionItemsByNote.setdefault(actionItem.note_path, [])
+        # the same action item twice would tick a copy of it on another row, the row
+        # alone is not enough as action items without a known row all have row 0
+        if any(
+            (other.noteRow, other.taskString) == (actionItem.noteRow, actionItem.taskString)
+            for other in noteActionItems
+        ):
+            continue
+        noteActionItems.append(actionItem)
+
+    notCompleted = []
+    changedNotes = []
+    for notePath, noteActionItems in actionItemsByNote.items():
+        try:
+            # newline="" keeps the line endings of the note as they are
+            with open(notePath, "r", encoding="utf-8", newline="") as f:
+                lines = f.read().split("\n")
+        except OSError as e:
+            print(f"Error marking action items as complete in '{notePath}': {e}")
+            notCompleted.extend(noteActionItems)
+            continue
+
+        completedRows = []
+        for actionItem in noteActionItems:
+            row = _find_ActionItem_row(lines, actionItem)
+            if row == 0:
+                notCompleted.append(actionItem)
+                continue
+
+            lines[row - 1] = lines[row - 1].replace("[ ]", "[x]", 1)
+            actionItem.Completed = True
+            actionItem.noteRow = row
+            actionItem.taskString = actionItem.taskString.replace("[ ]", "[x]", 1)
+            completedRows.append(row)
+
+        if not completedRows:
+            continue
+
+        try:
+            # the line endings are in the lines already
+            myNoteWriter.write_text(notePath, "\n".join(lines), newline="")
+            changedNotes.append(notePath)
+        except OSError as e:
+            print(f"Error marking action items as complete in '{notePath}': {e}")
+            for actionItem in noteActionItems:
+                if actionItem.noteRow in completedRows:
+                    actionItem.Completed = False
+                    actionItem.taskString = actionItem.taskString.replace("[x]", "[ ]", 1)
+                    notCompleted.append(actionItem)
+
+    # the completed action items move to the completed ones in the index right away
+    if changedNotes and myActionItemIndex.exists():
+        for notePath in changedNotes:
+            myActionItemIndex.refresh_note(notePath, saveIndex=False)
+        myActionItemIndex.save()
+
+    return notCompleted, alreadyCompleted
+
+
+def get_ActionItems_from_noteBody(
+    noteBody: str,
+    note_id: str,
+    note_title: str,
+    note_path: str,
+    project: str,
+    firstRow: int = 1,
+    includeCompleted: bool = False,
+) -> tuple:
+    """
+    Scans a note body once, line by line, and returns the open action items it contains.
+
+    An action item is the text following the first "[ ]" on a line (or "[x]" for a
+    completed action item).  When the next line contains a <comment> tag the text up to
+    the closing </comment> tag is used as the action item comment.
+
+    Args:
+        noteBody (str): The note body to scan.
+        note_id (str): The id of the note the body belongs to.
+        note_title (str): The title of the note.
+        note_path (str): The full path and filename of the note.
+        project (str): The project of the note.
+        firstRow (int): The row in the note file of the first line of the body, used to
+            set the noteRow of the action items.
+        includeCompleted (bool): Also return the completed action items.
+
+    Returns:
+        tuple: (list of ActionItem, dict of action item string -> comment)
+    """
+    actionItems = []
+    actionItemsWithComments = {}
+
+    lines = noteBody.split("\n")
+    lineStart = 0
+    for row, line in enumerate(lines):
+        nextLineStart = lineStart + len(line) + 1
+        position = line.find("[ ]")
+        checkBox = "[ ]"
+        if position == -1 and includeCompleted:
+            position = line.lower().find("[x]")
+            checkBox = "[x]"
+        if position == -1:
+            lineStart = nextLineStart
+            continue
+
+        actionItemString = line[position + 3 :].strip()
+        actionItemComment = ""
+        if row + 1 < len(lines):
+            commentStart = lines[row + 1].find("<comment>")
+            if commentStart != -1:
+                commentStart = nextLineStart + commentStart + len("<comment>")
+                commentEnd = noteBody.find("</comment>", commentStart)
+                if commentEnd != -1:
+                    actionItemComment = noteBody[commentStart:commentEnd].strip()
+
+        # the first occurrence of a repeated action item wins, as it did before
+        if actionItemString not in actionItemsWithComments:
+            actionItemsWithComments[actionItemString] = actionItemComment
+
+        actionItem = ActionItem()
+        actionItem.LoadFromString(
+            note_id,
+            note_title,
+            note_path,
+            project,
+            f"{checkBox} {actionItemString}",
+            firstRow + row,
+            actionItemComment,
+        )
+        actionItems.append(actionItem)
+        lineStart = nextLineStart
+
+    return actionItems, actionItemsWithComments
+
+
 def __test__():
 
     testStrings = [
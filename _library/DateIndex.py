@@ -0,0 +1,128 @@
+"""
+Sorted index of the note dates, for date range searches.
+
+Note dates are kept as integer timestamps (seconds since 1970-01-01, in the time of the
+note, without a time zone) in one array in date order, with the note paths in the same
+order.  A date range is then two bisect lookups instead of comparing the date of every
+note, and the notes come back already sorted by date.  Timestamps do not depend on the
+datetime_format preference, every format Tools.datetime_fromString reads is understood.
+
+The index is built from the note index (see NoteIndex) and rebuilt when it changes.
+"""
+
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from heapq import merge
+
+from . import NoteIndex as myNoteIndex
+from . import Tools as myTools
+
+# notes whose date can not be read sort before every other note
+undatedTimestamp = -(2**62)
+latestTimestamp = 2**62
+
+_epoch = datetime.datetime(1970, 1, 1)
+
+_timestamps = array("q")
+_paths = []
+_indexedPaths = set()
+_indexedChangeCount = None
+
+
+def datetime_timestamp(dt: datetime.datetime) -> int:
+    """Returns the timestamp of a datetime (its time zone, if any, is ignored)."""
+    return int((dt.replace(tzinfo=None) - _epoch).total_seconds())
+
+
+@lru_cache(maxsize=None)
+def date_timestamp(date: str) -> int:
+    """
+    Returns the timestamp of a note date string, or undatedTimestamp if it is not a date.
+    """
+    date = (date or "").strip()
+    if not date:
+        return undatedTimestamp
+    try:
+        return datetime_timestamp(datetime.datetime.fromisoformat(date))
+    except ValueError:
+        isDate, dt = myTools.datetime_fromString(date)
+        return datetime_timestamp(dt) if isDate else undatedTimestamp
+
+
+def _date_order(note) -> tuple:
+    return date_timestamp(note.date), note.filePath
+
+
+def _update() -> None:
+    """Rebuilds the sorted dates when the note index changed."""
+    global _timestamps, _paths, _indexedPaths, _indexedChangeCount
+
+    entries = myNoteIndex.load_index(includeContent=False)
+    if _indexedChangeCount == myNoteIndex.change_count():
+        return
+
+    datedPaths = sorted(
+        (date_timestamp(metaData.get("date", "")), notePathAndFile)
+        for notePathAndFile, (mtime, size, metaData) in entries.items()
+    )
+    _timestamps = array("q", (timestamp for timestamp, _ in datedPaths))
+    _paths = [notePathAndFile for _, notePathAndFile in datedPaths]
+    _indexedPaths = set(_paths)
+    _indexedChangeCount = myNoteIndex.change_count()
+
+
+def notes_between(notes: list, startDate: datetime.datetime = None, endDate: datetime.datetime = None) -> list:
+    """
+    Returns the notes dated from startDate up to and including endDate, sorted by date.
+
+    Args:
+        notes (list): The notes to choose from.
+        startDate (datetime.datetime): The earliest date, None for no earliest date.
+        endDate (datetime.datetime): The latest date, None for no latest date.
+
+    Returns:
+        list: The notes in the date range, oldest first.
+    """
+    _update()
+    startTimestamp = undatedTimestamp if startDate is None else datetime_timestamp(startDate)
+    endTimestamp = latestTimestamp if endDate is None else datetime_timestamp(endDate)
+
+    first = bisect_left(_timestamps, startTimestamp)
+    last = bisect_right(_timestamps, endTimestamp)
+    if len(notes) < last - first:
+        # fewer notes to choose from than notes in the range, check them one by one
+        return sorted(
+            (note for note in notes if startTimestamp <= date_timestamp(note.date) <= endTimestamp),
+            key=_date_order,
+        )
+
+    notesByPath = {note.filePath: note for note in notes}
+    indexedNotes = [
+        notesByPath.pop(notePathAndFile)
+        for notePathAndFile in _paths[first:last]
+        if notePathAndFile in notesByPath
+    ]
+
+    # notes that are not in the index (e.g. outside the vault) are checked one by one
+    otherNotes = sorted(
+        (
+            note
+            for notePathAndFile, note in notesByPath.items()
+            if notePathAndFile not in _indexedPaths
+            and startTimestamp <= date_timestamp(note.date) <= endTimestamp
+        ),
+        key=_date_order,
+    )
+    if not otherNotes:
+        return indexedNotes
+
+    return list(
+        merge(indexedNotes, otherNotes, key=_date_order)
+    )
+
+
+def sort_by_date(notes: list) -> list:
+    """Returns the notes sorted by date, oldest first."""
+    return notes_between(notes)
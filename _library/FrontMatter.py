@@ -0,0 +1,104 @@
+"""
+Single pass front matter parser.
+
+The front matter block is tokenized once into a case-insensitive key/value map, the
+typed accessors then read from the map instead of re-scanning the front matter text
+with a new regular expression for every property.
+
+Notes.get_Note_from_path parses with this class instead of the per-key regular
+expression helpers in Notes (get_stringValue_from_frontMatter and friends, still used
+elsewhere).  The results differ from those helpers in these cases:
+
+    - keys are matched as a whole, 'id' is no longer read from 'sub id: 5' or from a
+      line like 'see id: 5' further down in another value
+    - every key is matched in any case, the date and keywords keys used to be matched
+      case-sensitively ('Start Date', 'Keywords')
+    - markdown emphasis (*) around any key is ignored, not only around the date keys
+    - an empty date ('start date:' with nothing after it) falls back to the created
+      date, it used to read the whole next line ('created: 2024-01-02') as the date,
+      or give an empty date (and the file date) on the last line
+    - a value right after the colon keeps its first character, 'title:Notes' is
+      'Notes' where it used to be 'otes'
+"""
+
+# front matter values that are treated as a boolean True
+trueValues = ("true", "t", "yes", "y", "positive")
+
+
+class FrontMatter:
+    """
+    Key/value view of a note front matter.  Keys are case-insensitive and any markdown
+    emphasis (*) around them is ignored, the first occurrence of a key wins.
+    """
+
+    def __init__(self, frontMatter: str):
+        self.text = frontMatter
+        self.values = {}
+
+        for line in frontMatter.splitlines():
+            key, separator, value = line.partition(":")
+            if separator == "":
+                continue  # not a key: value line
+
+            key = key.replace("*", "").strip().lower()
+            if key != "" and key not in self.values:
+                self.values[key] = value.strip()
+
+    def has_key(self, key: str) -> bool:
+        """Returns True if the front matter contains the key."""
+        return key.lower() in self.values
+
+    def get_stringValue(self, key: str, default: str = "") -> str:
+        """
+        Returns the value of a front matter key.
+
+        Args:
+            key (str): The front matter key, for example 'title' or 'sub Id'.
+            default (str): Returned when the key is not present.
+        """
+        return self.values.get(key.lower(), default)
+
+    def get_boolValue(self, key: str, default: bool = False) -> bool:
+        """
+        Returns a front matter value as a boolean, 'True', 'T', 'Yes', 'Y' and 'Positive'
+        in any case are True, anything else is False.
+
+        Args:
+            key (str): The front matter key, for example 'private'.
+            default (bool): Returned when the key is not present.
+        """
+        if not self.has_key(key):
+            return default
+
+        return self.get_stringValue(key).lower() in trueValues
+
+    def get_dateValue(self, key: str = "start date", fallbackKey: str = "created") -> str:
+        """
+        Returns a date from the front matter.  If the date is not found (or empty) the
+        fallbackKey date is returned, notes created with PKV always have a created date.
+
+        Args:
+            key (str): The front matter date key, for example 'start date' or 'end date'.
+            fallbackKey (str): The key to use when the date is not present.
+
+        Returns:
+            str: The date as written in the front matter, or an empty string.
+        """
+        date = self.get_stringValue(key).replace("*", "").strip()
+        if date == "" and fallbackKey:
+            date = self.get_stringValue(fallbackKey).replace("*", "").strip()
+
+        return date
+
+    def get_listValue(self, key: str = "keywords") -> list:
+        """
+        Returns a comma separated front matter value as a list, for example the keywords.
+
+        Args:
+            key (str): The front matter key.
+        """
+        return [
+            value.strip()
+            for value in self.get_stringValue(key).split(",")
+            if value.strip()
+        ]
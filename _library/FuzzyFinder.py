@@ -0,0 +1,297 @@
+"""
+Fuzzy finder over note titles, ids and project names, in the spirit of fzf.
+
+Every note is described by one line (title, id and project) and every character and
+character pair (bigram) of the lines points to the notes that have it.  A query is
+split into words and every word has to match, in the first of these ways that finds
+enough notes:
+
+    - the word appears as is, best at the start of a word of the line
+    - the letters of the word appear in order (e.g. "vndonb" in "vendor onboarding"),
+      better when they are consecutive or start words
+    - most of the bigrams of the word appear (a typo)
+
+A word as is always scores higher than its letters in order, which score higher than a
+typo, so the slower ways only run when the faster ones found too few notes.  The notes
+with all the bigrams or all the letters of a word are found by ANDing bitsets (an int
+with bit n set for note n) and only those are checked and scored.
+
+Only the meta data of the notes is used, the note bodies are never loaded.  The index
+of the whole vault is saved in the index folder (see NoteIndex) and reused as long as
+the titles, ids and projects of the notes did not change.
+"""
+
+import heapq
+import math
+import os
+import pickle
+from collections import Counter
+from operator import itemgetter
+
+from . import NoteIndex as myNoteIndex
+from . import Terminal as myTerminal
+
+fuzzyIndexVersion = 1
+fuzzyIndexFileName = "FuzzyIndex.pickle"
+
+# share of the bigrams of a query word a note needs to be found despite a typo
+minimumBigramShare = 0.6
+
+# cost of every character skipped between two letters of a query word
+gapCost = 0.1
+
+_wordSeparators = " _-/.#:()[]"
+
+
+def _bigrams(text: str) -> set:
+    """Returns the bigrams of a word or line, with a space before it to mark the start."""
+    text = " " + text
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _word_grams(word: str) -> set:
+    """
+    Returns the bigrams a line must have to contain a word anywhere, without the start
+    mark of _bigrams, or its letter for a one letter word.
+    """
+    if len(word) < 2:
+        return set(word)
+    return {word[i : i + 2] for i in range(len(word) - 1)}
+
+
+def _ordinals(bitset: int) -> list:
+    """Returns the numbers of the bits set in a bitset."""
+    # bin() puts the highest bit first, reversed the n-th character is bit n
+    return [ordinal for ordinal, bit in enumerate(bin(bitset)[:1:-1]) if bit == "1"]
+
+
+def _bitset(ordinals, count: int) -> int:
+    """Returns the bitset with the bits of the ordinals set, for count lines."""
+    bits = bytearray((count + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _subsequence_score(word: str, line: str) -> float:
+    """
+    Returns how well the letters of word appear in order in line, 0.0 if they do not.
+    Consecutive letters and letters at the start of a word of the line score higher and
+    every skipped character costs a little, of all the ways the letters appear in the
+    line the best scoring one counts.
+    """
+    # position of the letter in the line -> best score of the word up to that letter
+    previous = None
+    for letter in word:
+        current = {}
+        position = line.find(letter)
+        if previous is not None:
+            earlier = sorted(previous.items())
+            e = 0
+            bestEarlier = None
+        while position >= 0:
+            score = 1.0
+            if position == 0 or line[position - 1] in _wordSeparators:
+                score += 1.5  # start of a word
+            if previous is None:
+                current[position] = score
+            else:
+                # the best score of the previous letters anywhere before this position,
+                # less the skipped characters (kept as score + gapCost * position)
+                while e < len(earlier) and earlier[e][0] < position:
+                    earlierScore = earlier[e][1] + gapCost * earlier[e][0]
+                    if bestEarlier is None or earlierScore > bestEarlier:
+                        bestEarlier = earlierScore
+                    e += 1
+                if bestEarlier is not None:
+                    bestScore = bestEarlier - gapCost * (position - 1)
+                    consecutive = previous.get(position - 1)
+                    if consecutive is not None and consecutive + 1.0 > bestScore:
+                        bestScore = consecutive + 1.0
+                    current[position] = bestScore + score
+            position = line.find(letter, position + 1)
+        if not current:
+            return 0.0
+        previous = current
+    return max(previous.values())
+
+
+class FuzzyIndex:
+    """
+    Letter and bigram index of one line per item, built once and queried for every
+    keystroke.
+    """
+
+    def __init__(self, lines: list):
+        """
+        Args:
+            lines (list): The lower cased line of every item, the items are numbered in
+                this order.
+        """
+        self.lines = lines
+        # letter or bigram -> bitset of the lines that have it
+        grams = {}
+        for ordinal, line in enumerate(lines):
+            for gram in set(line) | _bigrams(line):
+                ordinals = grams.get(gram)
+                if ordinals is None:
+                    grams[gram] = [ordinal]
+                else:
+                    ordinals.append(ordinal)
+
+        self.bitsets = {gram: _bitset(ordinals, len(lines)) for gram, ordinals in grams.items()}
+
+    def _all_of(self, grams) -> int:
+        """Returns the bitset of the lines that have all the grams."""
+        bitset = -1
+        for gram in grams:
+            bitset &= self.bitsets.get(gram, 0)
+            if not bitset:
+                break
+        return bitset if bitset != -1 else 0
+
+    def _word_scores(self, word: str, limit: int, within: int) -> dict:
+        """
+        Returns ordinal -> score of the lines (in the within bitset) that match one
+        query word, trying the slower ways only while fewer than limit lines matched.
+        """
+        scores = {}
+        lines = self.lines
+        wordScore = 5.0 * len(word)
+        # the start of a word only adds to the score, it is not needed to match
+        for ordinal in _ordinals(self._all_of(_word_grams(word)) & within):
+            line = lines[ordinal]
+            position = line.find(word)
+            if position == 0 or (position > 0 and line[position - 1] in _wordSeparators):
+                # at the start of a word of the line, the earlier the better
+                scores[ordinal] = wordScore + 3.0 - position / 1000
+            elif position > 0:
+                scores[ordinal] = wordScore - position / 1000
+        if len(scores) >= limit:
+            return scores
+
+        for ordinal in _ordinals(self._all_of(set(word)) & within):
+            if ordinal not in scores:
+                score = _subsequence_score(word, self.lines[ordinal])
+                if score:
+                    scores[ordinal] = score
+        if len(scores) >= limit:
+            return scores
+
+        # a typo: count the bigrams of the word every line has
+        wordBigrams = _word_grams(word) if len(word) > 1 else set()
+        if not wordBigrams:
+            return scores
+        needed = max(1, math.ceil(len(wordBigrams) * minimumBigramShare))
+        counts = Counter()
+        for bigram in wordBigrams:
+            counts.update(_ordinals(self.bitsets.get(bigram, 0) & within))
+        for ordinal, count in counts.items():
+            if count >= needed and ordinal not in scores:
+                scores[ordinal] = count / len(wordBigrams) * len(word)
+        return scores
+
+    def find(self, query: str, limit: int = 20) -> list:
+        """
+        Returns the best matching lines, best first.
+
+        Args:
+            query (str): Words to find, every word must match.
+            limit (int): The most lines to return.
+
+        Returns:
+            list: (score, ordinal) tuples.
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+
+        # the longest (usually rarest) words first, the later words only look at the
+        # lines left
+        words.sort(key=lambda word: -len(word))
+        within = (1 << len(self.lines)) - 1
+        scores = {}
+        for i, word in enumerate(words):
+            wordScores = self._word_scores(word, limit, within)
+            if i == 0:
+                scores = wordScores
+            else:
+                scores = {
+                    ordinal: score + wordScores[ordinal]
+                    for ordinal, score in scores.items()
+                    if ordinal in wordScores
+                }
+            if not scores:
+                return []
+            within = _bitset(scores, len(self.lines))
+
+        best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        # shorter lines first among equal scores, the match is a bigger part of them
+        best.sort(key=lambda item: (-item[1], len(self.lines[item[0]])))
+        return [(score, ordinal) for ordinal, score in best]
+
+
+def note_line(note) -> str:
+    """Returns the lower cased line a note is found by: title, id and project."""
+    return f"{note.title} {note.id} {note.project}".lower()
+
+
+def fuzzy_index_path() -> str:
+    """Returns the full path of the saved fuzzy index of the vault."""
+    return os.path.join(myNoteIndex.index_folder(), fuzzyIndexFileName)
+
+
+def index_Notes(notes: list, save: bool = False) -> FuzzyIndex:
+    """
+    Returns a fuzzy index of the title, id and project of the notes.
+
+    Args:
+        notes (list): The notes, find() returns their position in this list.
+        save (bool): Reuse and save the index in the index folder, for the notes of
+            the whole vault.
+    """
+    lines = [note_line(note) for note in notes]
+    if not save:
+        return FuzzyIndex(lines)
+
+    try:
+        with open(fuzzy_index_path(), "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == fuzzyIndexVersion and data["index"].lines == lines:
+            return data["index"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"{myTerminal.WARNING}Fuzzy index '{fuzzy_index_path()}' could not be read, rebuilding it: {e}{myTerminal.RESET}")
+
+    index = FuzzyIndex(lines)
+    try:
+        myNoteIndex.save_pickle(fuzzy_index_path(), {"version": fuzzyIndexVersion, "index": index})
+    except Exception as e:
+        print(f"{myTerminal.WARNING}Fuzzy index '{fuzzy_index_path()}' could not be saved: {e}{myTerminal.RESET}")
+    return index
+
+
+def find_Notes(notes: list, index: FuzzyIndex, query: str, limit: int = 20) -> list:
+    """Returns the notes that best match a query, best first (see FuzzyIndex.find)."""
+    return [notes[ordinal] for _, ordinal in index.find(query, limit)]
+
+
+def __test__():
+
+    # a word inside a word of the line is still found as is and ranks before the
+    # letters of the word spread over the line
+    index = FuzzyIndex(["onboarding checklist", "b o a r d notes", "big onboarding"])
+    found = [index.lines[ordinal] for _, ordinal in index.find("board")]
+    print("find('board'): ", found)
+    assert found[-1] == "b o a r d notes", found
+
+    # a word at the start of a word of the line ranks before one inside a word
+    index = FuzzyIndex(["keyboard layout", "board meeting"])
+    found = [index.lines[ordinal] for _, ordinal in index.find("board")]
+    print("find('board'): ", found)
+    assert found == ["board meeting", "keyboard layout"], found
+
+
+if __name__ == "__main__":
+    __test__()
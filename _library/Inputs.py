@@ -4,9 +4,11 @@ Collect inputs from users for specific tasks.
 
 #from pandas import options
 
-from attr import has
 
+from . import DateIndex as myDateIndex
+from . import FuzzyFinder as myFuzzyFinder
 from . import Preferences as myPreferences
+from . import ProjectRegistry as myProjectRegistry
 from . import Tools as myTools
 from . import Terminal as myTerminal
 from .Tools import NoteData
@@ -172,21 +174,19 @@ def select_project_name_withDict(showNewProjectOption = True, showNoProjectOptio
     else:
         print(f"{myTerminal.WHITE}Available projects containing (*{projectFilterValue}*):{myTerminal.RESET}")
 
-    for filename in sorted(os.listdir(myPreferences.root_projects())):
-        if os.path.isdir(os.path.join(myPreferences.root_projects(), filename)):
-            projectConfig = myTools.get_ProjectConfig_as_dict(filename)
-            projectIsArchived = projectConfig.get("Archived", False)
-            if projectIsArchived and hideArchivedProjects:
-                continue  # Skip archived projects
+    for filename, projectConfig in myProjectRegistry.load_ProjectConfigs().items():
+        projectIsArchived = projectConfig.get("Archived", False)
+        if projectIsArchived and hideArchivedProjects:
+            continue  # Skip archived projects
+        else:
+            if projectFilterValue and projectFilterValue.lower() not in filename.lower():
+                continue  # Skip projects that don't match the filter
+            projectIndex += 1
+            if projectIndex%2==0:
+                print(f"\t{projectIndex:>2}. {filename}")
             else:
-                if projectFilterValue and projectFilterValue.lower() not in filename.lower():
-                    continue  # Skip projects that don't match the filter
-                projectIndex += 1
-                if projectIndex%2==0:
-                    print(f"\t{projectIndex:>2}. {filename}")
-                else:
-                    print(f"\t{myTerminal.GREY}{projectIndex:>2}. {filename}{myTerminal.RESET}")
-                projects[projectIndex] = filename
+                print(f"\t{myTerminal.GREY}{projectIndex:>2}. {filename}{myTerminal.RESET}")
+            projects[projectIndex] = filename
     
     selectedProject = input(f"Select (0-{projectIndex}): ")
 
@@ -203,6 +203,7 @@ def select_project_name_withDict(showNewProjectOption = True, showNoProjectOptio
             exit(1)
         newProjectPath = os.path.join(myPreferences.root_projects(), f"{newProjectName.strip()}")
         os.makedirs(newProjectPath, exist_ok=True)
+        myProjectRegistry.migrate_ProjectConfigs(newProjectName.strip())  # write the default project config
         selectedProject = projectIndex + 1
         projects[selectedProject] = f"{newProjectName.strip()}"
         print(f"{myTerminal.SUCCESS}New project created: {newProjectPath}{myTerminal.RESET}")
@@ -403,11 +404,13 @@ def select_recent_note(noteTypeContains = "",  showActionItems = False,
     numberOfNotesToShow = maxNumberOfNotesToShow
 
     if projectName is None or projectName == "":
-        allNotes = myTools.get_Notes_as_list(myPreferences.root_pkv())
+        allNotes = myTools.get_Notes_as_list(myPreferences.root_pkv(), lazy=True)
     else:
-        allNotes = myTools.get_Notes_as_list(os.path.join(myPreferences.root_projects(), projectName))  
+        allNotes = myTools.get_Notes_as_list(os.path.join(myPreferences.root_projects(), projectName), lazy=True)
         
-    sortedNotes = sorted(allNotes, key=lambda note: (note.project, note.date), reverse=True)
+    # only the notes of the last DaysToGoBack days, newest first within each project
+    recentNotes = myDateIndex.notes_between(allNotes, datetime.now() - timedelta(days=DaysToGoBack))
+    sortedNotes = sorted(recentNotes, key=lambda note: (note.project, myDateIndex.date_timestamp(note.date)), reverse=True)
 
     displayedNotes = []
 
@@ -423,8 +426,9 @@ def select_recent_note(noteTypeContains = "",  showActionItems = False,
     noteIndex = 0
     project = ""
     for note in sortedNotes:
-        if (noteTypeContains == "Any" or noteTypeContains.upper() == "ANY" 
-            or (noteTypeContains.upper() in note.type.upper()) and note.noteBody != "") and note.archived is False and note.date > (datetime.now() - timedelta(days=DaysToGoBack)).strftime(myPreferences.datetime_format()):
+        # check the meta data first so the note body is only loaded for recent notes
+        if note.archived is False and (noteTypeContains == "Any" or noteTypeContains.upper() == "ANY" 
+            or (noteTypeContains.upper() in note.type.upper()) and note.noteBody != ""):
             displayedNotes.append(note)
             noteIndex += 1
 
@@ -446,8 +450,14 @@ def select_recent_note(noteTypeContains = "",  showActionItems = False,
             if noteIndex > numberOfNotesToShow:
                 break  # Show only the first numberOfNotesToShow notes for brevity
         
-    selectedNoteId = input(f"\n{myTerminal.INPUTPROMPT}Select a note number or press Enter to skip: {myTerminal.RESET}").strip()
+    selectedNoteId = input(f"\n{myTerminal.INPUTPROMPT}Select a note number, type words of a title to find an older note or press Enter to skip: {myTerminal.RESET}").strip()
     
+    if selectedNoteId != "" and not selectedNoteId.isdigit():
+        # find the note among all the notes of the same type, not only the recent ones
+        candidateNotes = [note for note in allNotes if note.archived is False 
+                          and (noteTypeContains.upper() in ("", "ANY") or noteTypeContains.upper() in note.type.upper())]
+        return select_note_fuzzy(candidateNotes, selectedNoteId)
+
     if not selectedNoteId.isdigit() or int(selectedNoteId) < 1 or int(selectedNoteId) > noteIndex:
         return 0, NoteData()
 
@@ -455,18 +465,66 @@ def select_recent_note(noteTypeContains = "",  showActionItems = False,
     selectedNote = displayedNotes[int(selectedNoteId) - 1]
     return int(selectedNoteId), selectedNote
 
+def select_note_fuzzy(notes: List[NoteData] = None, query: str = "", numberOfNotesToShow: int = 20) -> tuple[int, NoteData]:
+    """
+    Find a note by a few letters of its title, id or project and let the user select it.
+    The words may be parts of words, letters in order (e.g. "vndonb") or have a typo,
+    see FuzzyFinder.  The user can type new words until the right note is listed.
+
+    Args:
+        notes (List[NoteData]): The notes to choose from, all the notes of the vault if None.
+        query (str): The words to find first, asked from the user if empty.
+        numberOfNotesToShow (int): The most notes to list.
+
+    Returns:
+        tuple[int, NoteData]: The number of the selected note in the list and the note,
+            0 and an empty NoteData if no note was selected.
+    """
+    if notes is None:
+        notes = myTools.get_Notes_as_list(myPreferences.root_pkv(), lazy=True)
+        fuzzyIndex = myFuzzyFinder.index_Notes(notes, save=True)
+    else:
+        fuzzyIndex = myFuzzyFinder.index_Notes(notes)
+
+    while True:
+        if query == "":
+            query = input(f"{myTerminal.INPUTPROMPT}Find a note (words of the title, id or project) or press Enter to skip: {myTerminal.RESET}").strip()
+            if query == "":
+                return 0, NoteData()
+
+        foundNotes = myFuzzyFinder.find_Notes(notes, fuzzyIndex, query, numberOfNotesToShow)
+        if not foundNotes:
+            print(f"{myTerminal.WARNING}No notes found for '{query}'.{myTerminal.RESET}")
+            query = ""
+            continue
+
+        print(f"\n{myTerminal.INPUTPROMPT}Notes matching '{query}':{myTerminal.RESET}")
+        for noteIndex, note in enumerate(foundNotes, start=1):
+            project = f" {myTerminal.GREY}[{note.project}]{myTerminal.RESET}" if note.project else ""
+            print(f"\t {noteIndex:>3}) {note.title[:60]:<60} ({note.date}){project}")
+
+        answer = input(f"\n{myTerminal.INPUTPROMPT}Select a note number, type other words to find or press Enter to skip: {myTerminal.RESET}").strip()
+        if answer == "":
+            return 0, NoteData()
+        if answer.isdigit():
+            if 1 <= int(answer) <= len(foundNotes):
+                return int(answer), foundNotes[int(answer) - 1]
+            print(f"{myTerminal.ERROR}Invalid note number.{myTerminal.RESET}")
+            continue
+        query = answer
+
 def generate_subId(selectedProject: str, noteType: str) -> str:
     """
     Generate a unique sub ID for a note based on the project name, note type, and current timestamp.
     """
     count = 0
     if selectedProject is None or selectedProject == "":
-        noteList = myTools.get_Notes_as_list(myPreferences.root_pkv(),True, includeArchivedProjects=False)
+        noteList = myTools.get_Notes_as_list(myPreferences.root_pkv(),True, includeArchivedProjects=False, lazy=True)
         for note in noteList:
             if note.type.endswith(noteType) and note.project == "":
                 count += 1
     else:
-        noteList = myTools.get_Notes_as_list(os.path.join(myPreferences.root_projects(), selectedProject),True, includeArchivedProjects=False)
+        noteList = myTools.get_Notes_as_list(os.path.join(myPreferences.root_projects(), selectedProject),True, includeArchivedProjects=False, lazy=True)
         for note in noteList:
             if note.type.endswith(noteType) and note.project == selectedProject:
                 count += 1
@@ -0,0 +1,527 @@
+"""
+Persistent index of parsed notes.
+
+The index keeps the fields of the NoteData objects produced by Notes.get_Note_from_path
+together with the modified time and size of the file they were parsed from.  When the
+notes are requested again only files whose modified time or size changed are re-parsed,
+everything else comes straight from the index.
+
+The cheap meta data fields (id, title, project, type, dates, tags, ...) and the content
+fields (note body, action items and backlinks) are stored in separate files so callers
+that only need the meta data never have to load the note bodies.  The content of notes
+that changed while only the meta data was loaded is saved in a small pending file next
+to the content index and merged into it the next time the content index is loaded.
+
+Once the whole vault has been scanned the index also answers "which file holds the note
+with this id (or file name)" so single note lookups read one file instead of the vault.
+
+The index is stored in a hidden folder in the root of the vault so it is ignored by
+the note scans and by version control (the vault .gitignore ignores hidden files).
+"""
+
+import os
+import pickle
+import tempfile
+
+from . import Preferences as myPreferences
+from . import Terminal as myTerminal
+
+# bump the version whenever NoteData changes shape so old indexes are discarded
+indexVersion = 3
+indexFolderName = ".pkvIndex"
+noteIndexFileName = "NoteIndex.pickle"
+noteContentFileName = "NoteContent.pickle"
+noteContentPendingFileName = "NoteContentPending.pickle"
+# while the content index is not loaded the content of up to this many changed notes is
+# saved next to it instead of rewriting it
+maxPendingContents = 500
+
+# notePathAndFile -> (st_mtime_ns, st_size, dict of NoteData meta data fields)
+_entries = {}
+# notePathAndFile -> (st_mtime_ns, st_size, dict of NoteData content fields)
+_contents = {}
+_loaded = False
+_contentsLoaded = False
+_dirty = False
+_contentsDirty = False
+# content of notes (re-)parsed while the content index was not loaded, merged into it
+# when it is loaded, so a meta data only load never reads the note bodies
+_pendingContents = {}
+# st_mtime_ns of the index files when they were last read or written by this process,
+# another process (e.g. the vault watcher) saving the index changes them
+_indexFileMtime = None
+_contentFileMtime = None  # of the content index and the pending content file
+# True once the whole vault has been scanned into the index
+_complete = False
+# note id -> notePathAndFile and note file name -> notePathAndFile, rebuilt from the
+# entries when they changed since the last lookup
+_idPaths = {}
+_fileNamePaths = {}
+_lookupsStale = True
+# incremented whenever entries are added, changed or removed, lets copies of the index
+# (see NoteStore) tell cheaply whether they are still current
+_changeCount = 0
+
+
+def index_folder() -> str:
+    """Returns the folder where the vault indexes are stored."""
+    return os.path.join(myPreferences.root_pkv(), indexFolderName)
+
+
+def index_path() -> str:
+    """Returns the full path of the note index file."""
+    return os.path.join(index_folder(), noteIndexFileName)
+
+
+def content_path() -> str:
+    """Returns the full path of the note content index file."""
+    return os.path.join(index_folder(), noteContentFileName)
+
+
+def pending_content_path() -> str:
+    """Returns the full path of the content saved while the content index was not loaded."""
+    return os.path.join(index_folder(), noteContentPendingFileName)
+
+
+def _content_files_mtime() -> tuple:
+    """Returns the st_mtime_ns of the content index and the pending content file."""
+    return _file_mtime(content_path()), _file_mtime(pending_content_path())
+
+
+def is_in_vault(target_dir: str) -> bool:
+    """
+    Returns True if the target directory is the vault root or one of its sub folders.
+    Only notes inside the vault are kept in the index.
+
+    Args:
+        target_dir (str): The directory to check.
+    """
+    vaultRoot = os.path.abspath(myPreferences.root_pkv())
+    target = os.path.abspath(target_dir)
+    return target == vaultRoot or target.startswith(vaultRoot + os.sep)
+
+
+def _file_mtime(filePath: str):
+    """Returns the st_mtime_ns of a file, or None if it does not exist."""
+    try:
+        return os.stat(filePath).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_index_file(filePath: str) -> dict:
+    """
+    Reads one of the index files, a missing, unreadable or outdated file returns an empty
+    dictionary.  Returns the whole file, the note entries are in "entries".
+    """
+    if not os.path.isfile(filePath):
+        return {}
+
+    try:
+        with open(filePath, "rb") as f:
+            data = pickle.load(f)
+
+        if (
+            data.get("version") == indexVersion
+            and data.get("root") == os.path.abspath(myPreferences.root_pkv())
+        ):
+            return data
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Note index '{filePath}' could not be read, rebuilding it: {e}{myTerminal.RESET}"
+        )
+
+    return {}
+
+
+def save_pickle(filePath: str, data) -> None:
+    """
+    Saves data as a pickle in the index folder.  The data is written to a temporary file
+    of its own first, so an interrupted save never leaves a truncated file behind and two
+    processes saving at the same time do not write into the same file; the last one to
+    finish wins.  Raises OSError or pickle errors if the file can not be saved.
+    """
+    os.makedirs(index_folder(), exist_ok=True)
+    fileHandle, tempPath = tempfile.mkstemp(
+        dir=index_folder(), prefix=os.path.basename(filePath) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fileHandle, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tempPath, filePath)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
+
+
+def _write_index_file(filePath: str, entries: dict, complete: bool = False) -> bool:
+    """Writes one of the index files, see save_pickle."""
+    try:
+        save_pickle(
+            filePath,
+            {
+                "version": indexVersion,
+                "root": os.path.abspath(myPreferences.root_pkv()),
+                "complete": complete,
+                "entries": entries,
+            },
+        )
+        return True
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Note index '{filePath}' could not be saved: {e}{myTerminal.RESET}"
+        )
+        return False
+
+
+def load_index(force: bool = False, includeContent: bool = True) -> dict:
+    """
+    Loads the note index from disk, once per process unless force is True or another
+    process saved the index since it was loaded (and there are no unsaved changes).
+
+    Args:
+        force (bool): Re-read the index files even if they were already loaded.
+        includeContent (bool): Also load the note bodies, action items and backlinks.
+
+    Returns:
+        dict: notePathAndFile -> (st_mtime_ns, st_size, meta data fields)
+    """
+    global _entries, _loaded, _dirty, _complete, _lookupsStale, _indexFileMtime, _changeCount
+
+    if (
+        force
+        or not _loaded
+        or (not _dirty and _file_mtime(index_path()) != _indexFileMtime)
+    ):
+        _indexFileMtime = _file_mtime(index_path())
+        data = _read_index_file(index_path())
+        _entries = data.get("entries", {})
+        _complete = data.get("complete", False)
+        _loaded = True
+        _dirty = False
+        _lookupsStale = True
+        _changeCount += 1
+
+    if includeContent:
+        load_content(force)
+
+    return _entries
+
+
+def load_content(force: bool = False) -> dict:
+    """
+    Loads the note content index from disk, once per process unless force is True or
+    another process saved it since it was loaded (and there are no unsaved changes).
+
+    Returns:
+        dict: notePathAndFile -> (st_mtime_ns, st_size, content fields)
+    """
+    global _contents, _contentsLoaded, _contentsDirty, _contentFileMtime
+
+    if (
+        force
+        or not _contentsLoaded
+        or (not _contentsDirty and _content_files_mtime() != _contentFileMtime)
+    ):
+        _contentFileMtime = _content_files_mtime()
+        _contents = _read_index_file(content_path()).get("entries", {})
+        savedPending = _read_index_file(pending_content_path()).get("entries", {})
+        _contents.update(savedPending)
+        _contentsLoaded = True
+        # the next save merges the pending content into the content index
+        _contentsDirty = bool(savedPending)
+
+    if _pendingContents:
+        _contents.update(_pendingContents)
+        _pendingContents.clear()
+        if _loaded:
+            # drop the content of notes removed while the content index was not loaded
+            for notePathAndFile in _contents.keys() - _entries.keys():
+                del _contents[notePathAndFile]
+        _contentsDirty = True
+
+    return _contents
+
+
+def save_index() -> bool:
+    """
+    Saves the parts of the note index that changed since they were loaded.
+
+    Returns:
+        bool: True if the index is up to date on disk, False otherwise.
+    """
+    global _dirty, _contentsDirty, _indexFileMtime, _contentFileMtime
+
+    success = True
+    if _dirty:
+        if _write_index_file(index_path(), _entries, _complete):
+            _dirty = False
+            _indexFileMtime = _file_mtime(index_path())
+        else:
+            success = False
+
+    if _pendingContents:
+        # add the changed notes to the pending content instead of reading and rewriting
+        # the content index, until there are too many of them
+        savedPending = _read_index_file(pending_content_path()).get("entries", {})
+        savedPending.update(_pendingContents)
+        savedPending = {
+            notePathAndFile: entry for notePathAndFile, entry in savedPending.items() if notePathAndFile in _entries
+        }
+        if len(savedPending) > maxPendingContents:
+            load_content()  # merges the pending content, saved below
+        elif _write_index_file(pending_content_path(), savedPending):
+            _pendingContents.clear()
+        else:
+            success = False
+
+    if _contentsDirty:
+        if _write_index_file(content_path(), _contents):
+            _contentsDirty = False
+            try:
+                os.remove(pending_content_path())  # merged into the content index
+            except FileNotFoundError:
+                pass
+            except OSError:
+                success = False
+            _contentFileMtime = _content_files_mtime()
+        else:
+            success = False
+
+    return success
+
+
+def get_entry(notePathAndFile: str, mtime: int, size: int):
+    """
+    Returns the indexed meta data fields of a note if the file has not changed since it
+    was indexed, otherwise None.
+
+    Args:
+        notePathAndFile (str): The full path and filename of the note.
+        mtime (int): The current st_mtime_ns of the file.
+        size (int): The current st_size of the file.
+    """
+    entry = _entries.get(notePathAndFile)
+    if entry is not None and entry[0] == mtime and entry[1] == size:
+        return entry[2]
+
+    return None
+
+
+def get_content(notePathAndFile: str, mtime: int, size: int):
+    """
+    Returns the indexed content fields of a note if the file has not changed since it
+    was indexed, otherwise None.  Loads the content index if needed.
+
+    Args:
+        notePathAndFile (str): The full path and filename of the note.
+        mtime (int): The current st_mtime_ns of the file.
+        size (int): The current st_size of the file.
+    """
+    entry = _pendingContents.get(notePathAndFile)
+    if entry is None:
+        entry = load_content().get(notePathAndFile)
+    if entry is not None and entry[0] == mtime and entry[1] == size:
+        return entry[2]
+
+    return None
+
+
+def set_entry(notePathAndFile: str, mtime: int, size: int, metaData: dict, content: dict) -> None:
+    """
+    Adds or replaces the index entry for a note.  The content only goes into the
+    content index right away if it is loaded, otherwise when it is loaded or saved.
+
+    Args:
+        notePathAndFile (str): The full path and filename of the note.
+        mtime (int): The st_mtime_ns of the file when it was parsed.
+        size (int): The st_size of the file when it was parsed.
+        metaData (dict): The meta data fields of the parsed note.
+        content (dict): The content fields of the parsed note.
+    """
+    global _dirty, _contentsDirty, _lookupsStale, _changeCount
+
+    _entries[notePathAndFile] = (mtime, size, metaData)
+    _dirty = True
+    _lookupsStale = True
+    _changeCount += 1
+    if _contentsLoaded:
+        _contents[notePathAndFile] = (mtime, size, content)
+        _contentsDirty = True
+    else:
+        _pendingContents[notePathAndFile] = (mtime, size, content)
+
+
+def get_entries_below(target_dir: str) -> list:
+    """
+    Returns the index entries of the notes below target_dir, in scan order.
+
+    Returns:
+        list[tuple]: (notePathAndFile, st_mtime_ns, st_size, meta data fields)
+    """
+    prefix = os.path.join(target_dir, "")
+    return [
+        (notePathAndFile, entry[0], entry[1], entry[2])
+        for notePathAndFile, entry in _entries.items()
+        if notePathAndFile.startswith(prefix)
+    ]
+
+
+def remove_missing(target_dir: str, seenPaths: set) -> None:
+    """
+    Drops index entries below target_dir that were not seen during the last scan,
+    i.e. notes that were deleted, moved or renamed.
+
+    Args:
+        target_dir (str): The directory that was scanned.
+        seenPaths (set): The note paths found during the scan.
+    """
+    global _dirty, _contentsDirty, _lookupsStale, _changeCount
+
+    prefix = os.path.join(target_dir, "")
+    for notePathAndFile in list(_entries.keys()):
+        if notePathAndFile.startswith(prefix) and notePathAndFile not in seenPaths:
+            del _entries[notePathAndFile]
+            _pendingContents.pop(notePathAndFile, None)
+            _dirty = True
+            _lookupsStale = True
+            _changeCount += 1
+
+    if _contentsLoaded:
+        for notePathAndFile in list(_contents.keys()):
+            if notePathAndFile.startswith(prefix) and notePathAndFile not in seenPaths:
+                del _contents[notePathAndFile]
+                _contentsDirty = True
+
+
+def remove_entry(notePathAndFile: str) -> None:
+    """
+    Drops the index entry of a single note, for example a note that was deleted.
+
+    Args:
+        notePathAndFile (str): The full path and filename of the note.
+    """
+    global _dirty, _contentsDirty, _lookupsStale, _changeCount
+
+    _pendingContents.pop(notePathAndFile, None)
+    if _entries.pop(notePathAndFile, None) is not None:
+        _dirty = True
+        _lookupsStale = True
+        _changeCount += 1
+
+    if _contentsLoaded and _contents.pop(notePathAndFile, None) is not None:
+        _contentsDirty = True
+
+
+def set_complete(orderedPaths: list = None) -> None:
+    """
+    Records that the whole vault was scanned into the index, from then on a note that is
+    not in the index does not exist and lookups can stop without walking the vault.
+
+    Args:
+        orderedPaths (list): The note paths in the order the scan found them, the index
+            entries are kept in that order so the index can stand in for a scan.
+    """
+    global _entries, _complete, _dirty
+
+    if not _complete:
+        _complete = True
+        _dirty = True
+
+    if orderedPaths is not None and list(_entries.keys()) != orderedPaths:
+        _entries = {
+            notePathAndFile: _entries[notePathAndFile]
+            for notePathAndFile in orderedPaths
+            if notePathAndFile in _entries
+        }
+        _dirty = True
+
+
+def change_count() -> int:
+    """
+    Returns a number that changes whenever index entries are added, changed or removed
+    in this process (including reloading the index after another process saved it).
+    """
+    return _changeCount
+
+
+def is_complete() -> bool:
+    """Returns True if the whole vault has been scanned into the index."""
+    load_index(includeContent=False)
+    return _complete
+
+
+def _refresh_lookups() -> None:
+    """Rebuilds the id and file name maps if the index changed since they were built."""
+    global _lookupsStale
+
+    if not _lookupsStale:
+        return
+
+    _idPaths.clear()
+    _fileNamePaths.clear()
+    for notePathAndFile, (mtime, size, metaData) in _entries.items():
+        # like a scan of the vault the first note with an id or file name wins
+        _idPaths.setdefault(metaData.get("id", ""), notePathAndFile)
+        _fileNamePaths.setdefault(metaData.get("fileName", ""), notePathAndFile)
+    _lookupsStale = False
+
+
+def get_path_from_id(noteId: str):
+    """
+    Returns the full path and filename of the indexed note with the given id, or None.
+
+    Args:
+        noteId (str): The id of the note.
+    """
+    load_index(includeContent=False)
+    _refresh_lookups()
+    return _idPaths.get(noteId)
+
+
+def get_path_from_fileName(noteFileName: str):
+    """
+    Returns the full path and filename of the indexed note with the given file name, or None.
+
+    Args:
+        noteFileName (str): The file name of the note, for example 20250101120000_note.md.
+    """
+    load_index(includeContent=False)
+    _refresh_lookups()
+    return _fileNamePaths.get(noteFileName)
+
+
+def get_identifiers() -> set:
+    """
+    Returns the ids and the file names (without the .md extension) of the indexed notes.
+    """
+    load_index(includeContent=False)
+    _refresh_lookups()
+    identifiers = set(_idPaths)
+    identifiers.update(os.path.splitext(fileName)[0] for fileName in _fileNamePaths)
+    return identifiers
+
+
+def clear_index() -> None:
+    """
+    Empties the index and deletes the index files so the next scan re-parses every note.
+    """
+    global _entries, _contents, _loaded, _contentsLoaded, _dirty, _contentsDirty
+    global _complete, _lookupsStale, _changeCount
+
+    _entries = {}
+    _contents = {}
+    _loaded = True
+    _contentsLoaded = True
+    _dirty = False
+    _contentsDirty = False
+    _pendingContents.clear()
+    _complete = False
+    _lookupsStale = True
+    _changeCount += 1
+    for filePath in (index_path(), content_path(), pending_content_path()):
+        if os.path.isfile(filePath):
+            os.remove(filePath)
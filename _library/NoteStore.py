@@ -0,0 +1,332 @@
+"""
+Optional SQLite store that mirrors the note index (see NoteIndex).
+
+The store keeps one row per note with its meta data, the tags and
+action items of each note in their own tables, and the title and body of every note in
+FTS5 full text tables.  With the trigram tokenizer (SQLite 3.34+) the full text tables
+answer "contains" searches of three or more characters by only checking the notes that
+have all the trigrams of the search, shorter searches and older SQLite versions fall
+back to scanning the stored text.
+
+The store is only used when the use_sqlite_store preference is "True".  It is a copy of
+the note index, brought up to date with sync() which only rewrites the rows of notes
+whose modified time or size changed, and like the index it can always be deleted.
+"""
+
+import os
+import sqlite3
+
+from . import NoteIndex as myNoteIndex
+from . import Preferences as myPreferences
+from . import Terminal as myTerminal
+
+# bump the version whenever the tables change so old stores are rebuilt
+storeVersion = 2
+storeFileName = "NoteStore.sqlite"
+# the trigram tokenizer needs at least three characters to match
+minimumTrigramLength = 3
+
+# full text table of each searchable column
+_textTables = {"title": "title_text", "body": "body_text"}
+
+_connection = None
+_fullTextKind = ""  # "trigram" or "scan"
+# NoteIndex.change_count() when the store was last synced, and the paths in the store
+# with their body
+_syncedChangeCount = None
+_storedPaths = set()
+
+
+def store_path() -> str:
+    """Returns the full path of the SQLite note store."""
+    return os.path.join(myNoteIndex.index_folder(), storeFileName)
+
+
+def is_enabled() -> bool:
+    """Returns True if the searches should use the SQLite note store."""
+    return myPreferences.use_sqlite_store()
+
+
+def _create_tables(connection: sqlite3.Connection) -> str:
+    """Creates the store tables, returns the kind of full text table created."""
+    connection.executescript(
+        """
+        CREATE TABLE settings (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE notes (
+            rowid INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL,
+            mtime INTEGER,
+            size INTEGER,
+            id TEXT,
+            fileName TEXT,
+            title TEXT,
+            project TEXT,
+            type TEXT,
+            date TEXT,
+            private INTEGER
+        );
+        CREATE INDEX notes_project ON notes (project);
+        CREATE INDEX notes_date ON notes (date);
+        CREATE TABLE tags (noteRowid INTEGER NOT NULL, tag TEXT NOT NULL);
+        CREATE INDEX tags_tag ON tags (tag);
+        CREATE INDEX tags_note ON tags (noteRowid);
+        CREATE TABLE action_items (
+            noteRowid INTEGER NOT NULL,
+            noteRow INTEGER,
+            owner TEXT,
+            date TEXT,
+            description TEXT,
+            completed INTEGER,
+            comment TEXT
+        );
+        CREATE INDEX action_items_note ON action_items (noteRowid);
+        CREATE INDEX action_items_owner ON action_items (owner);
+        """
+    )
+    try:
+        # detail=none keeps the trigram index small, it can not match phrases so a
+        # search matches all the trigrams of the text and then checks the candidates
+        for tableName in _textTables.values():
+            connection.execute(
+                f"CREATE VIRTUAL TABLE {tableName} USING fts5(text, tokenize='trigram', detail='none')"
+            )
+        fullTextKind = "trigram"
+    except sqlite3.OperationalError:
+        # no FTS5 or no trigram tokenizer in this SQLite build
+        for tableName in _textTables.values():
+            connection.execute(f"DROP TABLE IF EXISTS {tableName}")
+            connection.execute(
+                f"CREATE TABLE {tableName} (rowid INTEGER PRIMARY KEY, text TEXT)"
+            )
+        fullTextKind = "scan"
+
+    connection.executemany(
+        "INSERT INTO settings (name, value) VALUES (?, ?)",
+        [("version", str(storeVersion)), ("fullText", fullTextKind)],
+    )
+    connection.commit()
+    return fullTextKind
+
+
+def connect() -> sqlite3.Connection:
+    """
+    Opens the note store once per process, creating (or rebuilding an outdated) store.
+    """
+    global _connection, _fullTextKind
+
+    if _connection is not None:
+        return _connection
+
+    os.makedirs(myNoteIndex.index_folder(), exist_ok=True)
+    connection = sqlite3.connect(store_path())
+    # the same case folding as the Python searches, SQLite lower() only folds ASCII
+    connection.create_function("pylower", 1, lambda text: (text or "").lower(), deterministic=True)
+
+    settings = {}
+    try:
+        settings = dict(connection.execute("SELECT name, value FROM settings"))
+    except sqlite3.DatabaseError:
+        pass
+
+    if settings.get("version") != str(storeVersion):
+        connection.close()
+        if os.path.isfile(store_path()):
+            os.remove(store_path())
+        connection = sqlite3.connect(store_path())
+        connection.create_function("pylower", 1, lambda text: (text or "").lower(), deterministic=True)
+        settings["fullText"] = _create_tables(connection)
+
+    _connection = connection
+    _fullTextKind = settings.get("fullText", "scan")
+    return _connection
+
+
+def close() -> None:
+    """Closes the note store."""
+    global _connection, _syncedChangeCount
+
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+        _syncedChangeCount = None
+
+
+def _delete_rows(connection: sqlite3.Connection, rowids: list) -> None:
+    """Deletes the rows of the notes with the given rowids from every table."""
+    rows = [(rowid,) for rowid in rowids]
+    connection.executemany("DELETE FROM notes WHERE rowid = ?", rows)
+    connection.executemany("DELETE FROM tags WHERE noteRowid = ?", rows)
+    connection.executemany("DELETE FROM action_items WHERE noteRowid = ?", rows)
+    for tableName in _textTables.values():
+        connection.executemany(f"DELETE FROM {tableName} WHERE rowid = ?", rows)
+
+
+def sync() -> int:
+    """
+    Brings the store up to date with the note index, only the notes whose modified
+    time or size changed are rewritten.  The note index should be current, e.g. after
+    Notes.get_Notes_as_list or Notes.update_NoteIndex.
+
+    Returns:
+        int: The number of notes added, changed or removed.
+    """
+    global _syncedChangeCount, _storedPaths
+
+    connection = connect()
+    entries = myNoteIndex.load_index(includeContent=False)
+    if _syncedChangeCount == myNoteIndex.change_count():
+        return 0  # nothing changed in the index since the last sync
+
+    stored = {
+        path: (rowid, mtime, size)
+        for rowid, path, mtime, size in connection.execute(
+            "SELECT rowid, path, mtime, size FROM notes"
+        )
+    }
+
+    removedRowids = [stored[path][0] for path in stored.keys() - entries.keys()]
+    changedPaths = [
+        path
+        for path, entry in entries.items()
+        if path not in stored or stored[path][1:] != (entry[0], entry[1])
+    ]
+    _syncedChangeCount = myNoteIndex.change_count()
+    _storedPaths = set(entries.keys())
+    if not removedRowids and not changedPaths:
+        return 0
+
+    with connection:
+        _delete_rows(
+            connection,
+            removedRowids + [stored[path][0] for path in changedPaths if path in stored],
+        )
+
+        for path in changedPaths:
+            mtime, size, metaData = entries[path]
+            content = myNoteIndex.get_content(path, mtime, size)
+            if content is None:
+                # no body in the index for this version of the note, try again next sync;
+                # until then filter_Notes leaves the note to the caller to check
+                mtime = None
+                content = {}
+                _storedPaths.discard(path)
+
+            cursor = connection.execute(
+                """INSERT INTO notes (path, mtime, size, id, fileName, title, project, type, date, private)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    path,
+                    mtime,
+                    size,
+                    metaData.get("id", ""),
+                    metaData.get("fileName", ""),
+                    metaData.get("title", ""),
+                    metaData.get("project", ""),
+                    metaData.get("type", ""),
+                    metaData.get("date", ""),
+                    1 if metaData.get("private", False) else 0,
+                ),
+            )
+            rowid = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO tags (noteRowid, tag) VALUES (?, ?)",
+                [(rowid, tag) for tag in set(metaData.get("tags") or [])],
+            )
+            connection.executemany(
+                """INSERT INTO action_items (noteRowid, noteRow, owner, date, description, completed, comment)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (
+                        rowid,
+                        actionItem.noteRow,
+                        actionItem.Owner,
+                        actionItem.Date,
+                        actionItem.Description,
+                        1 if actionItem.Completed else 0,
+                        actionItem.Comment,
+                    )
+                    for actionItem in content.get("actionItems") or []
+                ],
+            )
+            connection.execute(
+                "INSERT INTO title_text (rowid, text) VALUES (?, ?)",
+                (rowid, metaData.get("title", "")),
+            )
+            connection.execute(
+                "INSERT INTO body_text (rowid, text) VALUES (?, ?)",
+                (rowid, content.get("noteBody", "")),
+            )
+
+    return len(removedRowids) + len(changedPaths)
+
+
+def _contains_clause(column: str, text: str) -> tuple[str, list]:
+    """
+    Returns the SQL condition (on notes.rowid) and parameters for "column contains
+    text", ignoring case the way str.lower() does.
+    """
+    tableName = _textTables[column]
+    if _fullTextKind == "trigram" and len(text) >= minimumTrigramLength:
+        # the full text index finds the notes that have every trigram of the text,
+        # only those are checked for the whole text
+        trigrams = sorted({text[i : i + 3] for i in range(len(text) - 2)})
+        query = " AND ".join('"' + trigram.replace('"', '""') + '"' for trigram in trigrams)
+        return (
+            f"notes.rowid IN (SELECT rowid FROM {tableName} WHERE {tableName} MATCH ? AND instr(pylower(text), ?) > 0)",
+            [query, text],
+        )
+
+    return (
+        f"notes.rowid IN (SELECT rowid FROM {tableName} WHERE instr(pylower(text), ?) > 0)",
+        [text],
+    )
+
+
+def find_paths(title: str = "", body: str = "") -> set:
+    """
+    Runs the title and body searches as one SQL query against the store.  Empty criteria
+    are ignored, the store should be synced first.  The project, type, tag, date and
+    private searches use the bitsets of the search session and the date index instead.
+
+    Args:
+        title (str): Part of the title, ignoring case.
+        body (str): Part of the note body, ignoring case.
+
+    Returns:
+        set: The full paths of the matching notes.
+    """
+    connection = connect()
+    conditions = []
+    parameters = []
+
+    for column, text in (("title", title), ("body", body)):
+        text = text.lower().strip()
+        if text:
+            condition, conditionParameters = _contains_clause(column, text)
+            conditions.append(condition)
+            parameters.extend(conditionParameters)
+
+    query = "SELECT path FROM notes"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    try:
+        return {path for (path,) in connection.execute(query, parameters)}
+    except sqlite3.Error as e:
+        print(f"{myTerminal.ERROR}Note store query failed: {e}{myTerminal.RESET}")
+        raise
+
+
+def filter_Notes(notes: list, **criteria) -> list:
+    """
+    Returns the notes that match the criteria of find_paths according to the store,
+    plus the notes the store does not know (e.g. notes outside the vault) so the caller
+    can check them the slow way.  Syncs the store first.
+    """
+    sync()
+    matchingPaths = find_paths(**criteria)
+    return [
+        note
+        for note in notes
+        if note.filePath in matchingPaths or note.filePath not in _storedPaths
+    ]
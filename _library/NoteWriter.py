@@ -0,0 +1,144 @@
+"""
+Crash safe writes of notes and other text files.
+
+A file is never written in place: the new content goes to a temporary file in the same
+folder, which then replaces the file in one step with os.replace.  A write that is
+interrupted (or a sync client like OneDrive picking up a half written file) leaves the
+old note as it was instead of a truncated one.  Content that is already in the file is
+not written at all, so the modified time of the note does not change and the note is
+not synced, indexed or committed again for nothing.
+
+Every write is flushed to disk (fsync) before it replaces the file.  Bulk changes can
+write many notes inside a batch(), the notes are then flushed together when the batch
+ends instead of one by one.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# flush every written file to disk before it replaces the old one
+fsyncWrites = True
+
+_batchDepth = 0
+_batchPaths = []  # files written in the current batch, flushed when it ends
+
+
+def _fsync_folder(folder: str) -> None:
+    """Flushes a folder entry (the replaced file name) to disk, where the OS allows it."""
+    try:
+        folderHandle = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where folders can not be opened
+    try:
+        os.fsync(folderHandle)
+    except OSError:
+        pass
+    finally:
+        os.close(folderHandle)
+
+
+def _is_unchanged(filePath: str, data: bytes) -> bool:
+    """Returns True if the file already holds exactly data."""
+    try:
+        if os.stat(filePath).st_size != len(data):
+            return False
+        with open(filePath, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def _umask() -> int:
+    """Returns the umask of the process, for the permissions of new files."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_text(filePath: str, text: str, newline: str = None) -> bool:
+    """
+    Writes text to a file through a temporary file and os.replace, creating the folder
+    if needed.  Raises OSError if the file can not be written, the old file is then left
+    as it was.
+
+    Args:
+        filePath (str): The full path and filename of the file.
+        text (str): The content of the file.
+        newline (str): How "\\n" is written, like open(): None for the line ending of
+            the operating system, "" to write the text as is.
+
+    Returns:
+        bool: True if the file was written, False if it already had this content.
+    """
+    if newline is None:
+        newline = os.linesep
+    if newline:
+        text = text.replace("\n", newline)
+    data = text.encode("utf-8")
+
+    if _is_unchanged(filePath, data):
+        return False
+
+    folder = os.path.dirname(os.path.abspath(filePath))
+    os.makedirs(folder, exist_ok=True)
+
+    # hidden, so the vault walker and watcher skip it
+    fileHandle, tempPath = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fileHandle, "wb") as f:
+            f.write(data)
+            if fsyncWrites and _batchDepth == 0:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            # keep the permissions of the file being replaced
+            os.chmod(tempPath, os.stat(filePath).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tempPath, 0o666 & ~_umask())
+        os.replace(tempPath, filePath)
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
+
+    if fsyncWrites:
+        if _batchDepth == 0:
+            _fsync_folder(folder)
+        else:
+            _batchPaths.append(filePath)
+    return True
+
+
+def flush() -> None:
+    """Flushes the files written in the current batch to disk."""
+    folders = set()
+    for filePath in _batchPaths:
+        try:
+            with open(filePath, "rb") as f:
+                os.fsync(f.fileno())
+        except OSError:
+            continue  # removed or replaced since
+        folders.add(os.path.dirname(os.path.abspath(filePath)))
+    for folder in folders:
+        _fsync_folder(folder)
+    _batchPaths.clear()
+
+
+@contextmanager
+def batch():
+    """
+    Writes inside the with block are still atomic but only flushed to disk at its end,
+    all together.  Batches can be nested, the outermost one flushes.
+    """
+    global _batchDepth
+
+    _batchDepth += 1
+    try:
+        yield
+    finally:
+        _batchDepth -= 1
+        if _batchDepth == 0:
+            flush()
@@ -2,26 +2,46 @@ from datetime import datetime
 import json
 import os
 import re
-import time
+import sys
 from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
 try:
+    from . import ActionItemIndex as myActionItemIndex
     from . import ActionItems as myActionItems
+    from . import NoteIndex as myNoteIndex
+    from . import NoteStore as myNoteStore
+    from . import NoteWriter as myNoteWriter
+    from . import TermIndex as myTermIndex
+    from . import TrigramIndex as myTrigramIndex
+    from .FrontMatter import FrontMatter
     from . import Preferences as myPreferences
+    from . import ProjectRegistry as myProjectRegistry
     from . import Terminal as myTerminal
     from . import Templates as myTemplates
     from . import Variables as myVariables
     from .Templates import read_Template
+    from . import VaultWalker as myVaultWalker
+    from . import VaultWatcher as myVaultWatcher
 
 except ImportError as ex:
     print(ex)
+    import ActionItemIndex as myActionItemIndex
     import ActionItems as myActionItems
+    import NoteIndex as myNoteIndex
+    import NoteStore as myNoteStore
+    import NoteWriter as myNoteWriter
+    import TermIndex as myTermIndex
+    import TrigramIndex as myTrigramIndex
+    from FrontMatter import FrontMatter
     import Preferences as myPreferences
+    import ProjectRegistry as myProjectRegistry
     import Terminal as myTerminal
     import Templates as myTemplates
     import Variables as myVariables
     from Templates import read_Template
+    import VaultWalker as myVaultWalker
+    import VaultWatcher as myVaultWatcher
 
 @dataclass
 class NoteData:
@@ -147,6 +167,151 @@ def blankNoteData() -> NoteData:
         actualDate=""
     )
 
+# NoteData fields that hold the parsed note content, everything else is meta data
+noteContentFields = ("noteBody", "backLinks", "actionItems", "actionItemsWithComments")
+
+
+def _has_field(note, name: str) -> bool:
+    """Returns True if the field is set on the note, without loading lazy content."""
+    try:
+        object.__getattribute__(note, name)
+        return True
+    except AttributeError:
+        return False
+
+
+class LazyNoteData(NoteData):
+    """
+    NoteData variant that only holds the note meta data (id, title, project, type, dates,
+    tags, ...).  The content fields noteBody, actionItems, actionItemsWithComments and
+    backLinks are parsed from the note file on first access and can be dropped again
+    with release() to free memory.
+    """
+
+    def __init__(self, **kwargs):
+        # unlike NoteData, do not default the content fields, they are loaded on demand
+        for field_name, field_value in kwargs.items():
+            setattr(self, field_name, field_value)
+        if not _has_field(self, "tags"):
+            self.tags = []
+        if not _has_field(self, "keywords"):
+            self.keywords = []
+
+    def __getattr__(self, name):
+        # only called when the attribute has not been set, i.e. content that is not loaded yet
+        if name in noteContentFields and _has_field(self, "filePath"):
+            self.load()
+            return object.__getattribute__(self, name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def is_loaded(self) -> bool:
+        """Returns True if the note content fields are currently held in memory."""
+        return all(_has_field(self, fieldName) for fieldName in noteContentFields)
+
+    def load(self) -> None:
+        """Parses the note file and fills in the content fields."""
+        fullNote = get_Note_from_path(
+            os.path.dirname(self.filePath), os.path.basename(self.filePath)
+        )
+        self.noteBody = getattr(fullNote, "noteBody", "")
+        self.backLinks = getattr(fullNote, "backLinks", [])
+        self.actionItems = getattr(fullNote, "actionItems", [])
+        self.actionItemsWithComments = getattr(fullNote, "actionItemsWithComments", {})
+
+    def release(self) -> None:
+        """Drops the content fields from memory, they are parsed again on next access."""
+        for fieldName in noteContentFields:
+            if _has_field(self, fieldName):
+                delattr(self, fieldName)
+
+
+# every NoteData field, in declaration order
+noteFields = tuple(NoteData.__dataclass_fields__)
+# values of the NoteData fields that have a class level default
+_noteFieldDefaults = {
+    fieldName: getattr(NoteData, fieldName)
+    for fieldName in noteFields
+    if hasattr(NoteData, fieldName)
+}
+# fields with a small set of values repeated across the vault, stored once
+_internedFields = ("type", "typeSimple", "project", "author", "retention")
+
+
+class CompactNoteData(LazyNoteData):
+    """
+    Memory efficient LazyNoteData used for the notes returned by get_Notes_as_list.
+
+    The fields are stored in __slots__ instead of a per note __dict__ and the strings
+    repeated across the vault (project, type, author, tags, ...) are interned so every
+    note shares a single copy.  The attribute API is the same as NoteData, content
+    fields that were not provided are loaded on first access like LazyNoteData.
+    """
+
+    __slots__ = noteFields
+
+    def __init__(self, **kwargs):
+        for fieldName, fieldValue in _noteFieldDefaults.items():
+            setattr(self, fieldName, fieldValue)
+
+        for fieldName, fieldValue in kwargs.items():
+            if fieldName in _internedFields and type(fieldValue) is str:
+                fieldValue = sys.intern(fieldValue)
+            elif fieldName in ("tags", "keywords"):
+                fieldValue = [
+                    sys.intern(value) if type(value) is str else value
+                    for value in fieldValue
+                ]
+            setattr(self, fieldName, fieldValue)
+
+        if not _has_field(self, "tags"):
+            self.tags = []
+        if not _has_field(self, "keywords"):
+            self.keywords = []
+
+
+def release_Note_content(notes: list[NoteData]) -> None:
+    """
+    Drops the content fields of any LazyNoteData in the list from memory.
+
+    Args:
+        notes (list[NoteData]): The notes to release.
+    """
+    for note in notes:
+        if isinstance(note, LazyNoteData):
+            note.release()
+
+
+def _get_Note_fields(note: NoteData) -> dict:
+    """
+    Returns the fields set on a note, works for both the __dict__ and the __slots__ notes.
+    """
+    if isinstance(note, CompactNoteData):
+        return {
+            fieldName: object.__getattribute__(note, fieldName)
+            for fieldName in noteFields
+            if _has_field(note, fieldName)
+        }
+
+    return dict(vars(note))
+
+
+def _split_Note(note: NoteData) -> tuple[dict, dict]:
+    """
+    Splits a NoteData object into its meta data fields and its content fields.
+    """
+    metaData = {}
+    content = {}
+    for fieldName, fieldValue in _get_Note_fields(note).items():
+        if fieldName in noteContentFields:
+            content[fieldName] = fieldValue
+        else:
+            metaData[fieldName] = fieldValue
+
+    return metaData, content
+
+
 def _custom_serializer(obj):
     """Custom JSON serializer for objects that are not serializable by default"""
     if isinstance(obj, myActionItems.ActionItem):
@@ -163,17 +328,52 @@ def addLine(newString="") -> str:
 
 
 # == main functions to open notes by id or file name ===
+def _get_indexed_Note(notePathAndFile: str):
+    """
+    Returns the note stored in notePathAndFile, from the note index if the file did not
+    change since it was indexed, otherwise the file is parsed and the index updated.
+    Returns None if the file no longer exists.
+    """
+    try:
+        noteStat = os.stat(notePathAndFile)
+    except OSError:
+        myNoteIndex.remove_entry(notePathAndFile)
+        myNoteIndex.save_index()
+        return None
+
+    metaData = myNoteIndex.get_entry(
+        notePathAndFile, noteStat.st_mtime_ns, noteStat.st_size
+    )
+    if metaData is not None:
+        return CompactNoteData(**metaData)
+
+    note = get_Note_from_path(
+        os.path.dirname(notePathAndFile), os.path.basename(notePathAndFile)
+    )
+    metaData, content = _split_Note(note)
+    myNoteIndex.set_entry(
+        notePathAndFile, noteStat.st_mtime_ns, noteStat.st_size, metaData, content
+    )
+    myNoteIndex.save_index()
+    return note
+
+
 def get_Note_from_id(noteId: str) -> NoteData:
     """
-    Returns a NoteData object from a note Id.
+    Returns a NoteData object from a note Id.  The note is found through the note index,
+    only the note itself is read, the vault is scanned once if it was never indexed.
 
     Args:
         note id (str): The name of the note id.
     """
 
-    notes = get_Notes_as_list(myPreferences.root_pkv())
-    for note in notes:
-        if note.id == noteId:
+    if not myNoteIndex.is_complete():
+        get_Notes_as_list(myPreferences.root_pkv(), lazy=True)
+
+    notePathAndFile = myNoteIndex.get_path_from_id(noteId)
+    if notePathAndFile is not None:
+        note = _get_indexed_Note(notePathAndFile)
+        if note is not None and note.id == noteId:
             return note
 
     return NoteData()
@@ -181,15 +381,20 @@ def get_Note_from_id(noteId: str) -> NoteData:
 
 def get_Note_from_fileName(noteFileName: str) -> NoteData:
     """
-    Returns a NoteData object from a note file name.
+    Returns a NoteData object from a note file name.  The note is found through the note
+    index, only the note itself is read, the vault is scanned once if it was never indexed.
 
     Args:
         noteFileName (str): The name of the note file.
     """
 
-    notes = get_Notes_as_list(myPreferences.root_pkv())
-    for note in notes:
-        if note.fileName == noteFileName:
+    if not myNoteIndex.is_complete():
+        get_Notes_as_list(myPreferences.root_pkv(), lazy=True)
+
+    notePathAndFile = myNoteIndex.get_path_from_fileName(noteFileName)
+    if notePathAndFile is not None:
+        note = _get_indexed_Note(notePathAndFile)
+        if note is not None:
             return note
 
     return NoteData()
@@ -276,7 +481,8 @@ def read_Note_from_path_and_file(notePath: str, noteFileName: str) -> str:
 
 def write_Note_to_path(notePathAndFile: str, noteContent: str) -> bool:
     """
-    Writes content to a note file.
+    Writes content to a note file, creating its folder if needed.  The note is replaced
+    in one step and left as it is if the content did not change, see NoteWriter.
 
     Args:
         notePathAndFile (str): The full path and filename of the note.
@@ -286,12 +492,7 @@ def write_Note_to_path(notePathAndFile: str, noteContent: str) -> bool:
         bool: True if the write was successful, False otherwise.
     """
     try:
-        if not os.path.exists(os.path.dirname(notePathAndFile)):
-            os.makedirs(os.path.dirname(notePathAndFile), exist_ok=True)
-            time.sleep(1)
-
-        with open(notePathAndFile, "w", encoding="utf-8") as f:
-            f.write(noteContent)
+        myNoteWriter.write_text(notePathAndFile, noteContent)
         return True
     except Exception as e:
         print(
@@ -351,9 +552,7 @@ def update_NoteBody(note: NoteData, newBody: str) -> bool:
     """
     try:
         newNoteContent = f"---\n{note.frontMatter}\n---\n\n{newBody}"
-
-        with open(os.path.join(note.filePath), "w", encoding="utf-8") as f:
-            f.write(newNoteContent)
+        myNoteWriter.write_text(note.filePath, newNoteContent)
 
     except Exception as e:
         print(
@@ -380,9 +579,7 @@ def update_NoteFrontMatterAndBody(
     """
     try:
         newNoteContent = f"---\n{newFrontMatter}\n---\n\n{newBody}"
-
-        with open(os.path.join(note.filePath), "w", encoding="utf-8") as f:
-            f.write(newNoteContent)
+        myNoteWriter.write_text(note.filePath, newNoteContent)
 
     except Exception as e:
         print(
@@ -404,9 +601,6 @@ def get_Note_from_path(notePath: str, noteFileName: str) -> NoteData:
     Returns:
         NoteData: The loaded note data object.
     """
-    # Import here to avoid circular dependency
-    from . import Tools as myTools
-
     notePathAndFile = os.path.join(notePath, noteFileName)
 
     if os.path.exists(notePathAndFile) is False:
@@ -424,65 +618,47 @@ def get_Note_from_path(notePath: str, noteFileName: str) -> NoteData:
     ).strftime("%Y-%m-%d %H:%M:%S")
 
     frontMatter = get_note_frontMatter(noteContent)
-    date = get_note_date_from_frontMatter(frontMatter, dateProperty="start date")
-    dateEnd = get_note_date_from_frontMatter(frontMatter, dateProperty="end date")
+    # tokenize the front matter once instead of re-scanning it for every property
+    frontMatterValues = FrontMatter(frontMatter)
+    date = frontMatterValues.get_dateValue("start date")
+    dateEnd = frontMatterValues.get_dateValue("end date")
 
     if date == "":
         # If no date in front matter, use the file's last modified date
         date = osFileDateTime
 
-    uniqueIdentifier = get_stringValue_from_frontMatter("id", frontMatter)
+    uniqueIdentifier = frontMatterValues.get_stringValue("id")
     if uniqueIdentifier == "":
         uniqueIdentifier = noteFileName.split(".")[0].split("_")[
             0
         ]  # Use the file name without extension as the unique identifier
 
-    project = get_stringValue_from_frontMatter("project", frontMatter)
+    project = frontMatterValues.get_stringValue("project")
     archivedProject = False
     if project != "":
-        # todo cache project configs to avoid multiple reads
-        projectConfig = myTools.get_ProjectConfig_as_dict(project)
+        projectConfig = myProjectRegistry.get_ProjectConfig(project)
         if projectConfig.get("Archived", False) is True:
             archivedProject = True
 
-    type = get_stringValue_from_frontMatter("type", frontMatter)
+    type = frontMatterValues.get_stringValue("type")
     if type == "":
         type = "unknown"
     
     typeSimple = type.replace(f"{project}-", "") if project != "" else type
     typeSimple = typeSimple.replace("project-", "")
 
-    title = get_stringValue_from_frontMatter("title", frontMatter)
+    title = frontMatterValues.get_stringValue("title")
     tags = get_tags_from_Text(noteContent)
-    keywords = get_listValue_from_frontMatter("keywords", frontMatter)
-    retention = get_stringValue_from_frontMatter("retention", frontMatter)
-    author = get_stringValue_from_frontMatter("author", frontMatter)
-    private = (
-        True
-        if get_stringValue_from_frontMatter("private", frontMatter).lower()
-        in ("true", "t", "yes", "y", "positive")
-        else False
-    )
-    shareWithStakeholders = (
-        True
-        if get_stringValue_from_frontMatter("shareWithStakeholders", frontMatter).lower()
-        in ("true", "t", "yes", "y", "positive")
-        else False
-    )
-    archived = (
-        True
-        if get_stringValue_from_frontMatter("archived", frontMatter) == "True"
-        else False
-    )
-    subId = get_stringValue_from_frontMatter("sub Id", frontMatter)
-    isMilestone = (
-        True
-        if get_stringValue_from_frontMatter("isMilestone", frontMatter).lower()
-        in ("true", "t", "yes", "y", "positive")
-        else False
-    )
-    plannedDate = get_stringValue_from_frontMatter("plannedDate", frontMatter)
-    actualDate = get_stringValue_from_frontMatter("actualDate", frontMatter)    
+    keywords = frontMatterValues.get_listValue("keywords")
+    retention = frontMatterValues.get_stringValue("retention")
+    author = frontMatterValues.get_stringValue("author")
+    private = frontMatterValues.get_boolValue("private")
+    shareWithStakeholders = frontMatterValues.get_boolValue("shareWithStakeholders")
+    archived = frontMatterValues.get_stringValue("archived") == "True"
+    subId = frontMatterValues.get_stringValue("sub Id")
+    isMilestone = frontMatterValues.get_boolValue("isMilestone")
+    plannedDate = frontMatterValues.get_stringValue("plannedDate")
+    actualDate = frontMatterValues.get_stringValue("actualDate")
 
     if title == "" or title is None:
         title = uniqueIdentifier
@@ -490,62 +666,16 @@ def get_Note_from_path(notePath: str, noteFileName: str) -> NoteData:
     body = get_note_body(noteContent)
     backLinks = get_note_backlinks(noteContent)
     hasActionItems = True if "[ ]" in body else False
-    actionItems = []
-    actionItemsWithComments = {}
-    for actionItemString in re.findall(
-        r"\[ \](.*)", body
-    ):  # Find all action items in the note body
-        # Extract details that follow the action item until the next "- [" or blank line
-        action_item_pattern = re.escape(actionItemString)
-        actionItemComment = ""
-
-        # Find the position of this action item in the body
-        match = re.search(rf"\[ \]\s?{action_item_pattern}", body)
-        if match:
-            start_pos = match.end()
-            remaining_text = body[start_pos:]
-            nextLine = (
-                remaining_text.splitlines()[1].strip()
-                if len(remaining_text.splitlines()) > 1
-                else ""
-            )
-            if "<comment>" in nextLine:
-                # Extract comment from <comment></comment> tags if present
-                comment_match = re.search(
-                    r"<comment>(.*?)</comment>", remaining_text, re.DOTALL
-                )
-                actionItemComment = (
-                    comment_match.group(1).strip() if comment_match else ""
-                )
-            else:
-                actionItemComment = ""
-
-            actionItemsWithComments[actionItemString.strip()] = actionItemComment
-
-        actionItem = myActionItems.ActionItem()
-
-        # get the line number of the action item in the note body for reference
-        actionItemRow = 0
-        for line in body.splitlines():
-            if f"[ ] {actionItemString.strip()}" in line.strip():
-                # actionItemRow will be front matter rows + the line number of the action item in the body
-                actionItemRow = (
-                    len(frontMatter.splitlines())
-                    + 1
-                    + body.splitlines().index(line)
-                    + 3
-                )
-                break
-        actionItem.LoadFromString(
-            uniqueIdentifier,
-            title,
-            notePathAndFile,
-            project,
-            f"[ ] {actionItemString.strip()}",
-            actionItemRow,
-            actionItemComment,
-        )
-        actionItems.append(actionItem)
+
+    bodyRow = get_note_body_row(noteContent)
+    actionItems, actionItemsWithComments = myActionItems.get_ActionItems_from_noteBody(
+        body,
+        uniqueIdentifier,
+        title,
+        notePathAndFile,
+        project,
+        bodyRow,
+    )
 
     # Replace the dictionary with an instance of the Note dataclass
     note = NoteData(
@@ -582,43 +712,262 @@ def get_Note_from_path(notePath: str, noteFileName: str) -> NoteData:
     return note
 
 
+# parallel note loading, only worth starting worker processes for a larger number of notes
+parallelMinimumNotes = 200
+parallelChunkSize = 32
+
+
+def _parse_Note_in_worker(notePathAndFile: tuple[str, str]) -> tuple[Any, str]:
+    """
+    Process pool worker for get_Notes_as_list, returns the parsed note or the error message.
+    """
+    root, file = notePathAndFile
+    try:
+        return get_Note_from_path(root, file), ""
+    except Exception as e:
+        return None, str(e)
+
+
+def parse_Notes(
+    notePaths: list[tuple[str, str]],
+    parallel: bool = False,
+    chunkSize: int = 0,
+    maxWorkers: Any = None,
+) -> list[tuple[Any, str]]:
+    """
+    Parses notes, optionally spreading the work over a process pool.
+
+    Args:
+        notePaths (list[tuple[str, str]]): (directory, file name) of each note to parse.
+        parallel (bool): If True and there are at least parallelMinimumNotes notes, parse in a process pool.
+        chunkSize (int): Number of notes handed to a worker at a time, 0 uses parallelChunkSize.
+        maxWorkers (int): Maximum number of worker processes, None uses the number of CPUs.
+
+    Returns:
+        list[tuple[NoteData, str]]: The parsed note (or None) and an error message for each
+        path, in the same order as notePaths.
+    """
+    workerCount = maxWorkers if maxWorkers else (os.cpu_count() or 1)
+    if not parallel or workerCount < 2 or len(notePaths) < parallelMinimumNotes:
+        return [_parse_Note_in_worker(notePath) for notePath in notePaths]
+
+    # only imported when needed, the process pool machinery is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    # fork keeps the workers from re-importing the calling script where it is available
+    if "fork" in multiprocessing.get_all_start_methods():
+        mpContext = multiprocessing.get_context("fork")
+    else:
+        mpContext = multiprocessing.get_context()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workerCount, mp_context=mpContext) as executor:
+            return list(
+                executor.map(
+                    _parse_Note_in_worker,
+                    notePaths,
+                    chunksize=chunkSize if chunkSize > 0 else parallelChunkSize,
+                )
+            )
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Parallel note loading failed, loading notes one at a time: {e}{myTerminal.RESET}"
+        )
+        return [_parse_Note_in_worker(notePath) for notePath in notePaths]
+
+
+def _find_Notes(
+    target_dir: str, parallel: bool, chunkSize: int, lazy: bool, trustWatcher: bool = True
+) -> list[dict]:
+    """
+    Finds the notes below target_dir, takes them from the note index when possible,
+    parses new and changed notes and brings the index up to date.
+
+    Returns:
+        list[dict]: One dictionary per note file with the folder ("root"), the file name
+        ("file"), the note ("note", None if it could not be parsed), the parse error
+        ("error") and whether the note came from the index ("indexed").
+    """
+    useIndex = myNoteIndex.is_in_vault(target_dir)
+    if useIndex:
+        myNoteIndex.load_index(includeContent=not lazy)
+    seenPaths = {}
+
+    # while the vault watcher runs the index is kept up to date, it stands in for the
+    # walk of the vault; a note changed in the last poll interval (plus the debounce, see
+    # VaultWatcher) can still be served as it was
+    trustIndex = (
+        trustWatcher
+        and useIndex
+        and os.path.abspath(target_dir) == os.path.abspath(myPreferences.root_pkv())
+        and myNoteIndex.is_complete()
+        and myVaultWatcher.is_watching()
+    )
+    if trustIndex:
+        foundFiles = [
+            (os.path.dirname(notePathAndFile), os.path.basename(notePathAndFile), mtime, size)
+            for notePathAndFile, mtime, size, metaData in myNoteIndex.get_entries_below(target_dir)
+        ]
+    else:
+        foundFiles = (
+            (root, file, noteStat.st_mtime_ns, noteStat.st_size)
+            if noteStat is not None
+            else (root, file, None, None)
+            for root, file, noteStat in myVaultWalker.walk_Notes(target_dir)
+        )
+
+    # first pass: find the notes and take what we can from the index
+    foundNotes = []
+    notesToParse = []
+    for root, file, mtime, size in foundFiles:
+        foundNote = {"root": root, "file": file, "mtime": mtime, "size": size, "note": None, "error": "", "indexed": False}
+        try:
+            if useIndex and mtime is not None:
+                notePathAndFile = os.path.join(root, file)
+                seenPaths[notePathAndFile] = None
+                metaData = myNoteIndex.get_entry(notePathAndFile, mtime, size)
+                if metaData is not None and lazy:
+                    foundNote["note"] = CompactNoteData(**metaData)
+                elif metaData is not None:
+                    content = myNoteIndex.get_content(notePathAndFile, mtime, size)
+                    if content is not None:
+                        foundNote["note"] = CompactNoteData(**metaData, **content)
+                foundNote["indexed"] = foundNote["note"] is not None
+        except Exception:
+            pass  # the note will be parsed and report its own error
+
+        if foundNote["note"] is None:
+            if trustIndex:
+                # the index entry is not enough, index what is on disk now
+                try:
+                    noteStat = os.stat(os.path.join(root, file))
+                    foundNote["mtime"], foundNote["size"] = noteStat.st_mtime_ns, noteStat.st_size
+                except OSError:
+                    # deleted since the watcher last looked
+                    myNoteIndex.remove_entry(os.path.join(root, file))
+                    continue
+            notesToParse.append(foundNote)
+        foundNotes.append(foundNote)
+
+    # second pass: parse new and changed notes
+    parsedNotes = parse_Notes(
+        [(foundNote["root"], foundNote["file"]) for foundNote in notesToParse],
+        parallel=parallel,
+        chunkSize=chunkSize,
+    )
+    for foundNote, (note, error) in zip(notesToParse, parsedNotes):
+        foundNote["note"] = note
+        foundNote["error"] = error
+        if note is not None and useIndex and foundNote["mtime"] is not None:
+            metaData, content = _split_Note(note)
+            myNoteIndex.set_entry(
+                os.path.join(foundNote["root"], foundNote["file"]),
+                foundNote["mtime"],
+                foundNote["size"],
+                metaData,
+                content,
+            )
+            if lazy:
+                foundNote["note"] = CompactNoteData(**metaData)
+            else:
+                foundNote["note"] = CompactNoteData(**metaData, **content)
+
+    if useIndex and not trustIndex:
+        myNoteIndex.remove_missing(target_dir, seenPaths)
+        if os.path.abspath(target_dir) == os.path.abspath(myPreferences.root_pkv()):
+            myNoteIndex.set_complete(list(seenPaths))
+    if useIndex:
+        myNoteIndex.save_index()
+
+    return foundNotes
+
+
+def update_NoteIndex(parallel=None) -> int:
+    """
+    Brings the note index of the whole vault (and the SQLite note store, the term, the
+    trigram and the action item index when they are used) up to date without prompting
+    or returning the notes, used by the vault watcher and the pkv shell.
+
+    Returns:
+        int: The number of notes in the vault.
+    """
+    if parallel is None:
+        parallel = myPreferences.parallel_note_loading()
+
+    foundNotes = _find_Notes(
+        myPreferences.root_pkv(), parallel, 0, lazy=True, trustWatcher=False
+    )
+    if myNoteStore.is_enabled():
+        myNoteStore.sync()
+    if myTermIndex.exists():
+        myTermIndex.sync()
+    if myTrigramIndex.exists():
+        myTrigramIndex.sync()
+    if myActionItemIndex.exists():
+        myActionItemIndex.sync()
+    return len(foundNotes)
+
+
 def get_Notes_as_list(
-    target_dir: str, includePrivateNotes=True, includeArchivedProjects=True
+    target_dir: str,
+    includePrivateNotes=True,
+    includeArchivedProjects=True,
+    parallel=None,
+    chunkSize: int = 0,
+    lazy: bool = False,
 ) -> list[NoteData]:
     """
     Workhorse method to return a list of NoteData objects from the target directory.
+
+    Notes inside the vault are returned as CompactNoteData, a NoteData with __slots__
+    and interned strings, to keep large vaults small in memory.  With lazy=True only
+    the meta data is loaded and the note bodies, action items and backlinks are parsed
+    when first used.  Use it when only the id, title, project, type, dates or tags of
+    the notes are needed.
+
+    Notes inside the vault are served from the persistent note index (see NoteIndex),
+    only new or changed files are re-parsed.  While the vault watcher runs (see
+    VaultWatcher) the index is used as is and the vault is not walked at all.  Changed
+    files are parsed in a process pool when parallel is True, or when parallel is None
+    and the parallel_note_loading preference is set.  Notes are returned in the same
+    order either way.
     """
-    # Import here to avoid circular dependency
-    from . import Tools as myTools
+    if parallel is None:
+        parallel = myPreferences.parallel_note_loading()
+
+    foundNotes = _find_Notes(target_dir, parallel, chunkSize, lazy)
+
+    # one pass over the project configs instead of a lookup per note
+    archivedProjects = myProjectRegistry.get_archived_projects()
 
     noteList = []
-    for root, dirs, files in os.walk(target_dir, topdown=True):
-        for file in files:
-            try:
-                if (
-                    not file.startswith(".")
-                    and not file.startswith("_")
-                    and file.endswith(".md")
-                ):  # Skip hidden files and non markdown files
-                    note = get_Note_from_path(root, file)
-
-                    if note.private is True and includePrivateNotes is False:
-                        pass  # skip private notes if not including them
-                    elif note.project != "" and includeArchivedProjects is False:
-                        projectConfig = myTools.get_ProjectConfig_as_dict(note.project)
-                        if projectConfig.get("Archived", False) is True:
-                            pass  # skip notes from archived projects
-                        else:
-                            noteList.append(note)
-                    else:
-                        noteList.append(note)
-            except Exception as e:
-                print(
-                    f"{myTerminal.ERROR}Error processing note '{file}' in '{root}': {e}{myTerminal.RESET}"
-                )
-                input("Press Enter to continue...")
-                continue
-            
+    for foundNote in foundNotes:
+        note = foundNote["note"]
+        try:
+            if note is None:
+                raise Exception(foundNote["error"])
+
+            if foundNote["indexed"] and note.project != "":
+                # the project may have been archived since the note was indexed
+                note.archivedProject = note.project in archivedProjects
+
+            if note.private is True and includePrivateNotes is False:
+                pass  # skip private notes if not including them
+            elif note.project != "" and includeArchivedProjects is False:
+                if note.project in archivedProjects:
+                    pass  # skip notes from archived projects
+                else:
+                    noteList.append(note)
+            else:
+                noteList.append(note)
+        except Exception as e:
+            print(
+                f"{myTerminal.ERROR}Error processing note '{foundNote['file']}' in '{foundNote['root']}': {e}{myTerminal.RESET}"
+            )
+            input("Press Enter to continue...")
+            continue
+
     return noteList
 
 
@@ -756,42 +1105,90 @@ def get_pkv_tags() -> dict:
     return tags
 
 
-def get_Note_with_TODO(target_dir: str) -> list[NoteData]:
+def file_contains(notePathAndFile: str, marker: bytes) -> bool:
     """
-    Returns a dictionary of notes that contain TODO items.
-    value dictionary contains keys "notePathAndFile" and "frontMatter".
-    """
-    filteredNotes = []
-    for note in get_Notes_as_list(target_dir):
-        if "#TODO" in note.noteBody:
-            filteredNotes.append(note)
+    Returns True if the raw bytes of a file contain marker.  The file is read in one go
+    and not decoded or parsed, a quick check before parsing the notes that may match.
 
-    return filteredNotes
+    Args:
+        notePathAndFile (str): The full path and filename of the note.
+        marker (bytes): The UTF-8 encoded text to look for.
+    """
+    try:
+        with open(notePathAndFile, "rb") as f:
+            return f.read().find(marker) >= 0
+    except OSError:
+        return False
 
 
-def get_Note_with_INCOMPLETE(target_dir: str) -> list[NoteData]:
+def _get_Notes_containing(target_dir: str, marker: str) -> list[NoteData]:
     """
-    Returns a dictionary of notes that contain INCOMPLETE items.
+    Returns the notes below target_dir whose body contains marker.
+
+    The note files are scanned for the marker as raw bytes first (see file_contains),
+    most notes have no open items and are skipped without being parsed or even turned
+    into a NoteData.  The notes that have the marker somewhere are taken from the note
+    index (or parsed if they changed) and their body is checked.
     """
+    markerBytes = marker.encode("utf-8")
+    useIndex = myNoteIndex.is_in_vault(target_dir)
+    if useIndex:
+        myNoteIndex.load_index(includeContent=False)
+    archivedProjects = myProjectRegistry.get_archived_projects()
+
     filteredNotes = []
-    for note in get_Notes_as_list(target_dir):
-        if "#INCOMPLETE" in note.noteBody:
-            filteredNotes.append(note)
+    for root, file, noteStat in myVaultWalker.walk_Notes(target_dir):
+        notePathAndFile = os.path.join(root, file)
+        if noteStat is None or not file_contains(notePathAndFile, markerBytes):
+            continue
+
+        try:
+            metaData = None
+            if useIndex:
+                metaData = myNoteIndex.get_entry(notePathAndFile, noteStat.st_mtime_ns, noteStat.st_size)
+            if metaData is not None:
+                note = CompactNoteData(**metaData)
+                if note.project != "":
+                    # the project may have been archived since the note was indexed
+                    note.archivedProject = note.project in archivedProjects
+            else:
+                note = get_Note_from_path(root, file)
+                if useIndex:
+                    metaData, content = _split_Note(note)
+                    myNoteIndex.set_entry(notePathAndFile, noteStat.st_mtime_ns, noteStat.st_size, metaData, content)
+
+            if marker in note.noteBody:
+                filteredNotes.append(note)
+        except Exception as e:
+            print(
+                f"{myTerminal.ERROR}Error processing note '{file}' in '{root}': {e}{myTerminal.RESET}"
+            )
+
+    if useIndex:
+        myNoteIndex.save_index()
 
     return filteredNotes
 
 
-def get_Note_with_ActionItems(target_dir: str) -> list[NoteData]:
+def get_Note_with_TODO(target_dir: str) -> list[NoteData]:
     """
-    Returns a dictionary of notes that contain Action items.
-    value dictionary contains keys "notePathAndFile" and "frontMatter".
+    Returns a list of notes that contain TODO items.
     """
+    return _get_Notes_containing(target_dir, "#TODO")
+
+
+def get_Note_with_INCOMPLETE(target_dir: str) -> list[NoteData]:
+    """
+    Returns a list of notes that contain INCOMPLETE items.
+    """
+    return _get_Notes_containing(target_dir, "#INCOMPLETE")
 
-    filteredNotes = []
-    for note in get_Notes_as_list(target_dir):
-        if "[ ]" in note.noteBody:
-            filteredNotes.append(note)
 
+def get_Note_with_ActionItems(target_dir: str) -> list[NoteData]:
+    """
+    Returns a list of notes that contain open Action items, oldest first.
+    """
+    filteredNotes = _get_Notes_containing(target_dir, "[ ]")
     filteredNotes = sorted(filteredNotes, key=lambda item: item.date, reverse=False)
 
     return filteredNotes
@@ -812,11 +1209,11 @@ def get_Note_Last_Project_Note_ByType(
     """
     if projectName == "" or projectName is None:
         # if there is no project name, return notes from the root PKV
-        allNotes = get_Notes_as_list(myPreferences.root_pkv(), True)
+        allNotes = get_Notes_as_list(myPreferences.root_pkv(), True, lazy=True)
     else:
         # if there is a project name, only return notes for that project
         allNotes = get_Notes_as_list(
-            os.path.join(myPreferences.root_projects(), projectName), True
+            os.path.join(myPreferences.root_projects(), projectName), True, lazy=True
         )
 
     sortedNotes = sorted(
@@ -848,7 +1245,7 @@ def load_MostRecentProjectProgressNote(projectName: str) -> tuple[bool, NoteData
         tuple: A tuple containing a boolean indicating success and the NoteData object if found.
     """
 
-    allNotes = get_Notes_as_list(myPreferences.root_pkv())
+    allNotes = get_Notes_as_list(myPreferences.root_pkv(), lazy=True)
     sortedNotes = sorted(
         allNotes, key=lambda note: (note.project, note.date), reverse=True
     )
@@ -915,7 +1312,7 @@ def load_notes_from_json(file_path: str) -> List[NoteData]:
             notes_data = json.load(f)
 
         # Convert dictionaries back to Note objects
-        notes = [NoteData(**note_dict) for note_dict in notes_data]
+        notes = [CompactNoteData(**note_dict) for note_dict in notes_data]
 
         return notes
     except Exception as e:
@@ -967,8 +1364,6 @@ def clone_note(sourceNotePath) -> str:
     selectedDateTime = datetime.now()
     timestamp_full = selectedDateTime.strftime(myPreferences.datetime_format())
 
-    newFileName = myTools.generate_unique_identifier(timestamp_id, "", oldTitle) + ".md"
-
     newFrontMatter = frontMatter
     newFrontMatter = re.sub(
         r"id:\s*.*", f"id: {timestamp_id}", newFrontMatter
@@ -982,10 +1377,11 @@ def clone_note(sourceNotePath) -> str:
 
     newNoteContent = f"---\n{newFrontMatter}\n---\n\n{newBody}"
 
-    with open(os.path.join(notePath, newFileName), "w", encoding="utf-8") as f:
-        f.write(newNoteContent)
+    _, newNotePath = myTools.create_unique_note_file(
+        notePath, timestamp_id, "", oldTitle, newNoteContent
+    )
 
-    return os.path.join(notePath, newFileName)
+    return newNotePath
 
 
 # === Note Opening Functions ===
@@ -1053,6 +1449,23 @@ def get_note_body(wholeNote: str) -> str:
     return body
 
 
+def get_note_body_row(wholeNote: str) -> int:
+    """
+    Returns the row of the note file of the first line of get_note_body, so the rows of
+    the body can be matched with the rows of the file.
+
+    Args:
+        wholeNote (str): The content of the note.
+    """
+    # the body is stripped and starts with a blank line, the rows of the note file before
+    # the body text give the row of that blank line
+    frontMatter = get_note_frontMatter(wholeNote)
+    bodyStart = len(wholeNote) - len(
+        wholeNote[len(f"---\n{frontMatter}\n---") :].lstrip()
+    )
+    return wholeNote.count("\n", 0, bodyStart)
+
+
 def get_note_backlinks(noteBody: str) -> list:
     """
     Extracts backlinks from a note body.
@@ -1472,15 +1885,13 @@ def make_note_from_template(selectedProjectName: str, selectedTemplateName: str,
     output_filename = f"{uniqueIdentifier}.md"
     output_path = os.path.join(newNote_directory, output_filename)
 
-    if os.path.exists(output_path):
+    # Save the new note, an existing note is never overwritten
+    if myTools.create_note_file(output_path, note_Content):
+        print(f"{myTerminal.SUCCESS}Note created:{myTerminal.RESET} {output_path}")
+    else:
         print(
             f"\t\t{myTerminal.ERROR}A note with the unique identifier '{uniqueIdentifier}' already exists.{myTerminal.RESET}"
         )
-    else:
-        # Save the new note
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(note_Content)
-        print(f"{myTerminal.SUCCESS}Note created:{myTerminal.RESET} {output_path}")
 
     return output_path, note_Content, uniqueIdentifier
 
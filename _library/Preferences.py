@@ -1,7 +1,6 @@
 import json
 import os
 import sys
-from tkinter.messagebox import IGNORE
 
 try:
     from . import Terminal as myTerminal
@@ -9,8 +8,6 @@ try:
 except ImportError:
     import Terminal as myTerminal 
 
-myTerminal.clearTerminal()
-
 # group our preferences together in a directory
 # to avoid conflicts with other applications
 applicationNameRoot = "DNDG"
@@ -40,12 +37,15 @@ _exampleEmptyPreferences = {
     "include_backlinks_to_DailyJournal": "True",  # set to true if the add new note commands should include backlinks to the daily journal note, set to false if the author does not want backlinks to the daily journal
     "automatically_open_event_notes": "False",  # set to true if the add new note commands should automatically open the created note in the default editor, set to false if the author will open it manually
     "use_versioncontrol": "True",  # set to true if the PKV should use git for version control, set to false if the author does not want to use git
+    "parallel_note_loading": "False",  # set to true to parse changed notes on all CPU cores when the vault is loaded, set to false to parse them one at a time
+    "use_sqlite_store": "False",  # set to true to mirror the note index in a SQLite database with full text search and run note searches against it
     "author_name": "default",  # use default to use the system username, or provide a custom name to be used in notes
     "TemporaryOneNoteExportFolder": "C:\\tempOneNoteExport", #temporary folder for exporting OneNote pages
     "TemporarySharePointListCommentsPath": "/Users/david/temp/SharePointListComments.csv", #temporary folder for exporting SharePoint list comments
 }
 
 _preferences = {}
+_loaded = False
 
 # each OS might be saving preferences and docs in a different paths
 preferences_Path = ""
@@ -92,106 +92,139 @@ _include_backlinks_to_DailyJournal = False
 _automatically_open_event_notes = False
 _author_name = ""
 _use_versioncontrol = False
+_parallel_note_loading = False
+_use_sqlite_store = False
 _temporaryOneNoteExportFolder = ""
 _temporarySharePointListCommentsPath = ""
 
 def root_pkv() -> str:
     """Returns the documents subfolder for the pkv."""
+    load_preferences()
     return os.path.join(_documents_path, _pkv_baseFolderName)
 
 
 def root_attachments() -> str:
     """returns the attachments root."""
+    load_preferences()
     return os.path.join(root_pkv(), _attachment_root)
 
 
 def root_archive() -> str:
     """Returns soft delete location."""
+    load_preferences()
     return os.path.join(root_pkv(), _archive_root)
 
 
 def root_projects() -> str:
     """Returns the projects root."""
+    load_preferences()
     return os.path.join(root_pkv(), _projects_root)
 
 
 def root_templates() -> str:
     """Returns the templates root."""
+    load_preferences()
     return os.path.join(_template_path)
 
 
 def timestamp_id_format() -> str:
     """Returns the timestamp format for IDs."""
+    load_preferences()
     return _timestamp_id_format
 
 
 def datetime_format() -> str:
     """Returns the datetime format for display."""
+    load_preferences()
     return _datetime_format
 
 
 def date_format() -> str:
     """Returns the date format for display."""
+    load_preferences()
     return _date_format
 
 
 def documents_path() -> str:
     """Returns the path to the documents directory."""
+    load_preferences()
     return _documents_path
 
 
 def attachmentPickUp_path() -> str:
     """Returns the path to the attachment pickup directory."""
+    load_preferences()
     return _attachmentPickUp_path
 
 
 def screenCapture_Path() -> str:
     """Returns the path to the attachment pickup directory."""
+    load_preferences()
     return _screenCaptures_path
 
 
 def default_editor() -> str:
     """Returns the default editor to use for opening files."""
+    load_preferences()
     return _preferences.get("default_editor", "code")  # Default to 'code' if not set
 
 
 def show_tag_prompt() -> bool:
     """Returns whether to show the tag prompt when creating a new note."""
+    load_preferences()
     return _show_tag_prompt
 
 
 def automatically_open_event_notes() -> bool:
     """Returns whether to automatically open event notes in the default editor."""
+    load_preferences()
     return _automatically_open_event_notes
 
 def include_notes_in_DailyJournal() -> bool:
     """Returns whether to prompt to include the new note in the daily journal when creating a new note."""
+    load_preferences()
     return _include_notes_in_DailyJournal
 
 def include_backlinks_to_DailyJournal() -> bool:
     """Returns whether to include backlinks to the daily journal when creating new notes."""
+    load_preferences()
     return _include_backlinks_to_DailyJournal
 
 
 def author_name() -> str:
     """Returns the author name to use in notes."""
+    load_preferences()
     return _author_name
 
 
 def use_versioncontrol() -> bool:
     """Returns whether to use git for version control."""
+    load_preferences()
     return _use_versioncontrol
 
+def parallel_note_loading() -> bool:
+    """Returns whether changed notes should be parsed in parallel when the vault is loaded."""
+    load_preferences()
+    return _parallel_note_loading
+
+def use_sqlite_store() -> bool:
+    """Returns whether searches should run against the SQLite note store."""
+    load_preferences()
+    return _use_sqlite_store
+
 def temporaryOneNoteExportFolder() -> str:
     """Returns the temporary folder for exporting OneNote pages."""
+    load_preferences()
     return _temporaryOneNoteExportFolder
 
 def temporarySharePointListCommentsPath() -> str:
     """Returns the temporary path for exporting SharePoint list comments."""
+    load_preferences()
     return _temporarySharePointListCommentsPath
 
 def preferences() -> dict:
     """Returns the loaded preferences."""
+    load_preferences()
     return _preferences
 
 
@@ -206,154 +239,203 @@ def find_missing_preferences() -> list:
 preferences_Path = os.path.join(preferences_Path, applicationNameRoot)
 preferences_File_Path = os.path.join(preferences_Path, preferences_File)
 
-if not os.path.exists(preferences_Path):
-    print(f"Creating preferences directory at: {preferences_Path}")
-    os.makedirs(preferences_Path)
 
-if not os.path.exists(preferences_File_Path):
-    print(
-        f"{myTerminal.WARNING}Preferences file not found, creating a new one at: {preferences_File_Path}{myTerminal.RESET}"
-    )
-    with open(os.path.join(preferences_Path, preferences_File), "w") as file:
-        json.dump(_exampleEmptyPreferences, file, indent=4)
+def load_preferences(force: bool = False) -> dict:
+    """
+    Loads the preferences file, once per process unless force is True.  A missing
+    preferences file is created with the default values, missing keys are added to it
+    and missing vault folders are created.
 
-    print(
-        f"Default preferences file created. Please edit it to suit your needs with the {myTerminal.INFORMATION}Edit-Preferences{myTerminal.RESET} command."
-    )
-    for key, value in _exampleEmptyPreferences.items():
-        print(f"\t\t{key}: {value}")
-
-try:
-    with open(preferences_File_Path, "r") as file:
-        _preferences = json.load(file)
-        _temporaryOneNoteExportFolder = _preferences.get("TemporaryOneNoteExportFolder")
-        _temporarySharePointListCommentsPath = _preferences.get("TemporarySharePointListCommentsPath")
-        _pkv_baseFolderName = _preferences["pkv_root"]
-        _attachment_root = _preferences["attachments_root"]
-        _projects_root = _preferences["projects_root"]
-        _archive_root = _preferences["archive_root"]
-        _timestamp_id_format = _preferences["timestamp_id_format"]
-        _datetime_format = _preferences["datetime_format"]
-        _date_format = _preferences["date_format"]
-        _documents_path = _preferences["documents_path"]
-        if _documents_path == "default":
-            _documents_path = os_documents_Path
-
-        _author_name = _preferences.get("author_name", "default")
-        if _author_name == "default":
-            if sys.platform in ("linux", "linux2", "darwin"):
-                _author_name = os.getenv("USER", "default")
-            elif sys.platform in ("win32", "windows"):
-                _author_name = os.getenv("USERNAME", "default")
-            else:
-                _author_name = "default"
-
-        _template_path = (
-            os.path.join(os.getcwd(), "_templates")
-            if _preferences.get("template_path", "default") == "default"
-            else _preferences["template_path"]
-        )
-        if not os.path.exists(_template_path):
-            # if template path does not exist there is very little that these scripts can do
-            # so print an error message and exit
-            print(f"""{myTerminal.ERROR}Template path '{_template_path}' does not exist,
-                  consider creating it or editing your preferences.{myTerminal.RESET} """)
-            exit(1)
+    Called by every preference function, importing this module has no side effects.
 
+    Returns:
+        dict: The loaded preferences.
+    """
+    global _preferences, _loaded, _pkv_baseFolderName, _attachment_root, _projects_root
+    global _archive_root, _template_path, _timestamp_id_format, _datetime_format
+    global _date_format, _documents_path, _attachmentPickUp_path, _screenCaptures_path
+    global _show_tag_prompt, _include_notes_in_DailyJournal, _include_backlinks_to_DailyJournal
+    global _automatically_open_event_notes, _author_name, _use_versioncontrol
+    global _parallel_note_loading, _use_sqlite_store, _temporaryOneNoteExportFolder
+    global _temporarySharePointListCommentsPath
 
-        _show_tag_prompt = (
-            _preferences.get("show_tag_prompt", "False").upper() == "TRUE"
-        )
-        _automatically_open_event_notes = (
-            _preferences.get("automatically_open_event_notes", "False").upper()
-            == "TRUE"
-        )
+    if _loaded and not force:
+        return _preferences
+    _loaded = True
 
-        _attachmentPickUp_path = _preferences["attachmentPickUp_path"]
-        if _attachmentPickUp_path in ("default", ""):
-            if sys.platform in ("linux", "linux2", "darwin"):
-                _attachmentPickUp_path = os.path.expanduser("~/Downloads")
-            elif sys.platform in ("win32", "windows"):
-                _attachmentPickUp_path = os.path.join(
-                    os.environ.get("USERPROFILE", ""), "Downloads"
-                )
-            else:
-                _attachmentPickUp_path = ""
-
-        if not os.path.exists(_attachmentPickUp_path):
-            print(f"""{myTerminal.ERROR}Attachment pickup path '{_attachmentPickUp_path}' does not exist,
-                  consider creating it or editing your preferences.{myTerminal.RESET} """)
 
-        _screenCaptures_path = _preferences["screenCapture_path"]
-        if _screenCaptures_path in ("default", ""):
-            if sys.platform in ("linux", "linux2", "darwin"):
-                _screenCaptures_path = os.path.expanduser("~/Pictures/ScreenShots")
-            elif sys.platform in ("win32", "windows"):
-                _screenCaptures_path = os.path.join(
-                    os.environ.get("USERPROFILE", ""), "Pictures", "Screenshots"
-                )
-            else:
-                _screenCaptures_path = ""
-
-        if not os.path.exists(_screenCaptures_path):
-            print(f"""{myTerminal.ERROR}Screen capture pickup path '{_screenCaptures_path}' does not exist,
-                  consider creating it or editing your preferences.{myTerminal.RESET} """)
+    if not os.path.exists(preferences_Path):
+        print(f"Creating preferences directory at: {preferences_Path}")
+        os.makedirs(preferences_Path)
 
-        _use_versioncontrol = (
-            _preferences.get("use_versioncontrol", "True").upper() == "TRUE"
-        )
-
-        _include_notes_in_DailyJournal = (
-            _preferences.get("include_notes_in_DailyJournal", "True").upper() == "TRUE"
-        )
-
-        _include_backlinks_to_DailyJournal = (
-            _preferences.get("include_backlinks_to_DailyJournal", "True").upper() == "TRUE"
+    if not os.path.exists(preferences_File_Path):
+        print(
+            f"{myTerminal.WARNING}Preferences file not found, creating a new one at: {preferences_File_Path}{myTerminal.RESET}"
         )
+        with open(os.path.join(preferences_Path, preferences_File), "w") as file:
+            json.dump(_exampleEmptyPreferences, file, indent=4)
 
-    # print(f"{len(_preferences)} preferences loaded successfully")
-
-    # Check for missing keys and add defaults if needed
-    missing_keys = find_missing_preferences()
-    if missing_keys:
         print(
-            f"{myTerminal.WARNING}Missing preference keys found. Adding defaults...{myTerminal.RESET}"
+            f"Default preferences file created. Please edit it to suit your needs with the {myTerminal.INFORMATION}Edit-Preferences{myTerminal.RESET} command."
         )
-        for key in missing_keys:
-            default_value = _exampleEmptyPreferences[key]
-            _preferences[key] = default_value
-            print(f"  Added '{key}': {default_value}")
-
-        # Save the updated preferences back to the file
-        with open(preferences_File_Path, "w") as file:
-            json.dump(_preferences, file, indent=4)
-        print("Preferences file updated with missing keys.")
-
-except Exception as e:
-    print("Error loading preferences:", e)
-    sys.exit(1)
+        for key, value in _exampleEmptyPreferences.items():
+            print(f"\t\t{key}: {value}")
+
+    try:
+        with open(preferences_File_Path, "r") as file:
+            _preferences = json.load(file)
+            _temporaryOneNoteExportFolder = _preferences.get("TemporaryOneNoteExportFolder")
+            _temporarySharePointListCommentsPath = _preferences.get("TemporarySharePointListCommentsPath")
+            _pkv_baseFolderName = _preferences["pkv_root"]
+            _attachment_root = _preferences["attachments_root"]
+            _projects_root = _preferences["projects_root"]
+            _archive_root = _preferences["archive_root"]
+            _timestamp_id_format = _preferences["timestamp_id_format"]
+            _datetime_format = _preferences["datetime_format"]
+            _date_format = _preferences["date_format"]
+            _documents_path = _preferences["documents_path"]
+            if _documents_path == "default":
+                _documents_path = os_documents_Path
+
+            _author_name = _preferences.get("author_name", "default")
+            if _author_name == "default":
+                if sys.platform in ("linux", "linux2", "darwin"):
+                    _author_name = os.getenv("USER", "default")
+                elif sys.platform in ("win32", "windows"):
+                    _author_name = os.getenv("USERNAME", "default")
+                else:
+                    _author_name = "default"
+
+            _template_path = (
+                os.path.join(os.getcwd(), "_templates")
+                if _preferences.get("template_path", "default") == "default"
+                else _preferences["template_path"]
+            )
+            if not os.path.exists(_template_path):
+                # if template path does not exist there is very little that these scripts can do
+                # so print an error message and exit
+                print(f"""{myTerminal.ERROR}Template path '{_template_path}' does not exist,
+                      consider creating it or editing your preferences.{myTerminal.RESET} """)
+                exit(1)
+
+
+            _show_tag_prompt = (
+                _preferences.get("show_tag_prompt", "False").upper() == "TRUE"
+            )
+            _automatically_open_event_notes = (
+                _preferences.get("automatically_open_event_notes", "False").upper()
+                == "TRUE"
+            )
+
+            _attachmentPickUp_path = _preferences["attachmentPickUp_path"]
+            if _attachmentPickUp_path in ("default", ""):
+                if sys.platform in ("linux", "linux2", "darwin"):
+                    _attachmentPickUp_path = os.path.expanduser("~/Downloads")
+                elif sys.platform in ("win32", "windows"):
+                    _attachmentPickUp_path = os.path.join(
+                        os.environ.get("USERPROFILE", ""), "Downloads"
+                    )
+                else:
+                    _attachmentPickUp_path = ""
+
+            _screenCaptures_path = _preferences["screenCapture_path"]
+            if _screenCaptures_path in ("default", ""):
+                if sys.platform in ("linux", "linux2", "darwin"):
+                    _screenCaptures_path = os.path.expanduser("~/Pictures/ScreenShots")
+                elif sys.platform in ("win32", "windows"):
+                    _screenCaptures_path = os.path.join(
+                        os.environ.get("USERPROFILE", ""), "Pictures", "Screenshots"
+                    )
+                else:
+                    _screenCaptures_path = ""
+
+            _use_versioncontrol = (
+                _preferences.get("use_versioncontrol", "True").upper() == "TRUE"
+            )
+
+            _parallel_note_loading = (
+                _preferences.get("parallel_note_loading", "False").upper() == "TRUE"
+            )
+
+            _use_sqlite_store = (
+                _preferences.get("use_sqlite_store", "False").upper() == "TRUE"
+            )
+
+            _include_notes_in_DailyJournal = (
+                _preferences.get("include_notes_in_DailyJournal", "True").upper() == "TRUE"
+            )
+
+            _include_backlinks_to_DailyJournal = (
+                _preferences.get("include_backlinks_to_DailyJournal", "True").upper() == "TRUE"
+            )
+
+        # print(f"{len(_preferences)} preferences loaded successfully")
+
+        # Check for missing keys and add defaults if needed
+        missing_keys = find_missing_preferences()
+        if missing_keys:
+            print(
+                f"{myTerminal.WARNING}Missing preference keys found. Adding defaults...{myTerminal.RESET}"
+            )
+            for key in missing_keys:
+                default_value = _exampleEmptyPreferences[key]
+                _preferences[key] = default_value
+                print(f"  Added '{key}': {default_value}")
+
+            # Save the updated preferences back to the file
+            with open(preferences_File_Path, "w") as file:
+                json.dump(_preferences, file, indent=4)
+            print("Preferences file updated with missing keys.")
+
+    except Exception as e:
+        print("Error loading preferences:", e)
+        sys.exit(1)
+
+    try:
+        if not os.path.exists(root_pkv()):
+            print(f"Creating PKV root directory at: {root_pkv()}")
+            os.makedirs(root_pkv())
+
+        if not os.path.exists(root_projects()):
+            print(f"Creating PKV project directory at: {root_projects()}")
+            os.makedirs(root_projects())
+
+        if not os.path.exists(root_attachments()):
+            print(f"Creating PKV attachments directory at: {root_attachments()}")
+            os.makedirs(root_attachments())
+
+        if not os.path.exists(root_archive()):
+            print(f"Creating PKV archive directory at: {root_archive()}")
+            os.makedirs(root_archive())
+
+
+    except Exception as e:
+        print("Error creating PKV directory:", e)
+        sys.exit(1)
 
-try:
-    if not os.path.exists(root_pkv()):
-        print(f"Creating PKV root directory at: {root_pkv()}")
-        os.makedirs(root_pkv())
+    return _preferences
 
-    if not os.path.exists(root_projects()):
-        print(f"Creating PKV project directory at: {root_projects()}")
-        os.makedirs(root_projects())
 
-    if not os.path.exists(root_attachments()):
-        print(f"Creating PKV attachments directory at: {root_attachments()}")
-        os.makedirs(root_attachments())
+def check_pickUp_paths() -> bool:
+    """
+    Warns about attachment and screen capture pickup paths that do not exist.
 
-    if not os.path.exists(root_archive()):
-        print(f"Creating PKV archive directory at: {root_archive()}")
-        os.makedirs(root_archive())
+    Returns:
+        bool: True if both paths exist.
+    """
+    load_preferences()
+    pathsExist = True
+    if not os.path.exists(_attachmentPickUp_path):
+        print(f"""{myTerminal.ERROR}Attachment pickup path '{_attachmentPickUp_path}' does not exist,
+                  consider creating it or editing your preferences.{myTerminal.RESET} """)
+        pathsExist = False
 
+    if not os.path.exists(_screenCaptures_path):
+        print(f"""{myTerminal.ERROR}Screen capture pickup path '{_screenCaptures_path}' does not exist,
+                  consider creating it or editing your preferences.{myTerminal.RESET} """)
+        pathsExist = False
 
-except Exception as e:
-    print("Error creating PKV directory:", e)
-    sys.exit(1)
+    return pathsExist
 
 
 def main():
@@ -0,0 +1,221 @@
+"""
+Registry of the project configurations (.ProjectConfig.json) in the projects folder.
+
+All project configs are loaded in one pass the first time a config is needed and kept
+for the rest of the process.  Each config remembers the modified time of its file and is
+re-read when the file changes, so edits made while a script runs are picked up.
+
+Reading a config never writes to the vault.  A config file that is missing keys (or is
+missing altogether) is completed in memory with the default values, writing those
+defaults back to the files is a separate, explicit step, see migrate_ProjectConfigs.
+"""
+
+import json
+import os
+
+from . import Preferences as myPreferences
+from . import Terminal as myTerminal
+
+projectConfigFileName = ".ProjectConfig.json"
+
+# projectName -> (st_mtime_ns of the config file or None if there is no file, config)
+_projectConfigs = {}
+_loaded = False
+
+
+def get_default_ProjectConfig(projectName: str) -> dict:
+    """
+    Returns the starting point for the configuration of a project.
+
+    Args:
+        projectName (str): The name of the project.
+    """
+    return {
+        "ProjectFolderName": f"{projectName}",
+        "ProjectName": f"{projectName}",
+        "Programs": [],
+        "Archived": False,
+        "Sync": False,
+        "PrivateShareFolder": "",
+        "PublicShareFolder": "",
+        "PublicShareFolderURL": "",
+        "TimeCode": "",
+        "ProjectManagementSoftwareURL": "",
+        "ProgressReportGroup": "",  #the group or name of the manager that will receive the weekly progress report
+        "Needs Weekly Progress Update": False,
+        "Needs Monthly Progress Update": False,
+        "TeamSharePointSiteURL": "",
+        "TeamSharePointBackLogListName": "Team Backlog",
+        "TeamSharePointBackLogListRowID": 0,
+        "OneNote_noteBookName": "",
+        "OneNote_sectionName": "",
+    }
+
+
+def get_ProjectConfig_path(projectName: str) -> str:
+    """Returns the full path of the configuration file of a project."""
+    return os.path.join(myPreferences.root_projects(), projectName, projectConfigFileName)
+
+
+def _config_mtime(configPath: str):
+    """Returns the st_mtime_ns of a config file, or None if the file does not exist."""
+    try:
+        return os.stat(configPath).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_ProjectConfig(projectName: str, configPath: str, mtime) -> dict:
+    """
+    Reads the configuration file of a project and completes it with the default values
+    of any missing keys.  A missing file returns the default configuration.
+    """
+    if mtime is None:
+        return get_default_ProjectConfig(projectName)
+
+    with open(configPath, "r", encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError:
+            print(
+                f"{myTerminal.ERROR}Error decoding JSON from {configPath}{myTerminal.RESET}"
+            )
+            return {}
+
+    _add_missing_keys(projectName, config)
+    return config
+
+
+def _add_missing_keys(projectName: str, config: dict) -> bool:
+    """
+    Adds the default value of every key missing from a project config.
+
+    Returns:
+        bool: True if any key was missing.
+    """
+    missingProjectConfigKey = False
+    for key, value in get_default_ProjectConfig(projectName).items():
+        if key not in config:
+            missingProjectConfigKey = True
+            config[key] = value
+
+    return missingProjectConfigKey
+
+
+def _refresh_ProjectConfig(projectName: str) -> dict:
+    """Returns the config of a project, re-reading the file if it changed."""
+    configPath = get_ProjectConfig_path(projectName)
+    mtime = _config_mtime(configPath)
+
+    cached = _projectConfigs.get(projectName)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    config = _read_ProjectConfig(projectName, configPath, mtime)
+    _projectConfigs[projectName] = (mtime, config)
+    return config
+
+
+def load_ProjectConfigs() -> dict:
+    """
+    Returns the configurations of all the projects, the first call reads every config
+    file, later calls only re-read the files that changed.
+
+    Returns:
+        dict: projectName -> project config, sorted by project name.
+    """
+    global _loaded
+
+    projectsRoot = myPreferences.root_projects()
+    projectNames = []
+    if os.path.isdir(projectsRoot):
+        with os.scandir(projectsRoot) as entries:
+            projectNames = sorted(entry.name for entry in entries if entry.is_dir())
+
+    # forget projects that were deleted or renamed
+    for projectName in list(_projectConfigs.keys()):
+        if projectName not in projectNames:
+            del _projectConfigs[projectName]
+
+    projectConfigs = {}
+    for projectName in projectNames:
+        projectConfigs[projectName] = _refresh_ProjectConfig(projectName)
+
+    _loaded = True
+    return projectConfigs
+
+
+def get_ProjectConfig(projectName: str) -> dict:
+    """
+    Returns the configuration of a project.
+
+    Args:
+        projectName (str): The name of the project.
+
+    Returns:
+        dict: The project config, or an empty dictionary if the project does not exist.
+    """
+    if not _loaded:
+        load_ProjectConfigs()
+
+    if projectName == "" or not os.path.isdir(
+        os.path.join(myPreferences.root_projects(), projectName)
+    ):
+        print(
+            f"{myTerminal.ERROR}Project '{projectName}' path does not exist.{myTerminal.RESET}"
+        )
+        return {}
+
+    return _refresh_ProjectConfig(projectName)
+
+
+def get_archived_projects() -> set:
+    """
+    Returns the names of the archived projects.
+    """
+    return {
+        projectName
+        for projectName, config in load_ProjectConfigs().items()
+        if config.get("Archived", False) is True
+    }
+
+
+def migrate_ProjectConfigs(projectName: str = "") -> list:
+    """
+    Writes the default value of every missing key to the project config files, and
+    creates the config files that do not exist yet.
+
+    Args:
+        projectName (str): The project to migrate, all projects when empty.
+
+    Returns:
+        list: The names of the projects whose config file was written.
+    """
+    if projectName:
+        projectNames = [projectName]
+    else:
+        projectNames = list(load_ProjectConfigs().keys())
+
+    migratedProjects = []
+    for name in projectNames:
+        configPath = get_ProjectConfig_path(name)
+        mtime = _config_mtime(configPath)
+        fileConfig = {}
+        if mtime is not None:
+            with open(configPath, "r", encoding="utf-8") as f:
+                try:
+                    fileConfig = json.load(f)
+                except json.JSONDecodeError:
+                    print(
+                        f"{myTerminal.ERROR}Error decoding JSON from {configPath}, not migrated.{myTerminal.RESET}"
+                    )
+                    continue
+
+        if not _add_missing_keys(name, fileConfig) and mtime is not None:
+            continue  # nothing missing
+
+        with open(configPath, "w", encoding="utf-8") as f:
+            json.dump(fileConfig, f, indent=4)
+        migratedProjects.append(name)
+
+    return migratedProjects
@@ -7,6 +7,7 @@ from typing import List
 
 from . import Inputs as myInputs
 from . import Notes as myNotes
+from . import NoteWriter as myNoteWriter
 from . import Preferences as myPreferences
 from . import Terminal as myTerminal
 from . import Tools as myTools
@@ -1127,9 +1128,12 @@ def _make_task_note_content_from_imported_task(
     output_filename = f"{uniqueIdentifier}.md"
     output_path = os.path.join(newNote_directory, output_filename)
 
-    # Save the new note
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(note_Content)
+    # Save the new note, an existing note is never overwritten
+    if not myTools.create_note_file(output_path, note_Content):
+        print(
+            f"\t{myTerminal.ERROR}A note with the unique identifier '{uniqueIdentifier}' already exists.{myTerminal.RESET}"
+        )
+        return False
 
     print(f"\t{myTerminal.SUCCESS}Note created:{myTerminal.RESET}")
     return True
@@ -1254,21 +1258,23 @@ def import_or_update_tasks_from_CSV(FullPath, projectName: str) -> None:
     # existing PKV project tasks
     pkvTasks = load_ProjectTasks(projectName)
 
-    for csvTask in csvTasks:
-        taskExists = False
-        for pkvTask in pkvTasks:
-            if pkvTask.ticket.strip() == csvTask["ID"]:
-                taskExists = True
-                _update_existing_task_from_csv_import(projectName, csvTask, pkvTask)
-
-        if not taskExists:
-            print(
-                f"New task found: {csvTask['Title']} ({csvTask['ID']}) assigned to '{csvTask['Assigned To']}'"
-            )
-            proceed = myInputs.ask_yes_no_from_user("Import this task?", default=True)
-            if proceed:
-                if _make_task_note_content_from_imported_task(projectName, csvTask):
-                    print(f"\tTask '{csvTask['Title']}' imported successfully\n")
+    # the updated task notes are flushed to disk together at the end
+    with myNoteWriter.batch():
+        for csvTask in csvTasks:
+            taskExists = False
+            for pkvTask in pkvTasks:
+                if pkvTask.ticket.strip() == csvTask["ID"]:
+                    taskExists = True
+                    _update_existing_task_from_csv_import(projectName, csvTask, pkvTask)
+
+            if not taskExists:
+                print(
+                    f"New task found: {csvTask['Title']} ({csvTask['ID']}) assigned to '{csvTask['Assigned To']}'"
+                )
+                proceed = myInputs.ask_yes_no_from_user("Import this task?", default=True)
+                if proceed:
+                    if _make_task_note_content_from_imported_task(projectName, csvTask):
+                        print(f"\tTask '{csvTask['Title']}' imported successfully\n")
 
 
 # === Project Methods From Tools
@@ -1,9 +1,19 @@
+import csv
 import datetime 
+import json
+import sys
 from typing import List, Tuple
 
 from . import Preferences as myPreferences, Inputs as myInputs, Terminal as myTerminal, Tools as myTools
+from . import DateIndex as myDateIndex
+from . import NoteStore as myNoteStore
+from . import TermIndex as myTermIndex
+from . import TrigramIndex as myTrigramIndex
 from .Tools import NoteData
 
+# the fields search-notes writes when none are asked for
+defaultResultFields = ("date", "project", "type", "title", "filePath")
+
 def describe_search_results(searchCriteria: str, notes: List[NoteData]) -> None:
     """
     Print a description of the search results.
@@ -24,6 +34,80 @@ def describe_search_results(searchCriteria: str, notes: List[NoteData]) -> None:
     print(f"\t\tFound {len(notes)} notes matching the search criteria.")
     print("")
     
+def _result_value(note: NoteData, fieldName: str):
+    """Returns a note field as a JSON compatible value."""
+    value = getattr(note, fieldName)
+    if isinstance(value, str):
+        return value.strip()
+    if fieldName == "actionItems":
+        return [actionItem.to_json() for actionItem in value]
+    return value
+
+def write_search_results(notes: List[NoteData], outputFormat = "jsonl", fields = defaultResultFields, limit = None, stream = None) -> int:
+    """
+    Write search results as JSON Lines (one JSON object per note) or CSV, one note at a
+    time so the first results can be read while the rest are written.
+
+    Args:
+        notes (List[NoteData]): List of NoteData objects.
+        outputFormat (str): "jsonl" or "csv".
+        fields (tuple): The NoteData fields to write, in this order.
+        limit (int): The most notes to write, None for all of them.
+        stream: Where to write, stdout by default.
+
+    Returns:
+        int: The number of notes written.
+    """
+    if stream is None:
+        stream = sys.stdout
+    if limit is not None:
+        notes = notes[:limit]
+
+    if outputFormat == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for note in notes:
+            row = []
+            for fieldName in fields:
+                value = _result_value(note, fieldName)
+                # lists go in one cell, tags separated by spaces and the rest as JSON
+                if isinstance(value, list) and all(isinstance(item, str) for item in value):
+                    value = " ".join(value)
+                elif isinstance(value, (list, dict)):
+                    value = json.dumps(value, ensure_ascii=False)
+                row.append(value)
+            writer.writerow(row)
+    else:
+        for note in notes:
+            stream.write(json.dumps({fieldName: _result_value(note, fieldName) for fieldName in fields}, ensure_ascii=False))
+            stream.write("\n")
+
+    stream.flush()
+    return len(notes)
+
+def sort_by_relevance(notes: List[NoteData], searchText: str) -> List[NoteData]:
+    """
+    Sort notes by how well they match the words of a search text or query, best first
+    (BM25 over the title, tags, keywords and body, see TermIndex).  Notes that match
+    equally well are sorted newest first.
+
+    Args:
+        notes (List[NoteData]): List of NoteData objects.
+        searchText (str): The words to rank by, e.g. the text of the body searches.
+
+    Returns:
+        List[NoteData]: The sorted notes.
+    """
+    scores = myTermIndex.relevance_scores(notes, searchText)
+    notes = sorted(notes, key=lambda note: myDateIndex.date_timestamp(note.date), reverse=True)
+    return sorted(notes, key=lambda note: scores[note.filePath], reverse=True)
+
+def sort_by_date(notes: List[NoteData]) -> List[NoteData]:
+    """
+    Sort notes newest first.
+    """
+    return sorted(notes, key=lambda note: myDateIndex.date_timestamp(note.date), reverse=True)
+
 def search_project(notes: List[NoteData], searchPart = "") -> Tuple[str, List[NoteData]]:
     """
     Search for notes in the given list that match the specified project.
@@ -122,17 +206,19 @@ def search_only_private_notes(notes: List[NoteData]) -> Tuple[str, List[NoteData
 
     return "only private notes", results
 
-def search_date(notes: List[NoteData], startDate = "", endDate = "") -> Tuple[str, List[NoteData]]:
+def search_date(notes: List[NoteData], startDate = "", endDate = "", interactive: bool = True) -> Tuple[str, List[NoteData]]:
     """
     Search for notes in the given list that match the specified date range.
 
     Args:
         notes (List[NoteData]): List of NoteData objects.
+        interactive (bool): Ask for a missing date, False to search without a start date
+            or up to now instead.
 
     Returns:
         Tuple[str, List[NoteData]]: A tuple containing the search description and filtered notes.
     """
-    if startDate == "":
+    if startDate == "" and interactive:
         userInput = input("Enter start date (YYYY-MM-DD) or leave blank for no start date: ")
     else:
         userInput = startDate
@@ -141,7 +227,7 @@ def search_date(notes: List[NoteData], startDate = "", endDate = "") -> Tuple[st
     if not isDate:
         startDate = datetime.datetime(year = 1899,month = 1, day =1)
 
-    if endDate == "":  
+    if endDate == "" and interactive:
         userInput = input("Enter end date (YYYY-MM-DD) or leave blank for no end date: ")
     else:
         userInput = endDate
@@ -150,18 +236,14 @@ def search_date(notes: List[NoteData], startDate = "", endDate = "") -> Tuple[st
     if not isDate:
         endDate = datetime.datetime.now()
     
-    # truncate startDate to the beginning of the day
-    # and convert to a string
-    startDate = startDate.replace(hour=0, minute=0, second=0, microsecond=0).strftime(myPreferences.datetime_format())  
-    endDate = endDate.replace(hour=23, minute=59, second=59, microsecond=999999).strftime(myPreferences.datetime_format())
-    
-    results = []
-    for note in notes:
-        noteDate = note.date
-        if startDate <= noteDate <= endDate:
-            results.append(note)
-            
-    return f"date range from {startDate} to {endDate}", results
+    # from the beginning of the start day to the end of the end day
+    startDate = startDate.replace(hour=0, minute=0, second=0, microsecond=0)
+    endDate = endDate.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    # the notes in the range, sorted by date
+    results = myDateIndex.notes_between(notes, startDate, endDate)
+
+    return f"date range from {startDate.strftime(myPreferences.datetime_format())} to {endDate.strftime(myPreferences.datetime_format())}", results
 
 def search_type(notes: List[NoteData], searchPart = "") -> Tuple[str, List[NoteData]]:
     """
@@ -189,55 +271,103 @@ def search_type(notes: List[NoteData], searchPart = "") -> Tuple[str, List[NoteD
                 results.append(note)
         return f"note type = {selectedType}", results
     
-def search_title(notes: List[NoteData], searchPart = "") -> Tuple[str, List[NoteData]]:
+def search_title(notes: List[NoteData], searchPart = "", interactive: bool = True) -> Tuple[str, List[NoteData], str]:
     """
     Search for notes in the given list that match the specified title.
 
     Args:
         notes (List[NoteData]): List of NoteData objects.
+        interactive (bool): Ask for the title if searchPart is empty, False for no search.
 
     Returns:
-        Tuple[str, List[NoteData]]: A tuple containing the search description and filtered notes.
+        Tuple[str, List[NoteData], str]: A tuple containing the search description, the
+        filtered notes and the text searched for ("" for no search).
     """
-    if searchPart == "":
+    if searchPart == "" and interactive:
         titlePart = input("Enter a part of the title to search for (or leave blank for no title search): ").lower().strip()
     else: 
         titlePart = searchPart.lower().strip()
 
     results = []
     if titlePart is None or titlePart == "":
-        return "none, no title selected", notes
+        return "none, no title selected", notes, ""
     else:
+        if myNoteStore.is_enabled():
+            # only check the notes the full text index matched
+            notes = myNoteStore.filter_Notes(notes, title=titlePart)
+        else:
+            # only check the notes that have every trigram of the title part
+            notes = myTrigramIndex.filter_Notes(notes, "title", titlePart)
         for note in notes:
             if titlePart in note.title.lower():
                 results.append(note)
-        return f"title contains '{titlePart}'", results
+        return f"title contains '{titlePart}'", results, titlePart
 
-def search_body(notes: List[NoteData], searchPart = "") -> Tuple[str, List[NoteData]]:
+def search_body(notes: List[NoteData], searchPart = "", interactive: bool = True) -> Tuple[str, List[NoteData], str]:
     """
     Search for notes in the given list that match the specified body content.
 
     Args:
         notes (List[NoteData]): List of NoteData objects.
+        interactive (bool): Ask for the text if searchPart is empty, False for no search.
 
     Returns:
-        Tuple[str, List[NoteData]]: A tuple containing the search description and filtered notes.
+        Tuple[str, List[NoteData], str]: A tuple containing the search description, the
+        filtered notes and the text searched for ("" for no search).
     """
     searchPart = searchPart.lower().strip()
 
-    if searchPart == "":
+    if searchPart == "" and interactive:
         searchPart = input("Enter a part of the body to search for (or leave blank for no body search): ").lower().strip()
     
 
     results = []
     if searchPart is None or searchPart == "":
-        return "none, no search part provided", notes
+        return "none, no search part provided", notes, ""
     else:
+        if myNoteStore.is_enabled():
+            # only read the bodies of the notes the full text index matched
+            notes = myNoteStore.filter_Notes(notes, body=searchPart)
+        else:
+            notes = myTrigramIndex.filter_Notes(notes, "body", searchPart)
         for note in notes:
             if searchPart in note.noteBody.lower():
                 results.append(note)
-        return f"body contains '{searchPart}'", results
+        return f"body contains '{searchPart}'", results, searchPart
     
+def search_body_query(notes: List[NoteData], searchPart = "", interactive: bool = True) -> Tuple[str, List[NoteData], str]:
+    """
+    Search for notes whose title or body match a word query, with "phrases" and AND, OR,
+    NOT and parentheses (see TermIndex).  Only the notes that contain the words of the
+    query are looked at.
+
+    Args:
+        notes (List[NoteData]): List of NoteData objects.
+        interactive (bool): Ask for the query if searchPart is empty and print an invalid
+            query, returning all notes.  False for no search without a query and
+            ValueError for an invalid one.
+
+    Returns:
+        Tuple[str, List[NoteData], str]: A tuple containing the search description, the
+        filtered notes and the query searched for ("" for no search).
+    """
+    searchPart = searchPart.strip()
+
+    if searchPart == "" and interactive:
+        searchPart = input('Enter words to search for, use "quotes" for phrases and AND, OR, NOT (or leave blank for no search): ').strip()
+
+    if searchPart is None or searchPart == "":
+        return "none, no search query provided", notes, ""
+    else:
+        try:
+            results = myTermIndex.filter_Notes(notes, searchPart)
+        except ValueError as e:
+            if not interactive:
+                raise
+            print(f"{myTerminal.ERROR}{e}{myTerminal.RESET}")
+            return f"none, invalid search query {searchPart}", notes, ""
+        return f"title or body match {searchPart}", results, searchPart
+
 def search_tags(notes: List[NoteData], searchPart = "") -> Tuple[str, List[NoteData]]:
     """
     Search for notes for a given tag.
@@ -0,0 +1,190 @@
+"""
+Search session of search-notes.py, the notes that are left after each search step.
+
+The notes of the session are numbered once and a set of them is an int used as a bitset:
+bit n is set when note n is in the set.  Narrowing the results is a bitwise AND with the
+bitset of the search, the project, type, tag, private and archived searches AND with
+bitsets that are built once per session instead of checking every note again.  Every
+step keeps the bitset of its results (one bit per note) so undo just goes back to the
+previous bitset.  The text of the body, title and query searches is kept with the steps
+to rank the results by relevance.
+"""
+
+from typing import List
+
+from . import Inputs as myInputs
+from . import Tools as myTools
+from .Tools import NoteData
+
+
+class SearchSession:
+    """
+    The notes of a search session and the results of every search step.
+    """
+
+    def __init__(self, notes: List[NoteData]):
+        self.notes = list(notes)
+        self.allNotes = (1 << len(self.notes)) - 1
+        # bitsets of the results of every step, the last one is the current result
+        self.history = [self.allNotes]
+        self.searchTexts = [""]
+        self._ordinals = {id(note): ordinal for ordinal, note in enumerate(self.notes)}
+        self._attributeBitsets = None
+
+    def _bitset(self, ordinals) -> int:
+        """Returns the bitset of the notes with the given ordinals."""
+        bits = bytearray((len(self.notes) + 7) // 8)
+        for ordinal in ordinals:
+            bits[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(bits, "little")
+
+    def _attributes(self) -> dict:
+        """
+        Returns the bitsets of the note attributes, built on first use:
+        project, type and tag -> value -> bitset, and private, shared,
+        notArchivedProject and noProject -> bitset.
+        """
+        if self._attributeBitsets is None:
+            ordinals = {"project": {}, "type": {}, "tag": {}}
+            private, shared, notArchivedProject, noProject = [], [], [], []
+            for ordinal, note in enumerate(self.notes):
+                ordinals["project"].setdefault(note.project, []).append(ordinal)
+                ordinals["type"].setdefault(note.type, []).append(ordinal)
+                for tag in set(note.tags or []):
+                    ordinals["tag"].setdefault(tag, []).append(ordinal)
+                if note.private is True:
+                    private.append(ordinal)
+                elif note.private is False:
+                    shared.append(ordinal)
+                if note.archivedProject is False:
+                    notArchivedProject.append(ordinal)
+                if note.project == "":
+                    noProject.append(ordinal)
+
+            self._attributeBitsets = {
+                attribute: {value: self._bitset(valueOrdinals) for value, valueOrdinals in values.items()}
+                for attribute, values in ordinals.items()
+            }
+            self._attributeBitsets["private"] = self._bitset(private)
+            self._attributeBitsets["shared"] = self._bitset(shared)
+            self._attributeBitsets["notArchivedProject"] = self._bitset(notArchivedProject)
+            self._attributeBitsets["noProject"] = self._bitset(noProject)
+
+        return self._attributeBitsets
+
+    @property
+    def current(self) -> int:
+        """The bitset of the current results."""
+        return self.history[-1]
+
+    def count(self) -> int:
+        """Returns the number of notes in the current results."""
+        return self.current.bit_count()
+
+    def result(self) -> List[NoteData]:
+        """Returns the notes of the current results, in session order."""
+        # bin() puts the highest bit first, reversed the n-th character is bit n
+        bits = bin(self.current)[:1:-1]
+        return [self.notes[ordinal] for ordinal, bit in enumerate(bits) if bit == "1"]
+
+    def narrow(self, bitset: int, searchText: str = "") -> None:
+        """Keeps only the current results that are also in the bitset, as a new step."""
+        self.history.append(self.current & bitset)
+        self.searchTexts.append(searchText)
+
+    def narrow_to_notes(self, notes: List[NoteData], searchText: str = "") -> None:
+        """
+        Keeps only the current results that are also in the list of notes, as a new step.
+        searchText is the text the notes were searched for, if any.
+        """
+        self.narrow(
+            self._bitset(self._ordinals[id(note)] for note in notes if id(note) in self._ordinals),
+            searchText,
+        )
+
+    def ranking_text(self) -> str:
+        """Returns the text of the searches that led to the current results."""
+        return " ".join(searchText for searchText in self.searchTexts if searchText)
+
+    def undo(self) -> bool:
+        """Goes back to the results before the last step, returns False if there is none."""
+        if len(self.history) == 1:
+            return False
+        self.history.pop()
+        self.searchTexts.pop()
+        return True
+
+    def search_project(self, searchPart="", interactive: bool = True) -> str:
+        """
+        Search by project, see Search.search_project.  Returns the search description.
+        Without a project it is selected from a list, unless interactive is False.
+        """
+        if searchPart == "" and interactive:
+            _, selectedProject, _ = myInputs.select_project_name_withDict(showNewProjectOption=False)
+        else:
+            selectedProject = searchPart
+
+        if selectedProject is None or selectedProject == "":
+            self.narrow(self.allNotes)  # an empty step, so undo still undoes one step
+            return "none, no project selected"
+
+        projectTag = myTools.generate_tag_from_projectName(selectedProject).replace("#", "")
+        attributes = self._attributes()
+        self.narrow(attributes["project"].get(selectedProject, 0) | attributes["tag"].get(projectTag, 0))
+        return f"project = {selectedProject}"
+
+    def search_no_project(self) -> str:
+        """Search for notes not assigned to any project."""
+        self.narrow(self._attributes()["noProject"])
+        return "project = None"
+
+    def search_no_archived_project(self) -> str:
+        """Search for notes not assigned to an archived project."""
+        self.narrow(self._attributes()["notArchivedProject"])
+        return "project is not archived"
+
+    def search_no_private_notes(self) -> str:
+        """Search excluding private notes."""
+        self.narrow(self._attributes()["shared"])
+        return "no private notes"
+
+    def search_only_private_notes(self) -> str:
+        """Search for only private notes."""
+        self.narrow(self._attributes()["private"])
+        return "only private notes"
+
+    def search_type(self, searchPart="", interactive: bool = True) -> str:
+        """
+        Search by (part of the) note type, see Search.search_type.  Without a type it is
+        selected from a list, unless interactive is False.
+        """
+        if searchPart == "" and interactive:
+            _, selectedType, _ = myInputs.select_template()
+        else:
+            selectedType = searchPart
+
+        selectedType = selectedType.replace("_template.markdown", "").replace("pkv_", "").replace("project_", "")
+        if selectedType is None or selectedType == "":
+            self.narrow(self.allNotes)
+            return "none, no type selected"
+
+        bitset = 0
+        for noteType, typeBitset in self._attributes()["type"].items():
+            if selectedType in noteType:
+                bitset |= typeBitset
+        self.narrow(bitset)
+        return f"note type = {selectedType}"
+
+    def search_tags(self, searchPart="") -> str:
+        """Search by tag, see Search.search_tags."""
+        if searchPart == "":
+            selectedTag = myInputs.select_tags_from_noteList(self.result())
+        else:
+            selectedTag = searchPart
+
+        if selectedTag is None or selectedTag == "":
+            self.narrow(self.allNotes)
+            return "none, no tag selected"
+
+        self.narrow(self._attributes()["tag"].get(selectedTag, 0))
+        return f"note tags include {selectedTag}"
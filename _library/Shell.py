@@ -0,0 +1,177 @@
+"""
+Interactive pkv shell, runs the vault commands (the scripts in the root folder) inside
+one long running process.
+
+Every script started from a terminal re-imports the library, re-reads the preferences
+and loads the note index before it can do any work.  The shell pays that once: the
+library, the preferences, the project registry and the note index stay loaded between
+commands.  Notes written by one command are picked up by the next because the note
+index compares the modified time of every note file, and the index and project configs
+are re-read when another process (the vault watcher, a script in another terminal)
+changes them.
+"""
+
+import cmd
+import os
+import runpy
+import shlex
+import sys
+import time
+import traceback
+
+from . import NoteIndex as myNoteIndex
+from . import Notes as myNotes
+from . import Preferences as myPreferences
+from . import Terminal as myTerminal
+
+# root folder scripts that are not vault commands
+_excludedScripts = ("pkv-shell.py", "vault-watch.py")
+
+
+def scripts_folder() -> str:
+    """Returns the folder that holds the command scripts (the repository root)."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_commands() -> dict:
+    """
+    Returns the commands the shell can run.
+
+    Returns:
+        dict: lower case command name -> full path of the script.
+    """
+    commands = {}
+    with os.scandir(scripts_folder()) as entries:
+        for entry in entries:
+            if (
+                entry.is_file()
+                and entry.name.endswith(".py")
+                and entry.name not in _excludedScripts
+            ):
+                commands[entry.name[:-3].lower()] = entry.path
+
+    return dict(sorted(commands.items()))
+
+
+def run_script(scriptPath: str, args: list) -> None:
+    """
+    Runs a command script in this process as if it was started from the terminal.
+
+    Args:
+        scriptPath (str): Full path of the script.
+        args (list): The command line arguments for the script.
+    """
+    # a script may replace or close the standard streams, the shell keeps using them
+    savedArgv = sys.argv
+    savedStreams = (sys.stdin, sys.stdout, sys.stderr)
+    sys.argv = [scriptPath] + args
+    try:
+        runpy.run_path(scriptPath, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            print(f"{myTerminal.WARNING}Exit code: {e.code}{myTerminal.RESET}")
+    except KeyboardInterrupt:
+        print(f"\n{myTerminal.WARNING}Interrupted.{myTerminal.RESET}")
+    except Exception:
+        print(f"{myTerminal.ERROR}{traceback.format_exc()}{myTerminal.RESET}")
+    finally:
+        sys.argv = savedArgv
+        sys.stdin, sys.stdout, sys.stderr = savedStreams
+
+
+class PKVShell(cmd.Cmd):
+    """
+    Command loop of the pkv shell.  Any script in the root folder can be run by name,
+    with or without the .py extension, followed by its arguments.
+    """
+
+    intro = (
+        f"{myTerminal.INFORMATION}Personal Knowledge Vault shell{myTerminal.RESET}\n"
+        "Type a command name (for example search-notes), 'commands' to list them or 'exit' to leave.\n"
+    )
+    prompt = f"{myTerminal.INPUTPROMPT}pkv> {myTerminal.RESET}"
+
+    def __init__(self):
+        super().__init__()
+        self.commands = get_commands()
+
+    def preloop(self) -> None:
+        startTime = time.perf_counter()
+        noteCount = myNotes.update_NoteIndex()
+        print(
+            f"{myTerminal.GREY}{noteCount} notes loaded from {myPreferences.root_pkv()} in {time.perf_counter() - startTime:.2f} seconds{myTerminal.RESET}"
+        )
+
+    def emptyline(self) -> bool:
+        return False  # do not repeat the last command
+
+    def default(self, line: str) -> bool:
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            print(f"{myTerminal.ERROR}{e}{myTerminal.RESET}")
+            return False
+
+        commandName = words[0].lower()
+        if commandName.endswith(".py"):
+            commandName = commandName[:-3]
+
+        scriptPath = self.commands.get(commandName)
+        if scriptPath is None:
+            print(
+                f"{myTerminal.ERROR}Unknown command '{words[0]}', type 'commands' to list them.{myTerminal.RESET}"
+            )
+            return False
+
+        startTime = time.perf_counter()
+        run_script(scriptPath, words[1:])
+        print(
+            f"{myTerminal.GREY}{commandName} finished in {time.perf_counter() - startTime:.2f} seconds{myTerminal.RESET}"
+        )
+        return False
+
+    def completenames(self, text: str, *ignored) -> list:
+        return [
+            commandName
+            for commandName in list(self.commands.keys()) + ["commands", "reload", "exit"]
+            if commandName.startswith(text.lower())
+        ]
+
+    def completedefault(self, *ignored) -> list:
+        return []
+
+    def do_commands(self, arg: str) -> bool:
+        """List the vault commands."""
+        for scriptPath in self.commands.values():
+            print(f"\t{os.path.basename(scriptPath)[:-3]}")
+        return False
+
+    def do_reload(self, arg: str) -> bool:
+        """Re-read the note index from disk and look for new command scripts."""
+        self.commands = get_commands()
+        myNoteIndex.load_index(force=True, includeContent=False)
+        self.preloop()
+        return False
+
+    def do_exit(self, arg: str) -> bool:
+        """Leave the pkv shell."""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg: str) -> bool:
+        print()
+        return True
+
+
+def run_shell() -> None:
+    """Starts the pkv shell and returns when the user leaves it."""
+    shell = PKVShell()
+    while True:
+        try:
+            shell.cmdloop()
+            break
+        except KeyboardInterrupt:
+            # Ctrl+C at the prompt clears the line instead of leaving the shell
+            print()
+            shell.intro = ""
@@ -1,6 +1,5 @@
 from . import Preferences as myPreferences
 from . import Terminal as myTerminal
-from . import Inputs as myInput
 import os
 import re
 
@@ -71,6 +70,7 @@ def merge_template_with_values(timestamp_id, timestamp_full, selectedProjectName
         tuple[str, str]: A tuple containing the unique identifier and the merged template string.
     """
     # Lazy import to avoid circular dependency (Tools imports Notes, Notes imports Templates)
+    from . import Inputs as myInput
     from .Tools import generate_unique_identifier, letters_and_numbers_only
      
     #handle the common date tags with hard coded values 
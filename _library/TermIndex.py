@@ -0,0 +1,527 @@
+"""
+Inverted index of the words in note titles and bodies, for phrase and boolean searches.
+
+Every note title and body is split into words (see tokenize) and each word remembers the
+notes it appears in and its positions in them.  A query then only looks at the notes
+that contain its words instead of reading every note body:
+
+    budget                      notes with the word budget
+    budget vendor               both words (AND is implied)
+    "vendor onboarding"         the words next to each other, in that order
+    budget OR forecast          either word
+    budget NOT draft            budget but not draft
+    (risk OR issue) #INC12345   parentheses group, #tags match the tag only
+
+Words match whole words, ignoring case.  A plain word also matches the same word used as
+a #tag, "#budget" only matches the tag.
+
+The same index ranks notes by relevance with BM25 (see relevance_scores): the tags and
+keywords of the notes are indexed as well, with the length of every field of every
+note, and a word counts more in the title, tags and keywords than in the body.
+
+The index is a copy of the note index (see NoteIndex) saved next to it.  It is created
+by the first query and from then on sync() only re-reads the notes whose modified time
+or size changed.
+"""
+
+import math
+import os
+import pickle
+import re
+from array import array
+
+from . import NoteIndex as myNoteIndex
+from . import Terminal as myTerminal
+
+# bump the version whenever the tokenizer or the saved format changes
+termIndexVersion = 3
+termIndexFileName = "TermIndex.pickle"
+fields = ("title", "body", "tags", "keywords")
+# the fields the queries search, tags and keywords only count for the relevance
+queryFields = ("title", "body")
+
+# BM25 parameters and how much a word counts in each field
+fieldWeights = {"title": 3.0, "body": 1.0, "tags": 2.0, "keywords": 2.0}
+bm25K1 = 1.2
+bm25B = 0.75
+
+# words, numbers, words joined by ' or _ and #tags
+_tokenPattern = re.compile(r"#[^\W_][\w/-]*|[^\W_]+(?:['’_][^\W_]+)*")
+# markdown that hides words: link targets and urls
+_markdownLinkTarget = re.compile(r"\]\([^)]*\)|https?://\S+")
+_queryPattern = re.compile(r'"[^"]*"?|\(|\)|[^\s()"]+')
+
+
+def tokenize(text: str) -> list:
+    """
+    Splits text into lower case words, the position of a word is its index in the list.
+
+    Markdown punctuation (headings, emphasis, lists, tables, link brackets) is skipped
+    and link targets are dropped.
+
+    Returns:
+        list[str]: The words of the text.
+    """
+    return _tokenPattern.findall(_markdownLinkTarget.sub(" ", text).lower())
+
+
+def _encode(documents: dict) -> array:
+    """Packs docId -> positions into one flat array: docId, count, positions..."""
+    packed = array("I")
+    for docId, positions in documents.items():
+        packed.append(docId)
+        packed.append(len(positions))
+        packed.extend(positions)
+    return packed
+
+
+def _decode(packed: array) -> dict:
+    """Unpacks an array made by _encode."""
+    documents = {}
+    i = 0
+    while i < len(packed):
+        count = packed[i + 1]
+        documents[packed[i]] = packed[i + 2 : i + 2 + count]
+        i += 2 + count
+    return documents
+
+
+class InvertedIndex:
+    """
+    Positional inverted index of the title and body of a set of documents.
+
+    The postings of each word are kept packed in one array (see _encode) and unpacked
+    the first time a query or an update needs them, so loading a saved index only
+    loads one array per word.
+    """
+
+    def __init__(self):
+        # field -> word -> packed array, or docId -> array of positions once unpacked
+        self.postings = {field: {} for field in fields}
+        # docId -> field -> the space separated words of the document, to remove it again
+        self.documentWords = {}
+        # docId -> number of words in each field, and the totals, for the BM25 scores
+        self.documentLengths = {}
+        self.fieldLengthTotals = dict.fromkeys(fields, 0)
+
+    def __getstate__(self) -> dict:
+        for fieldPostings in self.postings.values():
+            for word, documents in fieldPostings.items():
+                if isinstance(documents, dict):
+                    fieldPostings[word] = _encode(documents)
+        return self.__dict__
+
+    def _documents(self, field: str, word: str) -> dict:
+        """Returns docId -> positions of a word, unpacking the postings if needed."""
+        documents = self.postings[field].get(word)
+        if documents is None:
+            return {}
+        if not isinstance(documents, dict):
+            documents = self.postings[field][word] = _decode(documents)
+        return documents
+
+    def add(self, docId, title: str, body: str, tags: str = "", keywords: str = "") -> None:
+        """Adds (or replaces) a document."""
+        self.remove(docId)
+        documentWords = {}
+        documentLengths = []
+        for field, text in zip(fields, (title, body, tags, keywords)):
+            fieldPositions = {}
+            words = tokenize(text or "")
+            documentLengths.append(len(words))
+            self.fieldLengthTotals[field] += len(words)
+            for position, word in enumerate(words):
+                positions = fieldPositions.get(word)
+                if positions is None:
+                    positions = fieldPositions[word] = array("I")
+                positions.append(position)
+                if word[0] == "#":
+                    # a tag also counts as the plain word at the same position
+                    positions = fieldPositions.get(word[1:])
+                    if positions is None:
+                        positions = fieldPositions[word[1:]] = array("I")
+                    positions.append(position)
+
+            fieldPostings = self.postings[field]
+            for word, positions in fieldPositions.items():
+                documents = fieldPostings.get(word)
+                if documents is None:
+                    fieldPostings[word] = {docId: positions}
+                else:
+                    self._documents(field, word)[docId] = positions
+            documentWords[field] = " ".join(fieldPositions)
+        self.documentWords[docId] = documentWords
+        self.documentLengths[docId] = tuple(documentLengths)
+
+    def remove(self, docId) -> None:
+        """Removes a document, if it is in the index."""
+        documentWords = self.documentWords.pop(docId, None)
+        if documentWords is None:
+            return
+
+        for field, length in zip(fields, self.documentLengths.pop(docId)):
+            self.fieldLengthTotals[field] -= length
+        for field, words in documentWords.items():
+            for word in words.split():
+                documents = self._documents(field, word)
+                documents.pop(docId, None)
+                if not documents:
+                    self.postings[field].pop(word, None)
+
+    def documents(self) -> set:
+        """Returns the ids of all the documents."""
+        return set(self.documentWords)
+
+    def _word(self, word: str) -> set:
+        documents = set()
+        for field in queryFields:
+            documents.update(self._documents(field, word))
+        return documents
+
+    def _phrase(self, words: list) -> set:
+        if len(words) == 1:
+            return self._word(words[0])
+
+        documents = set()
+        for field in queryFields:
+            wordDocuments = [self._documents(field, word) for word in words]
+            candidates = set.intersection(*(set(d) for d in wordDocuments))
+            for docId in candidates:
+                # positions where the phrase could start, narrowed word by word
+                starts = set(wordDocuments[0][docId])
+                for offset in range(1, len(words)):
+                    starts &= {p - offset for p in wordDocuments[offset][docId]}
+                    if not starts:
+                        break
+                if starts:
+                    documents.add(docId)
+
+        return documents
+
+    def vocabulary(self) -> set:
+        """Returns every word in the index."""
+        words = set()
+        for fieldPostings in self.postings.values():
+            words.update(fieldPostings)
+        return words
+
+    def bm25(self, words: list, docIds) -> dict:
+        """
+        Returns the BM25 score of the documents for the words, the term frequency of a
+        word is the sum over the fields of its weighted count, normalized by the length
+        of the field (BM25F).
+
+        Args:
+            words (list): The words to score, each one counts once.
+            docIds: The documents to score.
+
+        Returns:
+            dict: docId -> score, 0.0 for documents without any of the words.
+        """
+        scores = dict.fromkeys(docIds, 0.0)
+        documentCount = len(self.documentWords)
+        if not documentCount:
+            return scores
+
+        averageLengths = {
+            field: (self.fieldLengthTotals[field] / documentCount) or 1.0 for field in fields
+        }
+        for word in set(words):
+            wordDocuments = [(i, field, self._documents(field, word)) for i, field in enumerate(fields)]
+            containing = set()
+            for _, _, documents in wordDocuments:
+                containing.update(documents)
+            if not containing:
+                continue
+
+            inverseFrequency = math.log(1 + (documentCount - len(containing) + 0.5) / (len(containing) + 0.5))
+            for docId in containing.intersection(scores):
+                lengths = self.documentLengths[docId]
+                frequency = 0.0
+                for i, field, documents in wordDocuments:
+                    positions = documents.get(docId)
+                    if positions:
+                        frequency += (
+                            fieldWeights[field] * len(positions)
+                            / (1 - bm25B + bm25B * lengths[i] / averageLengths[field])
+                        )
+                scores[docId] += inverseFrequency * frequency * (bm25K1 + 1) / (frequency + bm25K1)
+
+        return scores
+
+    def search(self, query: str) -> set:
+        """
+        Returns the ids of the documents that match a query, see the module docstring
+        for the query syntax.
+        """
+        parser = _QueryParser(query)
+        return parser.parse(self)
+
+
+class _QueryParser:
+    """
+    Recursive descent parser that evaluates a query while parsing it.
+
+        query  := and ("OR" and)*
+        and    := unary (["AND"] unary)*
+        unary  := "NOT" unary | "(" query ")" | "phrase" | word
+    """
+
+    def __init__(self, query: str):
+        self.tokens = _queryPattern.findall(query)
+        self.position = 0
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def parse(self, index: InvertedIndex) -> set:
+        self.index = index
+        if not self.tokens:
+            return set()
+
+        documents = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"unexpected '{self._peek()}' in the search query")
+        return documents
+
+    def _or(self) -> set:
+        documents = self._and()
+        while self._peek() == "OR":
+            self._next()
+            documents = documents | self._and()
+        return documents
+
+    def _and(self) -> set:
+        documents = self._unary()
+        while self._peek() not in (None, "OR", ")"):
+            if self._peek() == "AND":
+                self._next()
+            documents = documents & self._unary()
+        return documents
+
+    def _unary(self) -> set:
+        token = self._next()
+        if token is None:
+            raise ValueError("the search query ends too soon")
+        if token == "NOT":
+            return self.index.documents() - self._unary()
+        if token == "(":
+            documents = self._or()
+            if self._next() != ")":
+                raise ValueError("missing ')' in the search query")
+            return documents
+        if token in (")", "AND", "OR"):
+            raise ValueError(f"unexpected '{token}' in the search query")
+
+        # a quoted phrase, or a word that splits into several words (e.g. INC-12345)
+        words = tokenize(token.strip('"'))
+        if not words:
+            return self.index.documents() if token.startswith('"') else set()
+        return self.index._phrase(words)
+
+
+# the index of the vault, loaded from disk on first use
+_index = None
+# notePathAndFile -> (docId, st_mtime_ns, st_size), docIds are never reused
+_documents = {}
+_nextDocId = 0
+_syncedChangeCount = None
+_dirty = False
+
+
+def term_index_path() -> str:
+    """Returns the full path of the saved term index."""
+    return os.path.join(myNoteIndex.index_folder(), termIndexFileName)
+
+
+def exists() -> bool:
+    """Returns True if the term index was created for this vault."""
+    return _index is not None or os.path.isfile(term_index_path())
+
+
+def load() -> InvertedIndex:
+    """Loads the term index from disk, once per process."""
+    global _index, _documents, _nextDocId
+
+    if _index is not None:
+        return _index
+
+    _index = InvertedIndex()
+    _documents = {}
+    _nextDocId = 0
+    try:
+        with open(term_index_path(), "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == termIndexVersion:
+            _index = data["index"]
+            _documents = data["documents"]
+            _nextDocId = data["nextDocId"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Term index '{term_index_path()}' could not be read, rebuilding it: {e}{myTerminal.RESET}"
+        )
+
+    return _index
+
+
+def save() -> bool:
+    """Saves the term index if it changed, returns False if it could not be saved."""
+    global _dirty
+
+    if not _dirty:
+        return True
+
+    try:
+        myNoteIndex.save_pickle(
+            term_index_path(),
+            {
+                "version": termIndexVersion,
+                "index": _index,
+                "documents": _documents,
+                "nextDocId": _nextDocId,
+            },
+        )
+        _dirty = False
+        return True
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Term index '{term_index_path()}' could not be saved: {e}{myTerminal.RESET}"
+        )
+        return False
+
+
+def sync() -> int:
+    """
+    Brings the term index up to date with the note index, only the notes whose modified
+    time or size changed are re-indexed.  The note index should be current, e.g. after
+    Notes.get_Notes_as_list or Notes.update_NoteIndex.
+
+    Returns:
+        int: The number of notes added, changed or removed.
+    """
+    global _nextDocId, _syncedChangeCount, _dirty
+
+    index = load()
+    entries = myNoteIndex.load_index(includeContent=False)
+    if _syncedChangeCount == myNoteIndex.change_count():
+        return 0
+
+    changes = 0
+    for notePathAndFile in list(_documents.keys() - entries.keys()):
+        index.remove(_documents.pop(notePathAndFile)[0])
+        changes += 1
+
+    for notePathAndFile, (mtime, size, metaData) in entries.items():
+        document = _documents.get(notePathAndFile)
+        if document is not None and document[1:] == (mtime, size):
+            continue
+
+        content = myNoteIndex.get_content(notePathAndFile, mtime, size)
+        if content is None:
+            continue  # no body in the index for this version of the note yet
+
+        if document is not None:
+            index.remove(document[0])
+        index.add(
+            _nextDocId,
+            metaData.get("title", ""),
+            content.get("noteBody", ""),
+            " ".join(metaData.get("tags") or []),
+            " ".join(metaData.get("keywords") or []),
+        )
+        _documents[notePathAndFile] = (_nextDocId, mtime, size)
+        _nextDocId += 1
+        changes += 1
+
+    _syncedChangeCount = myNoteIndex.change_count()
+    if changes:
+        _dirty = True
+        save()
+    return changes
+
+
+def search(query: str) -> set:
+    """
+    Returns the full paths of the indexed notes that match a query, syncing the index
+    first.  Raises ValueError if the query can not be parsed.
+    """
+    sync()
+    docIds = _index.search(query)
+    return {
+        notePathAndFile
+        for notePathAndFile, (docId, mtime, size) in _documents.items()
+        if docId in docIds
+    }
+
+
+def filter_Notes(notes: list, query: str) -> list:
+    """
+    Returns the notes that match a query.  Notes in the term index are looked up, notes
+    it does not know (e.g. notes outside the vault) are indexed on the fly.
+    """
+    matchingPaths = search(query)
+    matchingNotes = []
+    for note in notes:
+        if note.filePath in _documents:
+            if note.filePath in matchingPaths:
+                matchingNotes.append(note)
+        else:
+            noteIndex = InvertedIndex()
+            noteIndex.add(0, note.title, note.noteBody)
+            if noteIndex.search(query):
+                matchingNotes.append(note)
+
+    return matchingNotes
+
+
+def ranking_words(text: str) -> list:
+    """
+    Returns the words to rank notes by for a search text or query.  AND, OR, NOT and
+    parentheses are dropped and a part of a word (e.g. "procur" from a body search) is
+    replaced by the indexed words that contain it.
+    """
+    words = []
+    for token in _queryPattern.findall(text):
+        if token in ("(", ")", "AND", "OR", "NOT"):
+            continue
+        words.extend(tokenize(token.strip('"')))
+
+    rankingWords = []
+    vocabulary = None
+    for word in dict.fromkeys(words):
+        if any(word in _index.postings[field] for field in fields):
+            rankingWords.append(word)
+            continue
+        if vocabulary is None:
+            vocabulary = _index.vocabulary()
+        rankingWords.extend(indexedWord for indexedWord in vocabulary if word in indexedWord)
+
+    return rankingWords
+
+
+def relevance_scores(notes: list, text: str) -> dict:
+    """
+    Returns the BM25 relevance of the notes for a search text or query, syncing the
+    index first.  Notes the index does not know score 0.0.
+
+    Returns:
+        dict: note.filePath -> score, higher is more relevant.
+    """
+    sync()
+    docIds = {
+        note.filePath: _documents[note.filePath][0]
+        for note in notes
+        if note.filePath in _documents
+    }
+    scores = _index.bm25(ranking_words(text), docIds.values())
+    return {
+        note.filePath: scores.get(docIds.get(note.filePath), 0.0)
+        for note in notes
+    }
@@ -5,7 +5,10 @@ import os
 import re
 from decimal import Decimal
 
+from . import NoteIndex as myNoteIndex
+from . import NoteWriter as myNoteWriter
 from . import Preferences as myPreferences
+from . import ProjectRegistry as myProjectRegistry
 from . import Terminal as myTerminal
 
 # Import NoteData from Notes module
@@ -244,90 +247,15 @@ def get_pkv_projects() -> dict:
     return projects
 
 
-# global declaration for caching project configs
-dictProjectConfigs = {}
-
-
 def get_ProjectConfig_as_dict(projectName: str) -> dict:
     """
-    Returns the project configuration for a given project name.
+    Returns the project configuration for a given project name.  Configs come from the
+    project registry, they are loaded once per process and re-read when the file changes.
 
     Args:
         projectName (str): The name of the project.
     """
-    global dictProjectConfigs
-
-    if projectName in dictProjectConfigs:
-        return dictProjectConfigs[projectName]
-
-    projectPath = os.path.join(myPreferences.root_projects(), projectName)
-
-    # starting point for the project config
-    _exampleConfigBody = {
-        "ProjectFolderName": f"{projectName}",
-        "ProjectName": f"{projectName}",
-        "Programs": [],
-        "Archived": False,
-        "Sync": False,
-        "PrivateShareFolder": "",
-        "PublicShareFolder": "",
-        "PublicShareFolderURL": "",
-        "TimeCode": "",
-        "ProjectManagementSoftwareURL": "",
-        "ProgressReportGroup": "",  #the group or name of the manager that will receive the weekly progress report
-        "Needs Weekly Progress Update": False,
-        "Needs Monthly Progress Update": False,
-        "TeamSharePointSiteURL": "",
-        "TeamSharePointBackLogListName": "Team Backlog",
-        "TeamSharePointBackLogListRowID": 0,
-        "OneNote_noteBookName": "",
-        "OneNote_sectionName": "",
-    }
-
-    if not os.path.isdir(projectPath):
-        print(
-            f"{myTerminal.ERROR}Project '{projectName}' path does not exist.{myTerminal.RESET}"
-        )
-        return {}
-
-    if not os.path.exists(os.path.join(projectPath, ".ProjectConfig.json")):
-        with open(
-            os.path.join(projectPath, ".ProjectConfig.json"), "w", encoding="utf-8"
-        ) as f:
-            json.dump(_exampleConfigBody, f, indent=4)
-
-    configPath = os.path.join(projectPath, ".ProjectConfig.json")
-    if not os.path.isfile(configPath):
-        return {}
-
-    with open(configPath, "r", encoding="utf-8") as f:
-        try:
-            config = json.load(f)
-            dictProjectConfigs[projectName] = config
-
-            missingProjectConfigKey = False
-
-            for key, value in _exampleConfigBody.items():
-                if key not in config.keys():
-                    missingProjectConfigKey = True
-                    # print(f"Project '{projectName}' missing config value '{key}'")
-                    config[key] = value
-
-            if missingProjectConfigKey:
-                # save the project config with the new
-                with open(
-                    os.path.join(projectPath, ".ProjectConfig.json"),
-                    "w",
-                    encoding="utf-8",
-                ) as f:
-                    json.dump(config, f, indent=4)
-
-            return config
-        except json.JSONDecodeError:
-            print(
-                f"{myTerminal.ERROR}Error decoding JSON from {configPath}{myTerminal.RESET}"
-            )
-            return {}
+    return myProjectRegistry.get_ProjectConfig(projectName)
 
 
 def get_pkv_attachments() -> dict:
@@ -377,6 +305,30 @@ def get_project_tags(projectName: str) -> dict:
     return tags
 
 
+# ids and file names (without .md) of the notes in the vault plus the identifiers handed
+# out by generate_unique_identifier, see get_known_identifiers
+_knownIdentifiers = None
+
+
+def get_known_identifiers() -> set:
+    """
+    Returns the set of note identifiers in use in the vault.  The set is built once per
+    process from the note index (the vault is scanned only if it was never indexed) and
+    identifiers handed out by generate_unique_identifier are added to it.
+
+    Returns:
+        set: The note ids and the note file names without the .md extension.
+    """
+    global _knownIdentifiers
+
+    if _knownIdentifiers is None:
+        if not myNoteIndex.is_complete():
+            get_Notes_as_list(myPreferences.root_pkv(), lazy=True)
+        _knownIdentifiers = myNoteIndex.get_identifiers()
+
+    return _knownIdentifiers
+
+
 def is_NewNote_identifier_unique(noteIdentifier) -> bool:
     """
     Checks if a note identifier is unique across all notes in the PKV.
@@ -387,18 +339,13 @@ def is_NewNote_identifier_unique(noteIdentifier) -> bool:
     Returns:
         bool: True if the identifier is unique, False otherwise.
     """
-    notes = get_Notes_as_list(myPreferences.root_pkv())
-    uniqueIds = list(map(lambda note: note.id, notes))
-
-    if noteIdentifier in uniqueIds:
-        return False
-    else:
-        return True
+    return noteIdentifier not in get_known_identifiers()
 
 
 def generate_unique_identifier(timestamp_id, noteType, title) -> str:
     """
     Ensures that the unique identifier is not already used in the target directory.
+    The identifier is reserved so later calls in the same process never hand it out again.
 
     Args:
         uniqueIdentifier (str): The identifier to check for uniqueness.
@@ -425,9 +372,59 @@ def generate_unique_identifier(timestamp_id, noteType, title) -> str:
         )
         uniqueIdentifier = f"{timestamp_id}_{noteType}_{titleLettersAndNumbers}"
 
+    get_known_identifiers().add(uniqueIdentifier)
     return uniqueIdentifier
 
 
+def create_note_file(notePathAndFile: str, noteContent: str) -> bool:
+    """
+    Creates a new note file, an existing file is never overwritten.  The file is created
+    with O_EXCL so two scripts creating the same note at the same time can not both win.
+
+    Args:
+        notePathAndFile (str): The full path and filename of the new note.
+        noteContent (str): The content of the new note.
+
+    Returns:
+        bool: True if the note was created, False if the file already exists.
+    """
+    try:
+        fileDescriptor = os.open(
+            notePathAndFile, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644
+        )
+    except FileExistsError:
+        return False
+
+    with open(fileDescriptor, "w", encoding="utf-8") as f:
+        f.write(noteContent)
+
+    return True
+
+
+def create_unique_note_file(
+    newNote_directory: str, timestamp_id, noteType, title, noteContent: str
+) -> tuple[str, str]:
+    """
+    Creates a new note with a unique identifier in newNote_directory.  If another process
+    created a file with the same name in the meantime the next free identifier is used.
+
+    Args:
+        newNote_directory (str): The folder for the new note.
+        timestamp_id (str): The timestamp the identifier starts from.
+        noteType (str): The note type, part of the identifier.
+        title (str): The note title, part of the identifier.
+        noteContent (str): The content of the new note.
+
+    Returns:
+        tuple[str, str]: The unique identifier and the full path of the new note.
+    """
+    while True:
+        uniqueIdentifier = generate_unique_identifier(timestamp_id, noteType, title)
+        output_path = os.path.join(newNote_directory, f"{uniqueIdentifier}.md")
+        if create_note_file(output_path, noteContent):
+            return uniqueIdentifier, output_path
+
+
 def generate_tag_from_projectName(projectName: str) -> str:
     """
     Generates a tag from a project name by removing special characters and replacing spaces with underscores.
@@ -765,7 +762,7 @@ def open_vault():
 
 def write_text_to_file(filePath: str, textContent: str) -> bool:
     """
-    Writes text content to a file.
+    Writes text content to a file, replacing it in one step (see NoteWriter).
 
     Args:
         filePath (str): The path to the file.
@@ -775,8 +772,7 @@ def write_text_to_file(filePath: str, textContent: str) -> bool:
         bool: True if the write operation is successful, False otherwise.
     """
     try:
-        with open(filePath, "w", encoding="utf-8") as f:
-            f.write(textContent)
+        myNoteWriter.write_text(filePath, textContent)
         return True
     except Exception as e:
         print(
@@ -0,0 +1,233 @@
+"""
+Trigram index of note titles and bodies, for "contains" searches of any part of a word.
+
+Every three characters of a lower cased title or body (a trigram) remember the notes
+they appear in.  A note can only contain "procur" if it has the trigrams "pro", "roc",
+"ocu" and "cur", so a search only checks the notes that have all the trigrams of the
+search text instead of every note body in the vault.  Searches shorter than three
+characters can not be narrowed down and check every note.
+
+The notes of a trigram are kept in an array of note ids in ascending order.  A note
+that changed gets a new id appended to the arrays of its trigrams and its old id is
+dropped from the arrays lazily, when the dropped ids make up a good part of the index.
+
+The index is a copy of the note index (see NoteIndex) saved next to it.  It is created
+by the first search and from then on sync() only re-reads the notes whose modified time
+or size changed.
+"""
+
+import os
+import pickle
+from array import array
+
+from . import NoteIndex as myNoteIndex
+from . import Terminal as myTerminal
+
+# bump the version whenever the saved format changes
+trigramIndexVersion = 1
+trigramIndexFileName = "TrigramIndex.pickle"
+fields = ("title", "body")
+trigramLength = 3
+
+# the index of the vault, loaded from disk on first use
+_postings = None  # field -> trigram -> array of docIds in ascending order
+# notePathAndFile -> (docId, st_mtime_ns, st_size) and the reverse, docIds are never reused
+_documents = {}
+_paths = {}
+_removed = set()  # docIds of notes that changed or were removed, still in the postings
+_nextDocId = 0
+_syncedChangeCount = None
+_dirty = False
+
+
+def trigrams(text: str) -> set:
+    """Returns the trigrams of a lower cased text."""
+    return {text[i : i + trigramLength] for i in range(len(text) - trigramLength + 1)}
+
+
+def trigram_index_path() -> str:
+    """Returns the full path of the saved trigram index."""
+    return os.path.join(myNoteIndex.index_folder(), trigramIndexFileName)
+
+
+def exists() -> bool:
+    """Returns True if the trigram index was created for this vault."""
+    return _postings is not None or os.path.isfile(trigram_index_path())
+
+
+def load() -> dict:
+    """Loads the trigram index from disk, once per process."""
+    global _postings, _documents, _paths, _removed, _nextDocId
+
+    if _postings is not None:
+        return _postings
+
+    _postings = {field: {} for field in fields}
+    _documents = {}
+    _removed = set()
+    _nextDocId = 0
+    try:
+        with open(trigram_index_path(), "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == trigramIndexVersion:
+            _postings = data["postings"]
+            _documents = data["documents"]
+            _removed = data["removed"]
+            _nextDocId = data["nextDocId"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Trigram index '{trigram_index_path()}' could not be read, rebuilding it: {e}{myTerminal.RESET}"
+        )
+
+    _paths = {document[0]: notePathAndFile for notePathAndFile, document in _documents.items()}
+    return _postings
+
+
+def save() -> bool:
+    """Saves the trigram index if it changed, returns False if it could not be saved."""
+    global _dirty
+
+    if not _dirty:
+        return True
+
+    try:
+        myNoteIndex.save_pickle(
+            trigram_index_path(),
+            {
+                "version": trigramIndexVersion,
+                "postings": _postings,
+                "documents": _documents,
+                "removed": _removed,
+                "nextDocId": _nextDocId,
+            },
+        )
+        _dirty = False
+        return True
+    except Exception as e:
+        print(
+            f"{myTerminal.WARNING}Trigram index '{trigram_index_path()}' could not be saved: {e}{myTerminal.RESET}"
+        )
+        return False
+
+
+def _compact() -> None:
+    """Drops the ids of changed and removed notes from the postings."""
+    global _removed
+
+    for fieldPostings in _postings.values():
+        for trigram in list(fieldPostings):
+            docIds = array("I", (docId for docId in fieldPostings[trigram] if docId not in _removed))
+            if docIds:
+                fieldPostings[trigram] = docIds
+            else:
+                del fieldPostings[trigram]
+    _removed = set()
+
+
+def _add(docId: int, field: str, text: str) -> None:
+    fieldPostings = _postings[field]
+    for trigram in trigrams(text.lower()):
+        docIds = fieldPostings.get(trigram)
+        if docIds is None:
+            fieldPostings[trigram] = array("I", (docId,))
+        else:
+            docIds.append(docId)
+
+
+def sync() -> int:
+    """
+    Brings the trigram index up to date with the note index, only the notes whose
+    modified time or size changed are re-indexed.  The note index should be current,
+    e.g. after Notes.get_Notes_as_list or Notes.update_NoteIndex.
+
+    Returns:
+        int: The number of notes added, changed or removed.
+    """
+    global _nextDocId, _syncedChangeCount, _dirty
+
+    load()
+    entries = myNoteIndex.load_index(includeContent=False)
+    if _syncedChangeCount == myNoteIndex.change_count():
+        return 0
+
+    changes = 0
+    for notePathAndFile in list(_documents.keys() - entries.keys()):
+        docId = _documents.pop(notePathAndFile)[0]
+        del _paths[docId]
+        _removed.add(docId)
+        changes += 1
+
+    for notePathAndFile, (mtime, size, metaData) in entries.items():
+        document = _documents.get(notePathAndFile)
+        if document is not None and document[1:] == (mtime, size):
+            continue
+
+        content = myNoteIndex.get_content(notePathAndFile, mtime, size)
+        if content is None:
+            continue  # no body in the index for this version of the note yet
+
+        if document is not None:
+            del _paths[document[0]]
+            _removed.add(document[0])
+        _add(_nextDocId, "title", metaData.get("title", ""))
+        _add(_nextDocId, "body", content.get("noteBody", ""))
+        _documents[notePathAndFile] = (_nextDocId, mtime, size)
+        _paths[_nextDocId] = notePathAndFile
+        _nextDocId += 1
+        changes += 1
+
+    _syncedChangeCount = myNoteIndex.change_count()
+    if changes:
+        if len(_removed) > len(_documents) // 4:
+            _compact()
+        _dirty = True
+        save()
+    return changes
+
+
+def find_paths(field: str, text: str):
+    """
+    Returns the full paths of the indexed notes whose title or body (field) has every
+    trigram of the lower cased text, a superset of the notes that contain the text.
+    The index should be synced first.
+
+    Returns:
+        set: The candidate paths, or None if the text is too short to narrow down.
+    """
+    searchTrigrams = trigrams(text)
+    if not searchTrigrams:
+        return None
+
+    fieldPostings = _postings[field]
+    postingLists = sorted(
+        (fieldPostings.get(trigram, ()) for trigram in searchTrigrams), key=len
+    )
+    # start with the rarest trigram, the candidates only shrink from there
+    docIds = set(postingLists[0])
+    for docIdArray in postingLists[1:]:
+        if not docIds:
+            break
+        docIds.intersection_update(docIdArray)
+
+    return {_paths[docId] for docId in docIds - _removed}
+
+
+def filter_Notes(notes: list, field: str, text: str) -> list:
+    """
+    Returns the notes that may contain the lower cased text in their title or body
+    (field) according to the trigram index, plus the notes it does not know (e.g.
+    notes outside the vault) so the caller can check them the slow way.  Syncs the
+    index first.
+    """
+    sync()
+    candidatePaths = find_paths(field, text)
+    if candidatePaths is None:
+        return notes
+
+    return [
+        note
+        for note in notes
+        if note.filePath in candidatePaths or note.filePath not in _documents
+    ]
@@ -0,0 +1,194 @@
+"""
+Walks the vault looking for notes.
+
+The walker uses os.scandir and prunes folders before descending into them, so the git
+history, the attachments and the archive are never listed.  The folders (and files) to
+skip come from the default prune rules below plus the patterns in the .pkvignore file in
+the root of the vault.
+
+.pkvignore has one fnmatch pattern per line, for example:
+
+    # skip exported OneNote pages
+    OneNoteExport
+    _Projects/*/scratch
+    *.draft.md
+
+A pattern is matched against the name of the folder or file and against its path
+relative to the vault root (always with / separators).  Blank lines and lines starting
+with # are ignored, a line starting with ! keeps folders the default rules would prune,
+for example !.Archive to include the notes of soft deleted projects.
+
+Folders outside the vault are walked with the default prune rules only, the .pkvignore
+patterns are relative to the vault root.
+"""
+
+import fnmatch
+import os
+
+from . import NoteIndex as myNoteIndex
+from . import Preferences as myPreferences
+
+ignoreFileName = ".pkvignore"
+
+# folders that never contain notes, hidden folders (.git, .Archive, .pkvIndex, ...) are
+# pruned as well
+defaultPruneFolders = ("__pycache__", "node_modules")
+
+# path of the .pkvignore file -> (st_mtime_ns, ignore patterns, keep patterns)
+_ignoreFiles = {}
+
+
+def get_ignore_patterns(vaultRoot: str = "") -> tuple[list, list]:
+    """
+    Reads the .pkvignore file of the vault, the file is only re-read when it changes.
+
+    Args:
+        vaultRoot (str): The vault root, defaults to the pkv_root preference.
+
+    Returns:
+        tuple[list, list]: The ignore patterns and the ! keep patterns.
+    """
+    if vaultRoot == "":
+        vaultRoot = myPreferences.root_pkv()
+
+    ignoreFilePath = os.path.join(vaultRoot, ignoreFileName)
+    try:
+        mtime = os.stat(ignoreFilePath).st_mtime_ns
+    except OSError:
+        return [], []
+
+    cached = _ignoreFiles.get(ignoreFilePath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    ignorePatterns = []
+    keepPatterns = []
+    with open(ignoreFilePath, "r", encoding="utf-8") as f:
+        for line in f:
+            pattern = line.strip()
+            if pattern == "" or pattern.startswith("#"):
+                continue
+
+            if pattern.startswith("!"):
+                keepPatterns.append(pattern[1:].strip().strip("/"))
+            else:
+                ignorePatterns.append(pattern.strip("/"))
+
+    _ignoreFiles[ignoreFilePath] = (mtime, ignorePatterns, keepPatterns)
+    return ignorePatterns, keepPatterns
+
+
+def _matches(name: str, relativePath: str, patterns: list) -> bool:
+    """Returns True if the name or the vault relative path matches one of the patterns."""
+    for pattern in patterns:
+        if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relativePath, pattern):
+            return True
+
+    return False
+
+
+def _walk(target_dir: str):
+    """
+    Walks target_dir with the prune rules applied, yields each folder with the note
+    entries it contains, parents before their sub folders in os.walk order.
+    """
+    vaultRoot = myPreferences.root_pkv()
+    # the .pkvignore patterns only apply inside the vault
+    inVault = myNoteIndex.is_in_vault(target_dir)
+    if inVault:
+        ignorePatterns, keepPatterns = get_ignore_patterns(vaultRoot)
+    else:
+        ignorePatterns, keepPatterns = [], []
+    pruneFolders = set(defaultPruneFolders)
+    pruneFolders.add(os.path.basename(myPreferences.root_attachments()))
+
+    folders = [target_dir]
+    while folders:
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as entries:
+                entries = list(entries)
+        except OSError:
+            continue  # os.walk skips folders it can not list too
+
+        if inVault:
+            folderPath = os.path.relpath(folder, vaultRoot).replace(os.sep, "/")
+            folderPath = "" if folderPath == "." else folderPath + "/"
+        else:
+            folderPath = ""
+
+        subFolders = []
+        noteEntries = []
+        for entry in entries:
+            relativePath = folderPath + entry.name
+            try:
+                isFolder = entry.is_dir()
+            except OSError:
+                isFolder = False
+
+            if isFolder:
+                if entry.is_symlink():
+                    continue  # os.walk does not follow linked folders either
+
+                if (
+                    entry.name.startswith(".") or entry.name in pruneFolders
+                ) and not _matches(entry.name, relativePath, keepPatterns):
+                    continue
+
+                if not _matches(entry.name, relativePath, ignorePatterns):
+                    subFolders.append(entry.path)
+                continue
+
+            if (
+                entry.name.startswith(".")
+                or entry.name.startswith("_")
+                or not entry.name.endswith(".md")
+            ):
+                continue  # Skip hidden files and non markdown files
+
+            if _matches(entry.name, relativePath, ignorePatterns):
+                continue
+
+            noteEntries.append(entry)
+
+        yield folder, noteEntries
+
+        # walk the sub folders in the order they were listed
+        folders.extend(reversed(subFolders))
+
+
+def walk_Notes(target_dir: str):
+    """
+    Yields the notes below target_dir, skipping hidden files, files starting with _ and
+    anything pruned by the default rules or the .pkvignore file.  target_dir itself is
+    always walked, even if a rule would prune it.
+
+    Notes are yielded in the same order as os.walk would list them, the files of a
+    folder first and then the notes of its sub folders.
+
+    Args:
+        target_dir (str): The directory to walk.
+
+    Yields:
+        tuple[str, str, os.stat_result]: The folder, the file name and the stat of the
+        note.  The stat is None if the file could not be stat'ed.
+    """
+    for folder, noteEntries in _walk(target_dir):
+        for entry in noteEntries:
+            try:
+                noteStat = entry.stat()
+            except OSError:
+                noteStat = None
+
+            yield folder, entry.name, noteStat
+
+
+def walk_Folders(target_dir: str) -> list:
+    """
+    Returns target_dir and every folder below it that is walked for notes, i.e. the
+    folders left after the prune rules and the .pkvignore file are applied.
+
+    Args:
+        target_dir (str): The directory to walk.
+    """
+    return [folder for folder, noteEntries in _walk(target_dir)]
@@ -0,0 +1,323 @@
+"""
+Background watcher that keeps the note index of the vault up to date.
+
+Start it with vault-watch.py and leave it running.  The watcher updates the note index
+(see NoteIndex) as notes are added, changed or deleted and writes a heartbeat file
+next to the index.  While the heartbeat is fresh get_Notes_as_list uses the index as is
+instead of walking the vault, so commands start with a ready index.
+
+On Linux the watcher uses inotify to hear about changes.  Everywhere else, when
+inotify is not available, or when the vault lives on a network or sync folder (SMB,
+NFS, OneDrive through FUSE, ...) where inotify does not see changes made elsewhere, it
+falls back to checking the vault every few seconds.
+
+The index the commands trust is not updated the moment a note changes: a change shows
+up after debounceSeconds with inotify (longer while changes keep coming), and up to one
+poll interval plus the debounce later when polling.  Until then a command can still see
+the note as it was.
+"""
+
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import tempfile
+import time
+
+from . import NoteIndex as myNoteIndex
+from . import Preferences as myPreferences
+from . import Terminal as myTerminal
+from . import VaultWalker as myVaultWalker
+
+heartbeatFileName = "Watcher.json"
+# seconds between heartbeats, and between checks of the vault when polling
+heartbeatInterval = 5
+defaultPollInterval = 5
+# the index is trusted while the last heartbeat is less than this many intervals old
+heartbeatTolerance = 3
+# changes are collected for this many seconds before the index is updated, editors
+# often write a file in several steps
+debounceSeconds = 0.5
+
+# file systems where changes made on other machines are not reported by inotify
+_networkFileSystems = ("cifs", "smb3", "smbfs", "nfs", "nfs4", "9p", "davfs", "afpfs")
+
+# inotify constants from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+_watchMask = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_eventHeader = struct.Struct("iIII")
+
+
+def heartbeat_path() -> str:
+    """Returns the full path of the watcher heartbeat file."""
+    return os.path.join(myNoteIndex.index_folder(), heartbeatFileName)
+
+
+def write_heartbeat(mode: str, interval: float) -> None:
+    """
+    Records that the watcher is alive and the note index is up to date.
+
+    Args:
+        mode (str): How the watcher hears about changes, 'inotify' or 'polling'.
+        interval (float): Seconds until the next heartbeat.
+    """
+    heartbeat = {
+        "pid": os.getpid(),
+        "root": os.path.abspath(myPreferences.root_pkv()),
+        "mode": mode,
+        "interval": interval,
+        "heartbeat": time.time(),
+    }
+    os.makedirs(myNoteIndex.index_folder(), exist_ok=True)
+    fileHandle, tempPath = tempfile.mkstemp(
+        dir=myNoteIndex.index_folder(), prefix=heartbeatFileName + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fileHandle, "w", encoding="utf-8") as f:
+            json.dump(heartbeat, f)
+        os.replace(tempPath, heartbeat_path())
+    except BaseException:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        raise
+
+
+def read_heartbeat() -> dict:
+    """Returns the last heartbeat of the watcher, or an empty dictionary."""
+    try:
+        with open(heartbeat_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remove_heartbeat() -> None:
+    """Removes the heartbeat file so commands stop relying on the watcher."""
+    heartbeat = read_heartbeat()
+    if heartbeat.get("pid") == os.getpid() and os.path.isfile(heartbeat_path()):
+        os.remove(heartbeat_path())
+
+
+def is_watching() -> bool:
+    """
+    Returns True if a watcher (in another process) is keeping the note index of the
+    vault up to date.
+    """
+    heartbeat = read_heartbeat()
+    if not heartbeat or heartbeat.get("pid") == os.getpid():
+        return False
+
+    if heartbeat.get("root") != os.path.abspath(myPreferences.root_pkv()):
+        return False
+
+    age = time.time() - heartbeat.get("heartbeat", 0)
+    return 0 <= age < heartbeatTolerance * heartbeat.get("interval", heartbeatInterval)
+
+
+def is_network_folder(folder: str) -> bool:
+    """
+    Returns True if the folder is on a network or FUSE file system (Linux only, other
+    systems return False).
+    """
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split() for line in f]
+    except OSError:
+        return False
+
+    folder = os.path.realpath(folder)
+    fileSystem = ""
+    mountPointLength = -1
+    for mount in mounts:
+        if len(mount) < 3:
+            continue
+        mountPoint = mount[1].replace("\\040", " ")
+        if (
+            folder == mountPoint
+            or folder.startswith(mountPoint.rstrip("/") + "/")
+        ) and len(mountPoint) > mountPointLength:
+            fileSystem = mount[2]
+            mountPointLength = len(mountPoint)
+
+    return fileSystem in _networkFileSystems or fileSystem.startswith("fuse")
+
+
+class _Inotify:
+    """
+    Minimal inotify wrapper using ctypes, watches a set of folders (inotify watches are
+    not recursive).
+    """
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+
+        # only imported when the watcher starts, ctypes.util is slow to import
+        import ctypes
+        import ctypes.util
+
+        self._get_errno = ctypes.get_errno
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_CLOEXEC)
+        if self.fd < 0:
+            errorNumber = self._get_errno()
+            raise OSError(errorNumber, os.strerror(errorNumber))
+        self.watches = {}
+
+    def watch_folders(self, folders: list) -> None:
+        """Watches the folders, and stops watching folders that are not in the list."""
+        for folder in folders:
+            if folder in self.watches:
+                continue
+            watchDescriptor = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(folder), _watchMask
+            )
+            if watchDescriptor < 0:
+                errorNumber = self._get_errno()
+                if errorNumber == 2:
+                    continue  # ENOENT, deleted in the meantime
+                raise OSError(errorNumber, f"{os.strerror(errorNumber)}: {folder}")
+            self.watches[folder] = watchDescriptor
+
+        keepFolders = set(folders)
+        for folder in list(self.watches.keys()):
+            if folder not in keepFolders:
+                self._libc.inotify_rm_watch(self.fd, self.watches.pop(folder))
+
+    def read_events(self, timeout: float) -> list:
+        """
+        Waits up to timeout seconds for changes.
+
+        Returns:
+            list[tuple[int, str]]: The event mask and file name of each change.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset + _eventHeader.size <= len(data):
+            watchDescriptor, mask, cookie, nameLength = _eventHeader.unpack_from(data, offset)
+            offset += _eventHeader.size
+            name = data[offset : offset + nameLength].rstrip(b"\0")
+            offset += nameLength
+            events.append((mask, os.fsdecode(name)))
+
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _is_relevant(mask: int, name: str) -> bool:
+    """Returns True if an inotify event can change the notes of the vault."""
+    return (
+        name.endswith(".md")
+        or name == myVaultWalker.ignoreFileName
+        or mask & (_IN_ISDIR | _IN_Q_OVERFLOW | _IN_DELETE_SELF | _IN_MOVE_SELF) != 0
+    )
+
+
+def _stop_on_terminate(signalNumber, frame):
+    """Treats a terminate signal (kill, closing the terminal) like Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def watch(pollInterval: float = defaultPollInterval, usePolling: bool = False) -> None:
+    """
+    Keeps the note index of the vault up to date until interrupted with Ctrl+C (or
+    terminated).
+
+    Args:
+        pollInterval (float): Seconds between checks of the vault when polling.
+        usePolling (bool): Always poll, even where inotify is available.
+    """
+    from . import Notes as myNotes
+
+    signal.signal(signal.SIGTERM, _stop_on_terminate)
+    vaultRoot = myPreferences.root_pkv()
+
+    inotify = None
+    if not usePolling and is_network_folder(vaultRoot):
+        print(
+            f"{myTerminal.WARNING}'{vaultRoot}' is a network or synced folder, checking it every {pollInterval} seconds.{myTerminal.RESET}"
+        )
+    elif not usePolling:
+        try:
+            inotify = _Inotify()
+            inotify.watch_folders(myVaultWalker.walk_Folders(vaultRoot))
+        except (OSError, AttributeError) as e:
+            print(
+                f"{myTerminal.WARNING}File change notifications are not available ({e}), checking the vault every {pollInterval} seconds.{myTerminal.RESET}"
+            )
+            if inotify is not None:
+                inotify.close()
+            inotify = None
+
+    mode = "inotify" if inotify is not None else "polling"
+    interval = heartbeatInterval if inotify is not None else pollInterval
+
+    noteCount = myNotes.update_NoteIndex()
+    print(
+        f"{myTerminal.SUCCESS}Watching {noteCount} notes in {vaultRoot} ({mode}), press Ctrl+C to stop.{myTerminal.RESET}"
+    )
+
+    try:
+        while True:
+            write_heartbeat(mode, interval)
+
+            if inotify is None:
+                time.sleep(interval)
+                myNotes.update_NoteIndex()
+                continue
+
+            events = inotify.read_events(interval)
+            if not any(_is_relevant(mask, name) for mask, name in events):
+                continue
+
+            # wait for the burst of changes to settle
+            while True:
+                moreEvents = inotify.read_events(debounceSeconds)
+                if not moreEvents:
+                    break
+                events.extend(moreEvents)
+
+            if any(mask & (_IN_ISDIR | _IN_Q_OVERFLOW) for mask, name in events):
+                inotify.watch_folders(myVaultWalker.walk_Folders(vaultRoot))
+            noteCount = myNotes.update_NoteIndex()
+            print(
+                f"{myTerminal.GREY}{time.strftime('%H:%M:%S')} note index updated, {noteCount} notes{myTerminal.RESET}"
+            )
+    except KeyboardInterrupt:
+        print(f"\n{myTerminal.SUCCESS}Vault watcher stopped.{myTerminal.RESET}")
+    finally:
+        remove_heartbeat()
+        if inotify is not None:
+            inotify.close()
@@ -3,33 +3,56 @@ from . import Preferences as myPreferences
 from . import Terminal as myTerminal
 
 # for now assume that git is the version control of choice 
-vaultIsVersionControlled = os.path.isdir(os.path.join(myPreferences.root_pkv(), '.git'))
-useVersionControl = myPreferences.use_versioncontrol()
-
-if not useVersionControl and not vaultIsVersionControlled:
-    print (f"""{myPreferences.myTerminal.WARNING}Version control is not enabled in your preferences but your vault root has been initialized for Git.
-           Consider enabling version control in your preferences{myPreferences.myTerminal.RESET}""")
-elif useVersionControl and not vaultIsVersionControlled:
-    print (f"""{myPreferences.myTerminal.WARNING}Version control is enabled in your preferences but your vault root has NOT been initialized for Git.
-           Consider initializing your vault root for Git. {myPreferences.myTerminal.RESET}""")
-
-if not vaultIsVersionControlled and useVersionControl:
-    #even if the preferences say to use version control, turn it off if the vault is not set up for it
-    useVersionControl = False
-
-if os.path.exists(os.path.join(myPreferences.root_pkv(),".gitignore")) is False:
-    #create a .gitignore file if it does not exist
-    with open(os.path.join(myPreferences.root_pkv(), ".gitignore"), "w") as gitignore_file:
-        gitignore_file.write("# Ignore PKV specific files\n")
-        gitignore_file.write("#\n")
-        gitignore_file.write("# dictionary of all notes in vault\n")
-        gitignore_file.write("AllNotes.json\n")
-        gitignore_file.write("# Scripted Search log for debugging\n")
-        gitignore_file.write("search.log\n")
-        gitignore_file.write("# any hidden files including Search Results, diagram exports, etc\n")
-        gitignore_file.write(".*\n")
-        gitignore_file.write("# temporary HTML output files\n")
-        gitignore_file.write("*.html\n")
+vaultIsVersionControlled = False
+useVersionControl = False
+_initialized = False
+
+
+def init_version_control() -> bool:
+    """
+    Checks once per process whether the vault is a git repository and creates the vault
+    .gitignore file if it is missing.  Called by the version control functions,
+    importing this module has no side effects.
+
+    Returns:
+        bool: True if version control is enabled and the vault is a git repository.
+    """
+    global vaultIsVersionControlled, useVersionControl, _initialized
+
+    if _initialized:
+        return useVersionControl
+    _initialized = True
+
+    vaultIsVersionControlled = os.path.isdir(os.path.join(myPreferences.root_pkv(), '.git'))
+    useVersionControl = myPreferences.use_versioncontrol()
+
+    if not useVersionControl and not vaultIsVersionControlled:
+        print (f"""{myPreferences.myTerminal.WARNING}Version control is not enabled in your preferences but your vault root has been initialized for Git.
+               Consider enabling version control in your preferences{myPreferences.myTerminal.RESET}""")
+    elif useVersionControl and not vaultIsVersionControlled:
+        print (f"""{myPreferences.myTerminal.WARNING}Version control is enabled in your preferences but your vault root has NOT been initialized for Git.
+               Consider initializing your vault root for Git. {myPreferences.myTerminal.RESET}""")
+
+    if not vaultIsVersionControlled and useVersionControl:
+        #even if the preferences say to use version control, turn it off if the vault is not set up for it
+        useVersionControl = False
+
+    if os.path.exists(os.path.join(myPreferences.root_pkv(),".gitignore")) is False:
+        #create a .gitignore file if it does not exist
+        with open(os.path.join(myPreferences.root_pkv(), ".gitignore"), "w") as gitignore_file:
+            gitignore_file.write("# Ignore PKV specific files\n")
+            gitignore_file.write("#\n")
+            gitignore_file.write("# dictionary of all notes in vault\n")
+            gitignore_file.write("AllNotes.json\n")
+            gitignore_file.write("# Scripted Search log for debugging\n")
+            gitignore_file.write("search.log\n")
+            gitignore_file.write("# any hidden files including Search Results, diagram exports, etc\n")
+            gitignore_file.write(".*\n")
+            gitignore_file.write("# temporary HTML output files\n")
+            gitignore_file.write("*.html\n")
+
+    return useVersionControl
+
 
 def startVersionControlMessage() -> None:
     """
@@ -54,7 +77,7 @@ def add_all() -> None:
     This function uses the `git add .` command to stage all changes.
     """
 
-    if useVersionControl:       
+    if init_version_control():       
         startVersionControlMessage()
         cmd = f"""git -C "{myPreferences.root_pkv()}" add . """
         os.system(cmd)
@@ -69,7 +92,7 @@ def add_and_commit(fileAndPath, message = "Updated notes") -> None:
         message (str): The commit message.
     """
     
-    if useVersionControl:       
+    if init_version_control():       
         startVersionControlMessage()
         cmd = f"""git -C "{myPreferences.root_pkv()}" add "{fileAndPath}" """
         os.system(cmd)
@@ -86,7 +109,7 @@ def add_and_commit_all(message = "add and commit all vault changes") -> None:
         message (str): The commit message.
     """
     
-    if useVersionControl:       
+    if init_version_control():       
         startVersionControlMessage()
         cmd = f"""git -C "{myPreferences.root_pkv()}" add . """
         os.system(cmd)
@@ -103,7 +126,7 @@ def commit_existingChange(fileAndPath, message = "Updated notes") -> None:
         message (str): The commit message.
     """
     
-    if useVersionControl:       
+    if init_version_control():       
         startVersionControlMessage()
         cmd = f"""git -C "{myPreferences.root_pkv()}" commit "{fileAndPath}" -m "{message}" """
         os.system(cmd)
@@ -116,7 +139,7 @@ def log() -> None:
     This function uses the `git log` command to show the commit history.
     """
     
-    if useVersionControl:       
+    if init_version_control():       
         startVersionControlMessage()
         cmd = f"""git -C "{myPreferences.root_pkv()}" log --oneline --graph --decorate --all"""
         os.system(cmd)
@@ -1,17 +1,42 @@
-from . import ActionItems as myActionItems
-from . import HTML as myHTML
-from . import Inputs as myInputs
-from . import Notes as myNotes
-from . import Preferences as myPreferences
-from . import Projects as myProjects
-from . import Search as mySearch
-from . import Summary as mySummary
-from . import Templates as myTemplates
-from . import Terminal as myTerminal
-from . import Tools as myTools
-from . import Variables as myVariables
-from . import VersionControl as myVersionControl
+"""
+Personal Knowledge Vault library.
+
+Submodules are imported on first use, `from _library import Terminal as myTerminal`
+only imports Terminal, and importing the package has no side effects.  Preferences and
+version control are set up by the first call that needs them (see
+Preferences.load_preferences and VersionControl.init_version_control).
+"""
+
+import importlib
 
 LibraryVersion = "0.0.1"
 
-print ("Library version:", LibraryVersion,"\n")
\ No newline at end of file
+# attribute name -> submodule, kept for code that uses the package level names
+_submodules = {
+    "myActionItems": "ActionItems",
+    "myHTML": "HTML",
+    "myInputs": "Inputs",
+    "myNotes": "Notes",
+    "myPreferences": "Preferences",
+    "myProjects": "Projects",
+    "mySearch": "Search",
+    "mySummary": "Summary",
+    "myTemplates": "Templates",
+    "myTerminal": "Terminal",
+    "myTools": "Tools",
+    "myVariables": "Variables",
+    "myVersionControl": "VersionControl",
+}
+
+
+def __getattr__(name: str):
+    if name in _submodules:
+        module = importlib.import_module(f".{_submodules[name]}", __name__)
+        globals()[name] = module
+        return module
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(list(globals().keys()) + list(_submodules.keys()))
@@ -4,6 +4,7 @@ from _library import Preferences as myPreferences, Terminal as myTerminal, Input
 import os
 import datetime
 
+myPreferences.check_pickUp_paths()
 downloads_folder = myPreferences.attachmentPickUp_path()
 files = []
 for file in os.listdir(downloads_folder):
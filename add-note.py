@@ -4,6 +4,7 @@ import os
 from datetime import datetime
 
 from _library import Inputs as myInputs
+from _library import NoteWriter as myNoteWriter
 from _library import Notes as myNotes
 
 # my stuff
@@ -130,9 +131,6 @@ def main():
     titleLettersAndNumbers = myTools.letters_and_numbers_only(
         title
     )  # Limit to 200 characters and remove special characters
-    uniqueIdentifier = myTools.generate_unique_identifier(
-        timestamp_id, noteType, titleLettersAndNumbers
-    )
 
     # Read the template content
     templateBody = read_Template(selectedTemplatePath)
@@ -165,20 +163,23 @@ def main():
             output_filename = "Project Brief.md"
         else:
             output_filename = f"{noteType}.md"
-    else:
-        output_filename = f"{uniqueIdentifier}.md"
 
-    output_path = os.path.join(newNote_directory, output_filename)
+        output_path = os.path.join(newNote_directory, output_filename)
 
-    # Save the new note
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(note_Content)
+        # Save the new note
+        myNoteWriter.write_text(output_path, note_Content)
+    else:
+        # Save the new note under the next free unique identifier
+        uniqueIdentifier, output_path = myTools.create_unique_note_file(
+            newNote_directory, timestamp_id, noteType, titleLettersAndNumbers, note_Content
+        )
 
     if myPreferences.include_notes_in_DailyJournal():
         notes = myNotes.get_Notes_as_list(
             myPreferences.root_pkv(),
             includePrivateNotes=True,
             includeArchivedProjects=False,
+            lazy=True,
         )
         notes = sorted(notes, key=lambda x: x.date, reverse=True)
 
@@ -220,10 +221,10 @@ def main():
                             + f"![[./_Projects/{selectedProjectName}/{output_filename}]]\n\n"
                         )
 
-                    with open(journal.filePath, "w", encoding="utf-8") as f:
-                        f.write(
-                            f"""---\n{journal.frontMatter}\n---\n\n {newNoteBody}"""
-                        )
+                    myNoteWriter.write_text(
+                        journal.filePath,
+                        f"""---\n{journal.frontMatter}\n---\n\n {newNoteBody}""",
+                    )
                     # myNotes.open_note_in_editor(journal.filePath)
 
                     if myPreferences.include_backlinks_to_DailyJournal():
@@ -232,8 +233,7 @@ def main():
                             f"\n\n\nBacklink to journal: [[{journal.fileName}]]"
                         )
 
-                    with open(output_path, "w", encoding="utf-8") as f:
-                        f.write(note_Content)
+                    myNoteWriter.write_text(output_path, note_Content)
                 break
 
     print(f"{myTerminal.SUCCESS}Note created:{myTerminal.RESET} {output_path}")
@@ -71,7 +71,6 @@ def main(selectedProjectName=""):
     timestamp_full = selectedDateTime.strftime(myPreferences.datetime_format())
     
     titleLettersAndNumbers = myTools.letters_and_numbers_only(title)  # Limit to 200 characters and remove special characters
-    uniqueIdentifier = myTools.generate_unique_identifier(timestamp_id, noteType, titleLettersAndNumbers)
 
     #check for an existing progress note
     progressNoteExists, lastProgressNote = myTools.load_MostRecentProjectProgressNote(selectedProjectName)
@@ -162,13 +161,8 @@ def main(selectedProjectName=""):
         note_Content = note_Content.replace("<last Impediments>", lastIssues)
         note_Content = note_Content.replace("<last next steps>", lastNextSteps)
 
-    # Construct the output filename and path
-    output_filename = f"{uniqueIdentifier}.md"
-    output_path = os.path.join(newNote_directory, output_filename)
-
-    # Save the new note
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(note_Content)
+    # Save the new note under the next free unique identifier
+    uniqueIdentifier, output_path = myTools.create_unique_note_file(newNote_directory, timestamp_id, noteType, titleLettersAndNumbers, note_Content)
 
     myVersionControl.add_and_commit(output_path, f"Added new {noteType} note: {title} on {timestamp_full}")
 
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 import os
-from _library import Terminal  as myTerminal, Preferences as myPreferences, Notes as myNotes
+from _library import Terminal  as myTerminal, Preferences as myPreferences, Notes as myNotes, ActionItems as myActionItems, ActionItemIndex as myActionItemIndex
 
-todoNotes = myNotes.get_Note_with_ActionItems(myPreferences.root_pkv())
+# bring the note index and the action item index up to date, only changed notes are read
+myNotes.update_NoteIndex()
+myActionItemIndex.sync()
 
 filterProject = input(f"{myTerminal.WHITE}Filter by project name (leave blank for all): {myTerminal.RESET}").strip().lower()
 filterOwner = input(f"{myTerminal.WHITE}Filter by owner (leave blank for all): {myTerminal.RESET}").strip().lower()
-filterDueDate = input(f"{myTerminal.WHITE}Filter by due date (YYYY-MM-DD, leave blank for no date filter): {myTerminal.RESET}").strip()
+filterDueDate = input(f"{myTerminal.WHITE}Filter by due date (YYYY-MM-DD, 'overdue', 'week' for due this week, leave blank for no date filter): {myTerminal.RESET}").strip()
 if len(filterDueDate) == 4:
     #they probably entered a year, so add the current month and day to make it a valid date string 
     filterDueDate += "-00-00"
@@ -14,27 +16,18 @@ elif len(filterDueDate) == 7:
     #they probably entered a year and month, so add the current day to make it a valid date string 
     filterDueDate += "-00"
 
-if not todoNotes:
+if filterDueDate.lower() == "overdue":
+    actionItemList = myActionItemIndex.overdue_ActionItems(project=filterProject, owner=filterOwner)
+elif filterDueDate.lower() == "week":
+    actionItemList = myActionItemIndex.due_this_week_ActionItems(project=filterProject, owner=filterOwner)
+else:
+    # action items without a due date are kept, they sort before every date
+    actionItemList = myActionItemIndex.find_ActionItems(project=filterProject, owner=filterOwner, dueTo=filterDueDate or None)
+
+if not actionItemList:
     print(f"{myTerminal.GREEN}No Action items found.{myTerminal.RESET}")
     exit(0)
 
-#sort notes by project name 
-todoNotes.sort(key=lambda x: (x.project.lower(), x.date))
-
-if filterProject:
-    todoNotes = [note for note in todoNotes if  filterProject in note.project.lower()]
-
-actionItemList = []
-for note in todoNotes:
-    for actionItem in note.actionItems:
-        actionOwner = actionItem.Owner.strip().lower()
-        if (filterOwner == "" or  filterOwner == actionOwner) and \
-           (filterDueDate == "" or actionItem.Date.strip() <= filterDueDate):
-            #keep this action item
-            actionItemList.append(actionItem)
-
-del todoNotes
-
 actionItemList.sort(key=lambda x: (x.project.lower(),x.Owner.lower(),  x.Date))
 
 selected = "start"
@@ -72,7 +65,7 @@ while selected.lower() != "stop":
                 print(f"\t\t\t{myTerminal.GREY}  - Comment: {actionItem.Comment[:40]:<40}{myTerminal.RESET}")
 
 
-    selected = input(f"\n{myTerminal.WHITE}Select note item by number (1-{index}) or press Enter or 'q' to exit: {myTerminal.RESET}")
+    selected = input(f"\n{myTerminal.WHITE}Select note item by number (1-{index}), 'done' and numbers to mark them completed or press Enter or 'q' to exit: {myTerminal.RESET}")
 
     if selected.isdigit() and 1 <= int(selected) <= index:
         selectedActionItem = actionItemList[int(selected) - 1]
@@ -83,11 +76,24 @@ while selected.lower() != "stop":
             cmdString = f"""{myPreferences.default_editor()} "{notePathAndFile}" """
         os.system(cmdString)
     elif selected.lower().startswith("done "):
-        selectedActionItem = selected.replace("done ", "").strip()
-        if selectedActionItem.isdigit() and 1 <= int(selectedActionItem) <= index:
-            selectedActionItem = actionItemList[int(selectedActionItem) - 1]
-            selectedActionItem.Complete()
-            print(f"{myTerminal.GREEN}Marked as completed: {selectedActionItem}{myTerminal.RESET}")
+        # one or more numbers, e.g. "done 3" or "done 3, 5 7", each note is written once
+        selectedNumbers = selected[5:].replace(",", " ").split()
+        selectedActionItems = [
+            actionItemList[int(number) - 1]
+            for number in selectedNumbers
+            if number.isdigit() and 1 <= int(number) <= index
+        ]
+        if selectedActionItems:
+            notCompleted, alreadyCompleted = myActionItems.complete_ActionItems(selectedActionItems)
+            notCompleted = {id(actionItem) for actionItem in notCompleted}
+            alreadyCompleted = {id(actionItem) for actionItem in alreadyCompleted}
+            for selectedActionItem in selectedActionItems:
+                if id(selectedActionItem) in notCompleted:
+                    print(f"{myTerminal.ERROR}Not found in its note, not marked as completed: {selectedActionItem}{myTerminal.RESET}")
+                elif id(selectedActionItem) in alreadyCompleted:
+                    print(f"{myTerminal.WARNING}Already completed, not changed: {selectedActionItem}{myTerminal.RESET}")
+                else:
+                    print(f"{myTerminal.GREEN}Marked as completed: {selectedActionItem}{myTerminal.RESET}")
             input("Press Enter to continue...")
     else:
         selected = "stop"
\ No newline at end of file
@@ -14,7 +14,7 @@ else:
 #if today's journal exists, open it
 # if today's journal does not exist, create it and then open it
 
-notes = myNotes.get_Notes_as_list(myPreferences.root_pkv(), includePrivateNotes=True, includeArchivedProjects=False)
+notes = myNotes.get_Notes_as_list(myPreferences.root_pkv(), includePrivateNotes=True, includeArchivedProjects=False, lazy=True)
 notes = sorted(notes, key=lambda x: x.date, reverse=True)
 
 for note in notes:
@@ -38,7 +38,6 @@ timestamp_date = selectedDateTime.strftime(myPreferences.date_format())
 timestamp_full = selectedDateTime.strftime(myPreferences.datetime_format())
 
 titleLettersAndNumbers = ""  # Limit to 200 characters and remove special characters
-uniqueIdentifier = myTools.generate_unique_identifier(timestamp_id, noteType, titleLettersAndNumbers)
 
 # Read the template content
 templateBody = myTemplates.read_Template(selectedTemplatePath)
@@ -47,13 +46,8 @@ note_Content = myInputs.get_templateMerge_Values_From_User(timestamp_id,timestam
                                                             timestamp_full,"",
                                                             "",
                                                             templateBody, promptForAttachments=False)
-# Construct the output filename and path
-output_filename = f"{uniqueIdentifier}.md"
-output_path = os.path.join(newNote_directory, output_filename)
-
-# Save the new note
-with open(output_path, 'w', encoding='utf-8') as f:
-    f.write(note_Content)
+# Save the new note under the next free unique identifier
+uniqueIdentifier, output_path = myTools.create_unique_note_file(newNote_directory, timestamp_id, noteType, titleLettersAndNumbers, note_Content)
 
 myVersionControl.add_and_commit(output_path, f"Added new {noteType} on {timestamp_full}")
 
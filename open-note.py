@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+import sys
+from _library import Inputs as myInputs
+from _library import Tools as myTools
+
+# open-note.py [words of the title, id or project]
+query = " ".join(sys.argv[1:]).strip()
+
+selectedNoteIndex, note = myInputs.select_note_fuzzy(query=query)
+
+if selectedNoteIndex != 0:
+    myTools.open_note_in_editor(note.filePath)
+    print(f"Note '{note.title}' opened in the default editor.")
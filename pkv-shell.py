@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+
+from _library import Shell as myShell
+
+myShell.run_shell()
@@ -4,6 +4,7 @@ import os
 import shutil
 from datetime import datetime,date, timedelta
 
+from _library import DateIndex as myDateIndex
 from _library import Inputs as myInputs
 from _library import Notes as myNotes
 from _library import Preferences as myPreferences
@@ -54,7 +55,8 @@ for filename in sorted(os.listdir(myPreferences.root_projects())):
             groupReports[ProgressReportGroup] += addLine(f"prepared *{datetime.now().strftime('%Y-%m-%d')}*")
 
 
-        projectNotes = myNotes.get_Notes_from_Project(projectName=projectName)
+        # oldest first, so the last note seen of a kind is the most recent one
+        projectNotes = myDateIndex.sort_by_date(myNotes.get_Notes_from_Project(projectName=projectName))
 
         #gather important notes
         for note in projectNotes:
@@ -63,16 +65,8 @@ for filename in sorted(os.listdir(myPreferences.root_projects())):
                 continue
 
             noteTypes[note.typeSimple] = noteTypes.get(note.typeSimple, 0) + 1
-            if lastNote:
-                if note.date > lastNote.date:
-                    lastNote = note
-            else:
-                lastNote = note
-
-            if firstNote:
-                if note.date < firstNote.date:
-                    firstNote = note
-            else:
+            lastNote = note
+            if firstNote is None:
                 firstNote = note
 
             if hubNote is None and note.typeSimple == "hub":
@@ -84,9 +78,7 @@ for filename in sorted(os.listdir(myPreferences.root_projects())):
             if introductionNote is None and note.typeSimple == "introduction":
                 introductionNote = note
 
-            if (note.typeSimple == "progress"
-                and (lastProgressNote is None
-                    or note.date > lastProgressNote.date)):
+            if note.typeSimple == "progress":
                 lastProgressNote = note
 
         #display project information
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+from _library import ProjectRegistry as myProjectRegistry
+from _library import Terminal as myTerminal
+
+myTerminal.clearTerminal()
+print(f"{myTerminal.INFORMATION}Migrate Project Configs{myTerminal.RESET}\n")
+print("Adds the default value of any missing setting to each project's .ProjectConfig.json and creates missing config files.\n")
+
+migratedProjects = myProjectRegistry.migrate_ProjectConfigs()
+for projectName in migratedProjects:
+    print(f"\t{myTerminal.SUCCESS}Updated:{myTerminal.RESET} {projectName}")
+
+if len(migratedProjects) == 0:
+    print(f"{myTerminal.SUCCESS}All project configs are up to date.{myTerminal.RESET}")
@@ -13,6 +13,7 @@ from _library import Tools as myTools
 from _library import VersionControl as myVersionControl
 from _library import Search as mySearch
 from _library import Notes as myNotes
+from _library import NoteWriter as myNoteWriter
 
 
 print(f"Select the {myTerminal.BLUE} tag {myTerminal.RESET} `that you want to rename")
@@ -53,11 +54,13 @@ if not confirm:
     exit()
 
 
-for note in notes:
-    newFrontMatter = note.frontMatter.replace(oldTag, f"#{newTag}")
-    newNoteBody = note.noteBody.replace(oldTag, f"#{newTag}")
-    if myNotes.update_NoteFrontMatterAndBody(note, newFrontMatter, newNoteBody):
-        print(f"updated note: {note.title}")
-    else:
-        print(f"failed to update note: {note.title}")
+# the notes are flushed to disk together once they are all updated
+with myNoteWriter.batch():
+    for note in notes:
+        newFrontMatter = note.frontMatter.replace(oldTag, f"#{newTag}")
+        newNoteBody = note.noteBody.replace(oldTag, f"#{newTag}")
+        if myNotes.update_NoteFrontMatterAndBody(note, newFrontMatter, newNoteBody):
+            print(f"updated note: {note.title}")
+        else:
+            print(f"failed to update note: {note.title}")
     
\ No newline at end of file
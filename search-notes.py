@@ -8,38 +8,51 @@ from _library import Inputs as myInputs
 from _library import Notes as myNotes
 from _library import Preferences as myPreferences
 from _library import Search as mySearch
+from _library import SearchSession as mySearchSession
 from _library import Summary as mySummary
 from _library import Terminal as myTerminal
 from _library import Tools as myTools
+from _library.Tools import NoteData
 
-# build a dictionary of all notes in the root_pkv directory
-allNotes = myTools.get_Notes_as_list(
-    myPreferences.root_pkv(), includePrivateNotes=True, includeArchivedProjects=True
-)
-if not myNotes.dump_notes_to_json(
-    notes=allNotes,
-    file_path=os.path.join(myPreferences.root_pkv(), "AllNotes.json"),
-    indent=4,
-):
-    print(f"{myTerminal.ERROR}Failed to create AllNotes.json.{myTerminal.RESET}")
-    exit(-1)
-
-# retrieve the dictionary of all notes from AllNotes.json
-allNotes = []
-allNotes = myNotes.load_notes_from_json(
-    file_path=os.path.join(myPreferences.root_pkv(), "AllNotes.json")
-)
-
-print(f"{len(allNotes)} notes loaded, start providing search criteria.")
-print("")
-print("-" * 40)
+# with -jsonl or -csv the search runs without prompting and only writes the results
+# to stdout, e.g. search-notes.py -p "Project X" -lastweek -jsonl -fields date,title -limit 20
+headless = "-jsonl" in sys.argv or "-csv" in sys.argv
+
+if headless:
+    # the note bodies are only read for the notes a body search looks at
+    allNotes = myTools.get_Notes_as_list(
+        myPreferences.root_pkv(), includePrivateNotes=True, includeArchivedProjects=True, lazy=True
+    )
+else:
+    # build a dictionary of all notes in the root_pkv directory
+    allNotes = myTools.get_Notes_as_list(
+        myPreferences.root_pkv(), includePrivateNotes=True, includeArchivedProjects=True
+    )
+    if not myNotes.dump_notes_to_json(
+        notes=allNotes,
+        file_path=os.path.join(myPreferences.root_pkv(), "AllNotes.json"),
+        indent=4,
+    ):
+        print(f"{myTerminal.ERROR}Failed to create AllNotes.json.{myTerminal.RESET}")
+        exit(-1)
+
+    # retrieve the dictionary of all notes from AllNotes.json
+    allNotes = []
+    allNotes = myNotes.load_notes_from_json(
+        file_path=os.path.join(myPreferences.root_pkv(), "AllNotes.json")
+    )
+
+    print(f"{len(allNotes)} notes loaded, start providing search criteria.")
+    print("")
+    print("-" * 40)
 
 searchLog = "Search Log\n"
 continueSearch = True
-searchIndex = 0
-searchHistory = {}
-searchResult = allNotes.copy()
-searchHistory[searchIndex] = allNotes.copy()  # Store the initial state of all notes
+# the results of every search step are kept as bitsets over allNotes for undo
+searchSession = mySearchSession.SearchSession(allNotes)
+searchResult = searchSession.result()
+# the words the listed results are ranked by, sorted by date when empty
+rankingText = ""
 
 
 def selectSearchResultNote(searchResult) -> str:
@@ -60,7 +73,10 @@ def selectSearchResultNote(searchResult) -> str:
     print(
         f"\t{myTerminal.BLUE}{'____':>4}  {'________':<20} {'_______':<31} {'__________':<{noteTitleWidth}}{myTerminal.RESET}"
     )
-    searchResult.sort(key=lambda note: note.date, reverse=True)
+    if rankingText:
+        searchResult[:] = mySearch.sort_by_relevance(searchResult, rankingText)
+    else:
+        searchResult.sort(key=lambda note: note.date, reverse=True)
     for note in searchResult:
         i += 1
         if i % 2 == 0:
@@ -73,17 +89,23 @@ def selectSearchResultNote(searchResult) -> str:
             )
     print("")
     print(f"\t{myTerminal.GREY}{'a':>4}) open All {myTerminal.RESET}")
+    if rankingText:
+        print(f"\t{myTerminal.GREY}{'t':>4}) sort by Time (sorted by relevance to '{rankingText}') {myTerminal.RESET}")
+    else:
+        print(f"\t{myTerminal.GREY}{'r':>4}) sort by Relevance {myTerminal.RESET}")
     print(
         f"\t{myTerminal.GREY}{'x':>4}) eXport search result timeline {myTerminal.RESET}"
     )
 
     selectedNote = input(
-        f"{myTerminal.WHITE}\tEnter the note id to open or enter to continue searching: {myTerminal.RESET}"
+        f"{myTerminal.WHITE}\tEnter the note id or words of its title to open or enter to continue searching: {myTerminal.RESET}"
     ).strip()
     return selectedNote
 
 
 def listSearchResults(searchResult, feedbackMessage=""):
+    global rankingText
+
     myTerminal.clearTerminal()
     if feedbackMessage != "":
         print(f"{myTerminal.INFORMATION}{feedbackMessage}{myTerminal.RESET}\n")
@@ -96,6 +118,17 @@ def listSearchResults(searchResult, feedbackMessage=""):
         for noteToOpen in searchResult:
             # os.system(f"""{myPreferences.default_editor()} "{noteToOpen.filePath}" """)
             myTools.open_note_in_editor(noteToOpen.filePath)
+    elif selectedNote.lower() == "r":
+        defaultText = searchSession.ranking_text()
+        rankingText = input(
+            f"{myTerminal.WHITE}\tEnter the words to rank the results by{f' [{defaultText}]' if defaultText else ''}: {myTerminal.RESET}"
+        ).strip() or defaultText
+        listSearchResults(searchResult)
+        return
+    elif selectedNote.lower() == "t":
+        rankingText = ""
+        listSearchResults(searchResult)
+        return
     elif selectedNote == "x":
         searchLogTemp = searchLog.replace("Search Log \n", "")
         resultsDescription = ""
@@ -146,6 +179,16 @@ def listSearchResults(searchResult, feedbackMessage=""):
         listSearchResults(
             searchResult, feedbackMessage=f"Opened note: {noteToOpen.title}"
         )
+    elif len(selectedNote) > 1 and not selectedNote.isdigit():
+        # words of a title, find the note among the results
+        _, noteToOpen = myInputs.select_note_fuzzy(searchResult, selectedNote)
+        if noteToOpen.filePath:
+            myTools.open_note_in_editor(noteToOpen.filePath)
+            listSearchResults(
+                searchResult, feedbackMessage=f"Opened note: {noteToOpen.title}"
+            )
+        else:
+            listSearchResults(searchResult)
 
     mySearch.describe_search_results("list results", searchResult)
 
@@ -161,88 +204,109 @@ def quitSearch(searchLog):
     exit("Exiting search.")
 
 
+def describeSearchResults(searchCriteria, searchResult):
+    # headless searches only write the results
+    if not headless:
+        mySearch.describe_search_results(searchCriteria, searchResult)
+
+
+def headlessError(message):
+    print(f"search-notes: {message}", file=sys.stderr)
+    exit(2)
+
+
+outputFormat = "csv" if "-csv" in sys.argv else "jsonl"
+outputSort = ""
+outputFields = mySearch.defaultResultFields
+outputLimit = None
+
 # collect input parameters
 if len(sys.argv) > 1:
     # print ("debug args:",' '.join(sys.argv[1:]))
     args = sys.argv[1:]
 
+    if headless:
+        for p in range(0, len(args)):
+            if args[p] in ("-b", "-bq", "-p", "-ti", "-ty", "-d") and (p + 1 >= len(args) or args[p + 1] == "" or args[p + 1].startswith("-")):
+                headlessError(f"{args[p]} needs a value")
+
     searchPart = ""
     for p in range(0, len(args)):
         if args[p] == "-b":
-            searchPart = args[p + 1] if p + 1 < len(sys.argv) else ""
-            searchCriteria, searchResult = mySearch.search_body(
-                searchResult, searchPart
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchPart = args[p + 1] if p + 1 < len(args) else ""
+            searchCriteria, matchingNotes, searchText = mySearch.search_body(searchResult, searchPart, interactive=not headless)
+            searchSession.narrow_to_notes(matchingNotes, searchText)
+            searchResult = searchSession.result()
+            searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
+            describeSearchResults(searchCriteria, searchResult)
+
+        elif args[p] == "-bq":
+            searchPart = args[p + 1] if p + 1 < len(args) else ""
+            try:
+                searchCriteria, matchingNotes, searchText = mySearch.search_body_query(searchResult, searchPart, interactive=not headless)
+            except ValueError as e:
+                headlessError(f"invalid search query {searchPart}: {e}")
+            searchSession.narrow_to_notes(matchingNotes, searchText)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-p":
-            searchPart = args[p + 1] if p + 1 < len(sys.argv) else ""
-            searchCriteria, searchResult = mySearch.search_project(
-                searchResult, searchPart
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchPart = args[p + 1] if p + 1 < len(args) else ""
+            searchCriteria = searchSession.search_project(searchPart, interactive=not headless)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-ti":
-            searchPart = args[p + 1] if p + 1 < len(sys.argv) else ""
-            searchCriteria, searchResult = mySearch.search_title(
-                searchResult, searchPart
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchPart = args[p + 1] if p + 1 < len(args) else ""
+            searchCriteria, matchingNotes, searchText = mySearch.search_title(searchResult, searchPart, interactive=not headless)
+            searchSession.narrow_to_notes(matchingNotes, searchText)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-ty":
-            searchPart = args[p + 1] if p + 1 < len(sys.argv) else ""
-            searchCriteria, searchResult = mySearch.search_type(
-                searchResult, searchPart
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchPart = args[p + 1] if p + 1 < len(args) else ""
+            searchCriteria = searchSession.search_type(searchPart, interactive=not headless)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-np":
-            searchCriteria, searchResult = mySearch.search_no_project(searchResult)
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria = searchSession.search_no_project()
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-nap":
-            searchCriteria, searchResult = mySearch.search_no_archived_project(
-                searchResult
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria = searchSession.search_no_archived_project()
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-npn":
-            searchCriteria, searchResult = mySearch.search_no_private_notes(
-                searchResult
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria = searchSession.search_no_private_notes()
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-opn":
-            searchCriteria, searchResult = mySearch.search_only_private_notes(
-                searchResult
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria = searchSession.search_only_private_notes()
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-d":
-            startDate = args[p + 1] if p + 1 < len(sys.argv) else ""
-            endDate = args[p + 2] if p + 2 < len(sys.argv) else ""
-            searchCriteria, searchResult = mySearch.search_date(
-                searchResult, startDate, endDate
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            startDate = args[p + 1] if p + 1 < len(args) else ""
+            endDate = args[p + 2] if p + 2 < len(args) else ""
+            if headless and endDate.startswith("-"):
+                endDate = ""  # the next flag, search up to now
+            searchCriteria, matchingNotes = mySearch.search_date(searchResult, startDate, endDate, interactive=not headless)
+            searchSession.narrow_to_notes(matchingNotes)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-lastweek":
             startDate = (
@@ -252,12 +316,11 @@ if len(sys.argv) > 1:
             endDate = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime(
                 "%Y-%m-%d"
             )
-            searchCriteria, searchResult = mySearch.search_date(
-                searchResult, startDate, endDate
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria, matchingNotes = mySearch.search_date(searchResult, startDate, endDate)
+            searchSession.narrow_to_notes(matchingNotes)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-lastmonth":
             startDate = datetime.date(
@@ -272,24 +335,22 @@ if len(sys.argv) > 1:
             endDate = datetime.date(
                 datetime.datetime.now().year, datetime.datetime.now().month, 1
             ).strftime("%Y-%m-%d")
-            searchCriteria, searchResult = mySearch.search_date(
-                searchResult, startDate, endDate
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria, matchingNotes = mySearch.search_date(searchResult, startDate, endDate)
+            searchSession.narrow_to_notes(matchingNotes)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
 
         elif args[p] == "-today":
             startDate = datetime.datetime.now().strftime("%Y-%m-%d")
             endDate = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime(
                 "%Y-%m-%d"
             )
-            searchCriteria, searchResult = mySearch.search_date(
-                searchResult, startDate, endDate
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria, matchingNotes = mySearch.search_date(searchResult, startDate, endDate)
+            searchSession.narrow_to_notes(matchingNotes)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
         elif args[p] == "-yesterday":
             startDate = (
                 datetime.datetime.now()
@@ -298,15 +359,68 @@ if len(sys.argv) > 1:
             endDate = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime(
                 "%Y-%m-%d"
             )
-            searchCriteria, searchResult = mySearch.search_date(
-                searchResult, startDate, endDate
-            )
-            searchHistory[searchIndex] = searchResult.copy()
+            searchCriteria, matchingNotes = mySearch.search_date(searchResult, startDate, endDate)
+            searchSession.narrow_to_notes(matchingNotes)
+            searchResult = searchSession.result()
             searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
-            mySearch.describe_search_results(searchCriteria, searchResult)
+            describeSearchResults(searchCriteria, searchResult)
+
+        elif args[p] == "-fields":
+            if p + 1 >= len(args):
+                headlessError("-fields needs a comma separated list of fields")
+            outputFields = tuple(fieldName.strip() for fieldName in args[p + 1].split(",") if fieldName.strip())
+            unknownFields = [fieldName for fieldName in outputFields if fieldName not in NoteData.__annotations__]
+            if unknownFields or not outputFields:
+                headlessError(
+                    f"unknown fields {', '.join(unknownFields)}, use {', '.join(NoteData.__annotations__)}"
+                )
+
+        elif args[p] == "-sort":
+            if p + 1 >= len(args) or args[p + 1] not in ("date", "relevance"):
+                headlessError("-sort needs date or relevance")
+            outputSort = args[p + 1]
+
+        elif args[p] == "-rank":
+            if p + 1 >= len(args) or args[p + 1] == "":
+                headlessError("-rank needs the words to rank by")
+            outputSort = "relevance"
+            rankingText = args[p + 1]
+
+        elif args[p] == "-limit":
+            if p + 1 >= len(args) or not args[p + 1].isdigit():
+                headlessError("-limit needs a number of notes")
+            outputLimit = int(args[p + 1])
 else:
     mySearch.describe_search_results("", searchResult)
 
+if headless:
+    if outputSort == "relevance":
+        searchResult = mySearch.sort_by_relevance(searchResult, rankingText or searchSession.ranking_text())
+    elif outputSort == "date":
+        searchResult = mySearch.sort_by_date(searchResult)
+    try:
+        # a stream of its own on stdout, so when the reader stops early (e.g. head)
+        # nothing is left unwritten in sys.stdout
+        resultStream = open(
+            sys.stdout.fileno(), "w", encoding=sys.stdout.encoding, errors=sys.stdout.errors, closefd=False
+        )
+    except (AttributeError, OSError, ValueError):
+        resultStream = sys.stdout  # e.g. stdout is not a file
+    sys.stdout.flush()
+    try:
+        mySearch.write_search_results(searchResult, outputFormat, outputFields, outputLimit, stream=resultStream)
+    except BrokenPipeError:
+        # the exit status of a command stopped by a closed pipe (128 + SIGPIPE)
+        exitCode = 141
+    else:
+        exitCode = 0
+    if resultStream is not sys.stdout:
+        try:
+            resultStream.close()
+        except OSError:
+            pass
+    exit(exitCode)
+
 while continueSearch:
     print("\nSearch options:")
     print("\t   d)  date range - Search by note date")
@@ -314,6 +428,7 @@ while continueSearch:
     print("\t  ti) title - Search by title")
     print("\t  ty) type - Search by type")
     print("\t  b)  body - Search by body text")
+    print("\t  bq) body query - Search title and body for words, \"phrases\", AND, OR, NOT")
     print("")
     print("\t   p)  project - Search by project")
     print("\t  np) No project - Search for notes not attached to  project")
@@ -338,83 +453,82 @@ while continueSearch:
         quitSearch(searchLog)
 
     elif inputChoice == "p":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_project(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_project()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "np":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_no_project(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_no_project()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "nap":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_no_archived_project(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_no_archived_project()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "npn":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_no_private_notes(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_no_private_notes()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "opn":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_only_private_notes(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_only_private_notes()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "ta":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_tags(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_tags()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "d":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_date(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria, matchingNotes = mySearch.search_date(searchResult)
+        searchSession.narrow_to_notes(matchingNotes)
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "ti":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_title(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria, matchingNotes, searchText = mySearch.search_title(searchResult)
+        searchSession.narrow_to_notes(matchingNotes, searchText)
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "ty":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_type(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria = searchSession.search_type()
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "b":
-        searchIndex += 1
-        searchCriteria, searchResult = mySearch.search_body(searchResult)
-        searchHistory[searchIndex] = searchResult.copy()
+        searchCriteria, matchingNotes, searchText = mySearch.search_body(searchResult)
+        searchSession.narrow_to_notes(matchingNotes, searchText)
+        searchResult = searchSession.result()
+        searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
+        mySearch.describe_search_results(searchCriteria, searchResult)
+
+    elif inputChoice == "bq":
+        searchCriteria, matchingNotes, searchText = mySearch.search_body_query(searchResult)
+        searchSession.narrow_to_notes(matchingNotes, searchText)
+        searchResult = searchSession.result()
         searchLog += f"{datetime.datetime.now()}: {searchCriteria}  ({len(searchResult)} records)\n"
         mySearch.describe_search_results(searchCriteria, searchResult)
 
     elif inputChoice == "u":
-        if searchIndex > 0:
-            searchIndex -= 1
-            searchResult = searchHistory[searchIndex]
+        if searchSession.undo():
+            searchResult = searchSession.result()
             mySearch.describe_search_results("Undo last search", searchResult)
             searchLog += f"{datetime.datetime.now()}: undo\n"
             print(
-                f"{myTerminal.INFORMATION}Undo to search index {searchIndex}{myTerminal.RESET}"
+                f"{myTerminal.INFORMATION}Undo to search index {len(searchSession.history) - 1}{myTerminal.RESET}"
             )
         else:
             print(f"{myTerminal.WARNING}No previous search to undo.{myTerminal.RESET}")
@@ -6,8 +6,9 @@ def main():
     print("PKV Root Directory:", myPreferences.root_pkv())
     print("Preferences Path:", myPreferences.preferences_Path)
     print("Preferences:")
-    for key, value in myPreferences._preferences.items():
+    for key, value in myPreferences.preferences().items():
         print(f"\t{key}: {value}")
+    myPreferences.check_pickUp_paths()
     myTerminal.print_separator()
 
     #get number of notes
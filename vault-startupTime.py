@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Measures how long the library takes to load, in a fresh interpreter each time.
+
+    vault-startupTime.py                 time every library module
+    vault-startupTime.py Notes Search    time the named modules and list their slowest imports
+"""
+
+import os
+import subprocess
+import sys
+
+from _library import Terminal as myTerminal
+
+repeats = 5
+libraryFolder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_library")
+
+
+def cold_start_seconds(code: str) -> float:
+    """Returns the best wall time, in seconds, of running code in a fresh interpreter."""
+    timer = (
+        "import time, subprocess, sys\n"
+        "start = time.perf_counter()\n"
+        "subprocess.run([sys.executable, '-c', sys.argv[1]], check=True)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    best = None
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", timer, code],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(libraryFolder),
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+        seconds = float(result.stdout.strip().splitlines()[-1])
+        best = seconds if best is None else min(best, seconds)
+
+    return best
+
+
+def slowest_imports(moduleName: str, count: int = 10) -> list:
+    """Returns the slowest imports (cumulative microseconds, name) of a library module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import _library.{moduleName}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(libraryFolder),
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append((int(parts[1]), parts[2].rstrip()))
+
+    return sorted(imports, reverse=True)[:count]
+
+
+moduleNames = sys.argv[1:]
+if not moduleNames:
+    moduleNames = sorted(
+        fileName[:-3]
+        for fileName in os.listdir(libraryFolder)
+        if fileName.endswith(".py") and not fileName.startswith("_")
+    )
+
+print(f"{myTerminal.INFORMATION}Library start up time{myTerminal.RESET} (best of {repeats} cold starts)\n")
+bareSeconds = cold_start_seconds("pass")
+print(f"\t{'python (bare interpreter)':<30}{bareSeconds * 1000:8.1f} ms")
+packageSeconds = cold_start_seconds("import _library")
+print(f"\t{'_library':<30}{packageSeconds * 1000:8.1f} ms  {myTerminal.GREY}+{(packageSeconds - bareSeconds) * 1000:.1f} ms{myTerminal.RESET}")
+
+for moduleName in moduleNames:
+    try:
+        seconds = cold_start_seconds(f"import _library.{moduleName}")
+    except RuntimeError as e:
+        print(f"\t{myTerminal.ERROR}{moduleName:<30}{e.args[0].splitlines()[-1]}{myTerminal.RESET}")
+        continue
+    print(f"\t{moduleName:<30}{seconds * 1000:8.1f} ms  {myTerminal.GREY}+{(seconds - bareSeconds) * 1000:.1f} ms{myTerminal.RESET}")
+
+    if len(sys.argv) > 1:
+        for microseconds, importName in slowest_imports(moduleName):
+            print(f"\t\t{myTerminal.GREY}{microseconds / 1000:8.1f} ms {importName.strip()}{myTerminal.RESET}")
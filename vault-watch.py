@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+import sys
+
+from _library import Terminal as myTerminal
+from _library import VaultWatcher as myVaultWatcher
+
+print(f"{myTerminal.INFORMATION}Vault Watcher{myTerminal.RESET}\n")
+print("Keeps the note index up to date while notes are added, changed and deleted.\n")
+
+usePolling = False
+pollInterval = myVaultWatcher.defaultPollInterval
+if "--poll" in sys.argv:
+    usePolling = True
+    pollIndex = sys.argv.index("--poll")
+    if len(sys.argv) > pollIndex + 1:
+        try:
+            pollInterval = float(sys.argv[pollIndex + 1])
+        except ValueError:
+            print(f"{myTerminal.ERROR}'{sys.argv[pollIndex + 1]}' is not a number of seconds.{myTerminal.RESET}")
+            sys.exit(1)
+
+myVaultWatcher.watch(pollInterval=pollInterval, usePolling=usePolling)